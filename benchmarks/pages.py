@@ -0,0 +1,252 @@
+"""
+Headless benchmark of every dashboard page.
+
+Each page runs under Streamlit's `AppTest` (no browser, no server) against a
+synthetic survey of a given size: a cold first run, an unchanged rerun, then
+the page's typical widget interactions. For every run the benchmark records
+its latency and the bytes of the rendered elements; for every page and size
+it records the peak RSS of the process. Each (page, size) case runs in its
+own subprocess so the RSS and the caches belong to that case alone.
+
+Usage::
+
+    python -m benchmarks.pages                              # 1k, 100k, 1M rows, every page
+    python -m benchmarks.pages --rows 1000 100000 --pages Atiqah.py husna.py
+    python -m benchmarks.pages --output bench.json
+
+Results are printed (or written to ``--output``) as JSON.
+
+The synthetic data comes from `sses.synthetic`, fitted to the bundled CSV of
+each page (same columns, marginals and correlation structure), and is
+served in offline mode from a temporary ``SSES_DATA_DIR``.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sses import synthetic
+
+ROOT = Path(__file__).resolve().parents[1]
+PAGES_DIR = ROOT / "pages"
+DATASET_DIR = ROOT / "dataset"
+
+DEFAULT_ROWS = [1_000, 100_000, 1_000_000]
+TIMEOUT = 600
+
+# Bundled CSV behind each page
+PAGE_DATA = {
+    "Homepage.py": "cleaned_group_survey_data.csv",
+    "husna.py": "Husna_SSES_cleaned.csv",
+    "adawiyah.py": "Adawiyah_SSES_cleaned.csv",
+    "Atiqah.py": "Atiqah_SSES_Cleaned.csv",
+    "Hafizah.py": "Hafizah_SSES_Cleaned.csv",
+}
+
+
+# ------------------------------
+# Interactions
+# ------------------------------
+def _widget(at, kind, label):
+    return next(widget for widget in getattr(at, kind) if widget.label == label)
+
+
+def _select(label, option):
+    """Pick option number `option` of the selectbox labelled `label`."""
+    def action(at):
+        widget = _widget(at, "selectbox", label)
+        widget.select(widget.options[option])
+    return action
+
+
+def _set(kind, label, value):
+    def action(at):
+        _widget(at, kind, label).set_value(value)
+    return action
+
+
+def _expand(key, is_open=True):
+    def action(at):
+        at.session_state[key] = is_open
+    return action
+
+
+def _rerun(at):
+    pass
+
+
+HUSNA_CHAPTER = "Select Objective / Chapter:"
+
+INTERACTIONS = {
+    "Homepage.py": [
+        ("rerun", _rerun),
+        ("demographic: state", _select("Select Demographic Variable to Visualize", 5)),
+        ("open preview", _expand("home_preview")),
+        ("open summary statistics", _expand("home_describe")),
+    ],
+    "husna.py": [
+        ("rerun", _rerun),
+        ("summary: categorical", _select("Select summary type:", 1)),
+        ("correlation: employed", _select("Select Employment Status for Correlation Analysis:", 1)),
+        ("chapter: radar", _select(HUSNA_CHAPTER, 1)),
+        ("open uncertainty", _expand("husna_uncertainty")),
+        ("chapter: boxplots", _select(HUSNA_CHAPTER, 2)),
+        ("chapter: grouped bars", _select(HUSNA_CHAPTER, 3)),
+        ("chapter: community", _select(HUSNA_CHAPTER, 4)),
+        ("chapter: wellbeing", _select(HUSNA_CHAPTER, 5)),
+    ],
+    "adawiyah.py": [
+        ("rerun", _rerun),
+        ("search: selangor", _set("text_input", "Search data by any value:", "selangor")),
+        ("health range 2-4", _set("slider", "Filter by Overall Health Score", (2.0, 4.0))),
+        ("distribution pillar", _select("Select Pillar to View Distribution:", 1)),
+        ("collapse correlation", _expand("adawiyah_viz1", False)),
+    ],
+    "Atiqah.py": [
+        ("rerun", _rerun),
+        ("open uncertainty", _expand("atiqah_uncertainty")),
+    ],
+    "Hafizah.py": [
+        ("rerun", _rerun),
+        ("open preview", _expand("hafizah_preview")),
+    ],
+}
+
+
+# ------------------------------
+# One case (runs in a subprocess)
+# ------------------------------
+def _element_bytes(node):
+    """Serialised size of every element and block under `node`."""
+    proto = getattr(node, "proto", None)
+    total = proto.ByteSize() if proto is not None and hasattr(proto, "ByteSize") else 0
+    return total + sum(_element_bytes(child) for child in getattr(node, "children", {}).values())
+
+
+def _peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(page, timeout=TIMEOUT):
+    """Run `page` and its interactions; data comes from the environment's SSES_DATA_DIR."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(PAGES_DIR / page), default_timeout=timeout)
+
+    runs = []
+    for name, action in [("cold start", _rerun), *INTERACTIONS[page]]:
+        error = None
+        try:
+            action(at)
+            started = time.perf_counter()
+            at.run()
+            elapsed = time.perf_counter() - started
+        except Exception as exc:   # a broken interaction should not lose the other results
+            elapsed, error = None, f"{type(exc).__name__}: {exc}"
+        if error is None and len(at.exception):
+            error = at.exception[0].value
+        runs.append({
+            "action": name,
+            "ms": None if elapsed is None else round(elapsed * 1000, 1),
+            "bytes": _element_bytes(at._tree),
+            "error": error,
+        })
+    return {"runs": runs, "peak_rss_mb": round(_peak_rss_mb(), 1)}
+
+
+# ------------------------------
+# Driver
+# ------------------------------
+def synthesize(data_dir, rows, pages, seed=0):
+    """Write a synthetic version of each page's CSV, with `rows` rows, to `data_dir`."""
+    for page in pages:
+        source = DATASET_DIR / PAGE_DATA[page]
+        synthetic.write(Path(data_dir) / source.name, rows, synthetic.SurveyModel.from_csv(source), seed=seed)
+
+
+def _spawn(page, data_dir, timeout):
+    env = {
+        **os.environ,
+        "SSES_DATA_MODE": "offline",
+        "SSES_DATA_DIR": str(data_dir),
+        # A fresh frame cache per case, so every cold start parses the CSV
+        "SSES_CACHE_DIR": tempfile.mkdtemp(dir=data_dir, prefix="cache-"),
+    }
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.pages", "--case", page, "--timeout", str(timeout)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    wall = round(time.perf_counter() - started, 2)
+    if completed.returncode != 0:
+        return {"error": (completed.stderr.strip().splitlines() or ["failed"])[-1], "wall_seconds": wall}
+    # The case prints its JSON result as the last line; Streamlit may log above it
+    return {**json.loads(completed.stdout.strip().splitlines()[-1]), "wall_seconds": wall}
+
+
+def _metadata():
+    import streamlit
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run(rows_list, pages, timeout=TIMEOUT, log=sys.stderr):
+    results = []
+    for rows in rows_list:
+        with tempfile.TemporaryDirectory(prefix="sses-bench-") as data_dir:
+            print(f"Synthesising {rows:,} rows", file=log)
+            synthesize(data_dir, rows, pages)
+            for page in pages:
+                print(f"  {page}", file=log)
+                results.append({"page": page, "rows": rows, **_spawn(page, data_dir, timeout)})
+    return {"metadata": _metadata(), "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmark of the dashboard pages.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="dataset sizes to test")
+    parser.add_argument("--pages", nargs="+", default=list(PAGE_DATA), choices=list(PAGE_DATA))
+    parser.add_argument("--output", type=Path, help="write the JSON here instead of stdout")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="seconds allowed per run")
+    parser.add_argument("--case", choices=list(PAGE_DATA), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.timeout)))
+        return
+
+    report = json.dumps(run(args.rows, args.pages, args.timeout), indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
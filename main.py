@@ -4,17 +4,20 @@ import os
 import base64
 from pathlib import Path
 
+from sses import crossfilter, profiler, registry
+
 # ------------------------------
-# Load dataset into session_state w
+# Load dataset (shared by every session)
 # ------------------------------
 
 
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1_7nl2F8Vfd90h8ce2TreDW5D_m3WHr6vEFtg10xz3BI/export?format=csv&gid=1821075619"
-
-@st.cache_data(ttl=15)   # refresh every 15 seconds
+@profiler.timed("main: load_data")
 def load_data():
-    df = pd.read_csv(GOOGLE_SHEET_URL)
-    return df
+    # Served from the shared registry cache; polled every 15 seconds with a
+    # conditional request in the background, so an unchanged sheet is neither
+    # downloaded nor re-parsed and no rerun waits on the network. None while
+    # the sheet is unavailable (offline mode, or its last fetch failed).
+    return registry.poll_handle("raw_sheet")
 
 # SET PAGE CONFIG 
 st.set_page_config(
@@ -23,12 +26,17 @@ st.set_page_config(
     layout="wide"
 )
 
+# PROFILING (opt-in: SSES_PROFILE=1 or ?profile=1)
+profiler.start()
+
 # LOAD DATA
-if "df" not in st.session_state:
-    try:
-        st.session_state.df = load_data()
-    except Exception as e:
-        st.error(f"Error loading data: {e}")
+# Sessions keep only the data version they have seen, not their own copy, so
+# every viewer shares one frame and picks up refreshed data on the next rerun
+handle = load_data()
+if handle is not None:
+    if st.session_state.get("data_version") not in (None, handle.version):
+        st.toast("📥 New survey responses loaded")
+    st.session_state.data_version = handle.version
         
 # DEFINE PAGES 
 homepage = st.Page("pages/Homepage.py", title="Home", icon="🏠", default=True)
@@ -48,5 +56,13 @@ pg = st.navigation({
     ]
 })
 
+# GLOBAL FILTERS
+# Drawn here so the selection survives page switches; every page reads it
+# through crossfilter.view()
+crossfilter.render_sidebar()
+
 # RUN NAVIGATION
-pg.run()
+try:
+    pg.run()
+finally:
+    profiler.finish(pg.title)
@@ -1,9 +1,10 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from sses import aggplots, crossfilter, distplots, figcache, lazy, profiler, resampling
+
 # ===============================
 # PAGE CONFIG
 # ===============================
@@ -24,11 +25,16 @@ To compare factors that affect working sector between highest and lowest state o
 # ===============================
 # LOAD DATA FROM GITHUB
 # ===============================
-csv_url = "https://raw.githubusercontent.com/nhusna01/SSES-survey-dashboard/refs/heads/main/dataset/Atiqah_SSES_Cleaned.csv"
+@profiler.timed("Atiqah: load data")
+def load_data():
+    # Rows selected by the global sidebar filters (every row when none are set)
+    return crossfilter.view("atiqah")
 
 try:
-    df = pd.read_csv(csv_url)
+    view = load_data()
+    df = view.frame
     st.success("Dataset loaded successfully from GitHub!")
+    crossfilter.caption(view)
 except Exception as e:
     st.error(f"Error loading dataset: {e}")
     st.stop()
@@ -36,22 +42,38 @@ except Exception as e:
 # ===============================
 # DATA PREVIEW
 # ===============================
+profiler.checkpoint("Atiqah: preview", rows=len(view))
 st.subheader("📄 Dataset Preview")
 st.dataframe(df.head())
 
 # ===============================
-# FILTER STATES (SAFE COPY)
+# FILTER STATES
 # ===============================
-df_state = df[df['state'].isin(['Selangor', 'Pahang'])].copy()
+# Precomputed per-state masks; the selected rows are taken once (copy-on-write)
+filter_index = view.filter_index()
+df_state = df.iloc[filter_index.select(filter_index.isin('state', ['Selangor', 'Pahang']))]
+
+# State-level counts and means, precomputed once per data version and filter state
+state_cube = view.cube(dims=["state"])
+compared_states = sorted(['Selangor', 'Pahang'])
+
+# Every section compares the two states, so both need respondents
+state_sizes = state_cube.size('state')
+missing_states = [state for state in ['Selangor', 'Pahang'] if state_sizes.get(state, 0) == 0]
+if missing_states:
+    st.warning(f"No {' or '.join(missing_states)} respondents match the global filters; "
+               "this page compares Selangor with Pahang.")
+    st.stop()
 
 # ===============================
 # 📊 KEY PERFORMANCE INDICATORS
 # ===============================
+profiler.checkpoint("Atiqah: KPIs", rows=len(df_state))
 st.subheader("📊 Key Performance Indicators")
 
 # ---- Respondent count (SEPARATE, not combined)
-sel_count = df_state[df_state['state'] == 'Selangor'].shape[0]
-pah_count = df_state[df_state['state'] == 'Pahang'].shape[0]
+sel_count = state_sizes['Selangor']
+pah_count = state_sizes['Pahang']
 
 col1, col2 = st.columns(2)
 col1.metric("👥 Selangor Respondents", sel_count)
@@ -69,9 +91,8 @@ summary_vars = {
 }
 
 state_means = (
-    df_state
-    .groupby('state')[list(summary_vars.values())]
-    .mean()
+    state_cube
+    .mean('state', list(summary_vars.values()), levels=compared_states)
     .round(2)
 )
 
@@ -89,23 +110,47 @@ for label, var in summary_vars.items():
     )
 
 st.caption("Mean scores range from 1 (Low) to 5 (High).")
+
+# ---- Uncertainty of the Selangor - Pahang gaps (resampled only when opened)
+profiler.checkpoint("Atiqah: uncertainty", rows=len(df_state))
+with lazy.expander("🎲 How certain are these differences?", key="atiqah_uncertainty") as is_open:
+    if is_open:
+        gaps = resampling.compare(view, 'state', list(summary_vars.values()), groups=['Selangor', 'Pahang'])
+        gaps = gaps.assign(variable=gaps['variable'].map({v: k for k, v in summary_vars.items()}))
+        st.dataframe(
+            gaps[['variable', 'mean_a', 'mean_b', 'difference', 'ci_low', 'ci_high', 'p_value']]
+            .rename(columns={
+                'variable': 'Indicator', 'mean_a': 'Selangor', 'mean_b': 'Pahang',
+                'difference': 'Difference', 'ci_low': '95% CI (low)', 'ci_high': '95% CI (high)',
+                'p_value': 'p-value',
+            })
+            .round(3),
+            hide_index=True,
+        )
+        st.caption(
+            f"Bootstrap 95% confidence intervals ({resampling.N_BOOTSTRAP} resamples) and "
+            f"permutation p-values ({resampling.N_PERMUTATIONS} shuffles) for Selangor minus Pahang."
+        )
+
 st.divider()
 
 # ===============================
 # 1️⃣ AVERAGE EMOTIONAL WELLBEING
 # ===============================
+profiler.checkpoint("Atiqah: emotional wellbeing", rows=len(df_state))
 st.subheader("1️⃣ Average Emotional Wellbeing by State")
 
 emotion_vars = ['calm_under_pressure', 'emotional_control']
-state_emotion_mean = df_state.groupby('state')[emotion_vars].mean().reset_index()
+state_emotion_mean = state_cube.mean('state', emotion_vars, levels=compared_states).reset_index()
 
-fig1 = px.bar(
+# Figures are rebuilt only when the data or global filters change
+fig1 = figcache.figure(view, "atiqah_emotion", lambda: px.bar(
     state_emotion_mean,
     x='state',
     y=emotion_vars,
     barmode='group',
     title='Average Emotional Wellbeing Scores'
-)
+))
 st.plotly_chart(fig1, use_container_width=True)
 
 st.markdown("""
@@ -125,19 +170,21 @@ st.divider()
 # ===============================
 # 2️⃣ CALM UNDER PRESSURE (STACKED)
 # ===============================
+profiler.checkpoint("Atiqah: calm categories", rows=len(df_state))
 st.subheader("2️⃣ Calm Under Pressure Category Distribution")
 
-df_state['calm_cat'] = df_state['calm_under_pressure'].apply(
-    lambda x: 'Low' if x <= 2 else 'Medium' if x == 3 else 'High'
-)
+def build_calm_histogram():
+    # calm_cat is a derived feature (sses.features); counted per (state, category)
+    # here, so only the stacked bars are sent
+    return aggplots.histogram(
+        df_state,
+        x='state',
+        color='calm_cat',
+        barmode='stack',
+        title='Calm Under Pressure Categories by State'
+    )
 
-fig2 = px.histogram(
-    df_state,
-    x='state',
-    color='calm_cat',
-    barmode='stack',
-    title='Calm Under Pressure Categories by State'
-)
+fig2 = figcache.figure(view, "atiqah_calm", build_calm_histogram)
 st.plotly_chart(fig2, use_container_width=True)
 
 st.markdown("""
@@ -158,30 +205,28 @@ st.divider()
 # ===============================
 # 3️⃣ VIOLIN PLOTS
 # ===============================
+profiler.checkpoint("Atiqah: violins", rows=len(df_state))
 st.subheader("3️⃣ Distribution of Work Functioning by State")
 
 col1, col2 = st.columns(2)
 
-fig_tp = px.violin(
+# Individual points are summarised (KDE, quartiles, sample) once the data is large
+fig_tp = figcache.figure(view, "atiqah_violin_tp", lambda: distplots.violin(
     df_state,
     x='state',
     y='task_persistence',
     color='state',
-    box=True,
-    points='all',
     title='Task Persistence'
-)
+))
 col1.plotly_chart(fig_tp, use_container_width=True)
 
-fig_tw = px.violin(
+fig_tw = figcache.figure(view, "atiqah_violin_tw", lambda: distplots.violin(
     df_state,
     x='state',
     y='teamwork',
     color='state',
-    box=True,
-    points='all',
     title='Teamwork'
-)
+))
 col2.plotly_chart(fig_tw, use_container_width=True)
 
 st.markdown("""
@@ -202,37 +247,33 @@ st.divider()
 # ===============================
 # 4️⃣ OVERALL HEALTH (DONUT)
 # ===============================
+profiler.checkpoint("Atiqah: health donuts", rows=len(df_state))
 st.subheader("4️⃣ Overall Health Distribution")
 
-def health_category(x):
-    if x <= 2:
-        return 'Poor'
-    elif x == 3:
-        return 'Moderate'
-    else:
-        return 'Good'
+def build_health_donuts():
+    # overall_health_cat is a derived feature (sses.features)
+    health_counts = (
+        df_state.groupby(['state', 'overall_health_cat'], observed=True)
+        .size()
+        .reset_index(name='count')
+    )
 
-df_state['overall_health_cat'] = df_state['overall_health'].apply(health_category)
+    sel = health_counts[health_counts['state'] == 'Selangor']
+    pah = health_counts[health_counts['state'] == 'Pahang']
 
-health_counts = (
-    df_state.groupby(['state', 'overall_health_cat'])
-    .size()
-    .reset_index(name='count')
-)
-
-sel = health_counts[health_counts['state'] == 'Selangor']
-pah = health_counts[health_counts['state'] == 'Pahang']
+    fig = make_subplots(
+        rows=1, cols=2,
+        specs=[[{'type': 'domain'}, {'type': 'domain'}]],
+        subplot_titles=['Selangor', 'Pahang']
+    )
 
-fig4 = make_subplots(
-    rows=1, cols=2,
-    specs=[[{'type': 'domain'}, {'type': 'domain'}]],
-    subplot_titles=['Selangor', 'Pahang']
-)
+    fig.add_trace(go.Pie(labels=sel['overall_health_cat'], values=sel['count'], hole=0.4), 1, 1)
+    fig.add_trace(go.Pie(labels=pah['overall_health_cat'], values=pah['count'], hole=0.4), 1, 2)
 
-fig4.add_trace(go.Pie(labels=sel['overall_health_cat'], values=sel['count'], hole=0.4), 1, 1)
-fig4.add_trace(go.Pie(labels=pah['overall_health_cat'], values=pah['count'], hole=0.4), 1, 2)
+    fig.update_layout(title_text="Overall Health Comparison")
+    return fig
 
-fig4.update_layout(title_text="Overall Health Comparison")
+fig4 = figcache.figure(view, "atiqah_health", build_health_donuts)
 st.plotly_chart(fig4, use_container_width=True)
 
 st.markdown("""
@@ -251,24 +292,29 @@ st.divider()
 # ===============================
 # 5️⃣ RADAR CHART
 # ===============================
+profiler.checkpoint("Atiqah: radar", rows=len(df_state))
 st.subheader("5️⃣ Radar Chart: Overall Wellbeing")
 
 variables = list(summary_vars.values())
-state_means_radar = df_state.groupby('state')[variables].mean().reset_index()
-
-fig5 = go.Figure()
-for state in ['Selangor', 'Pahang']:
-    fig5.add_trace(go.Scatterpolar(
-        r=state_means_radar[state_means_radar['state'] == state][variables].values.flatten(),
-        theta=variables,
-        fill='toself',
-        name=state
-    ))
-
-fig5.update_layout(
-    polar=dict(radialaxis=dict(range=[1, 5])),
-    title="Radar Comparison of Wellbeing Indicators"
-)
+state_means_radar = state_cube.mean('state', variables, levels=compared_states).reset_index()
+
+def build_radar():
+    fig = go.Figure()
+    for state in ['Selangor', 'Pahang']:
+        fig.add_trace(go.Scatterpolar(
+            r=state_means_radar[state_means_radar['state'] == state][variables].values.flatten(),
+            theta=variables,
+            fill='toself',
+            name=state
+        ))
+
+    fig.update_layout(
+        polar=dict(radialaxis=dict(range=[1, 5])),
+        title="Radar Comparison of Wellbeing Indicators"
+    )
+    return fig
+
+fig5 = figcache.figure(view, "atiqah_radar", build_radar)
 st.plotly_chart(fig5, use_container_width=True)
 
 st.markdown("""
@@ -287,16 +333,17 @@ st.divider()
 # ===============================
 # 6️⃣ HEATMAP
 # ===============================
+profiler.checkpoint("Atiqah: heatmap", rows=len(df_state))
 st.subheader("6️⃣ Heatmap of Mean Wellbeing Scores")
 
-fig6 = px.imshow(
+fig6 = figcache.figure(view, "atiqah_heatmap", lambda: px.imshow(
     state_means_radar[variables],
     x=variables,
     y=state_means_radar['state'],
     text_auto=".2f",
     color_continuous_scale='RdBu',
     title="Heatmap of Mean Wellbeing Scores by State"
-)
+))
 st.plotly_chart(fig6, use_container_width=True)
 
 st.markdown("""
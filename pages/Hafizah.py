@@ -4,6 +4,8 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 
+from sses import correlation, crossfilter, figcache, lazy, profiler
+
 # ======================================
 # PAGE CONFIG
 # ======================================
@@ -34,13 +36,17 @@ and teamwork skills.
 # ======================================
 # DATA LOADING
 # ======================================
-DATA_URL = "https://raw.githubusercontent.com/nhusna01/SSES-survey-dashboard/main/dataset/Hafizah_SSES_Cleaned.csv"
-
-@st.cache_data
+@profiler.timed("Hafizah: load data")
 def load_data():
-    return pd.read_csv(DATA_URL)
+    # Rows selected by the global sidebar filters (every row when none are set)
+    return crossfilter.view("hafizah")
 
-df = load_data()
+view = load_data()
+df = view.frame
+crossfilter.caption(view)
+if df.empty:
+    st.warning("No respondents match the global filters.")
+    st.stop()
 
 attributes = [
     "calm_under_pressure",
@@ -51,8 +57,12 @@ attributes = [
     "teamwork"
 ]
 
-df[attributes] = df[attributes].apply(pd.to_numeric, errors="coerce")
-df[attributes] = df[attributes].fillna(df[attributes].median())
+def attribute_scores(frame):
+    scores = frame[attributes].apply(pd.to_numeric, errors="coerce")
+    return scores.fillna(scores.median())
+
+# Median-imputed once per data version and filter state, not on every rerun
+scores = view.artifact("attribute_scores", attribute_scores)
 
 # ======================================
 # DATASET OVERVIEW
@@ -66,19 +76,29 @@ st.info(f"""
 • **Focus Area:** Emotional resilience & personal development
 """)
 
-with st.expander("🔍 Dataset Preview"):
-    st.dataframe(df[attributes].head(10), use_container_width=True)
+profiler.checkpoint("Hafizah: preview", rows=len(view))
+with lazy.expander("🔍 Dataset Preview", key="hafizah_preview") as is_open:
+    if is_open:
+        st.dataframe(scores.head(10), use_container_width=True)
 
 # ======================================
 # KEY DATASET METRICS
 # ======================================
+profiler.checkpoint("Hafizah: KPIs", rows=len(view))
 st.markdown("### 📈 Key Dataset Metrics")
 
 col1, col2, col3, col4 = st.columns(4)
-overall_mean = df[attributes].mean().mean()
-strongest_attr = df[attributes].mean().idxmax().replace("_", " ").title()
-weakest_attr = df[attributes].mean().idxmin().replace("_", " ").title()
-overall_sd = df[attributes].stack().std()
+# Read from the dataset's running statistics (median-imputed, as above)
+# instead of scanning the attribute columns on every rerun; the rows are
+# only read, once per view, for medians the level counts cannot give
+moments = view.moments()
+attribute_stats = view.artifact("attribute_moments",
+                                lambda frame: moments.median_imputed(attributes, frame=frame))
+attribute_means = attribute_stats.mean(attributes)
+overall_mean = attribute_means.mean()
+strongest_attr = attribute_means.idxmax().replace("_", " ").title()
+weakest_attr = attribute_means.idxmin().replace("_", " ").title()
+overall_sd = attribute_stats.pooled(attributes).std().iloc[0]
 
 col1.metric("Overall Mean Score", f"{overall_mean:.2f}")
 col2.metric("Strongest Attribute", strongest_attr)
@@ -90,18 +110,23 @@ st.markdown("---")
 # ======================================
 # 1️⃣ LIKERT DISTRIBUTION
 # ======================================
+profiler.checkpoint("Hafizah: Likert distribution", rows=len(view))
 st.subheader("1️⃣ Likert-Scale Distribution of Attributes")
 st.markdown("**Purpose:** To examine response patterns across agreement levels.")
 
-likert_dist = df[attributes].apply(lambda x: x.value_counts(normalize=True)).T
-likert_dist = likert_dist.reindex(columns=[1,2,3,4,5], fill_value=0)
+def build_likert_dist(frame):
+    likert_dist = scores.apply(lambda x: x.value_counts(normalize=True)).T
+    return likert_dist.reindex(columns=[1,2,3,4,5], fill_value=0).astype(float)
 
-fig1 = px.bar(
+likert_dist = view.artifact("attribute_likert_dist", build_likert_dist)
+
+# Figures are rebuilt only when the data or global filters change
+fig1 = figcache.figure(view, "hafizah_likert", lambda: px.bar(
     likert_dist,
     barmode="stack",
     labels={"value": "Proportion", "index": "Attribute"},
     title="Distribution of Emotional Resilience Attributes"
-)
+))
 st.plotly_chart(fig1, use_container_width=True)
 
 st.markdown("### 📋 Key Findings: Likert Distribution")
@@ -117,30 +142,39 @@ personal development tendencies among respondents.
 # ======================================
 # 2️⃣ RADAR CHART
 # ======================================
+profiler.checkpoint("Hafizah: radar", rows=len(view))
 st.subheader("2️⃣ Average Emotional Resilience Profile")
 st.markdown("**Purpose:** To compare average strength of multiple attributes simultaneously.")
 
-mean_scores = df[attributes].mean()
-
-fig2 = go.Figure(go.Scatterpolar(
-    r=mean_scores.tolist() + [mean_scores[0]],
-    theta=[a.replace("_"," ").title() for a in attributes] +
-          [attributes[0].replace("_"," ").title()],
-    fill="toself"
-))
-fig2.update_layout(
-    polar=dict(radialaxis=dict(range=[0,5])),
-    showlegend=False
-)
+mean_scores = attribute_means
+
+def build_radar():
+    fig = go.Figure(go.Scatterpolar(
+        r=mean_scores.tolist() + [mean_scores.iloc[0]],
+        theta=[a.replace("_"," ").title() for a in attributes] +
+              [attributes[0].replace("_"," ").title()],
+        fill="toself"
+    ))
+    fig.update_layout(
+        polar=dict(radialaxis=dict(range=[0,5])),
+        showlegend=False
+    )
+    return fig
+
+fig2 = figcache.figure(view, "hafizah_radar", build_radar)
 st.plotly_chart(fig2, use_container_width=True)
 
+# Spread of the imputed scores, shared by the descriptive and variability tables
+spread = view.artifact("attribute_spread", lambda frame: scores.agg(["std", "min", "max"]).T.assign(
+    iqr=scores.quantile(0.75) - scores.quantile(0.25)))
+
 st.markdown("### 📋 Key Findings: Descriptive Statistics")
 desc_table = pd.DataFrame({
     "Attribute": [a.replace("_"," ").title() for a in attributes],
     "Mean": mean_scores.round(2).values,
-    "Std Dev": df[attributes].std().round(2).values,
-    "Min": df[attributes].min().values,
-    "Max": df[attributes].max().values
+    "Std Dev": spread["std"].round(2).values,
+    "Min": spread["min"].values,
+    "Max": spread["max"].values
 }).sort_values(by="Mean", ascending=False)
 
 st.dataframe(desc_table, use_container_width=True)
@@ -155,16 +189,18 @@ allowing multidimensional comparison in a single visual.
 # ======================================
 # 3️⃣ CORRELATION HEATMAP
 # ======================================
+profiler.checkpoint("Hafizah: correlation", rows=len(view))
 st.subheader("3️⃣ Correlation Between Attributes")
 st.markdown("**Purpose:** To identify relationships among emotional resilience attributes.")
 
-corr = df[attributes].corr()
-fig3 = px.imshow(
+# Computed once per data version from the same median-imputed scores as above
+corr = correlation.matrix(view, attributes, impute="median")
+fig3 = figcache.figure(view, "hafizah_corr", lambda: px.imshow(
     corr,
     text_auto=".2f",
     color_continuous_scale="RdBu_r",
     title="Correlation Matrix"
-)
+))
 st.plotly_chart(fig3, use_container_width=True)
 
 st.markdown("### 📋 Key Findings: Strongest Correlations")
@@ -189,18 +225,21 @@ development factors.
 # ======================================
 # 4️⃣ VARIABILITY (BOXPLOT)
 # ======================================
+profiler.checkpoint("Hafizah: boxplot", rows=len(view))
 st.subheader("4️⃣ Distribution & Variability Analysis")
 st.markdown("**Purpose:** To examine score spread and consistency across respondents.")
 
-melted = df.melt(value_vars=attributes, var_name="Attribute", value_name="Score")
-fig4 = px.box(melted, x="Attribute", y="Score", color="Attribute")
+fig4 = figcache.figure(view, "hafizah_box", lambda: px.box(
+    scores.melt(var_name="Attribute", value_name="Score"),
+    x="Attribute", y="Score", color="Attribute"
+))
 st.plotly_chart(fig4, use_container_width=True)
 
 st.markdown("### 📋 Key Findings: Variability Summary")
 variability_table = pd.DataFrame({
     "Attribute": [a.replace("_"," ").title() for a in attributes],
-    "IQR": (df[attributes].quantile(0.75) - df[attributes].quantile(0.25)).round(2).values,
-    "Std Dev": df[attributes].std().round(2).values
+    "IQR": spread["iqr"].round(2).values,
+    "Std Dev": spread["std"].round(2).values
 })
 st.dataframe(variability_table, use_container_width=True)
 
@@ -213,6 +252,7 @@ while wider spreads suggest variation in individual emotional resilience experie
 # ======================================
 # 5️⃣ SENTIMENT ANALYSIS
 # ======================================
+profiler.checkpoint("Hafizah: sentiment", rows=len(view))
 st.subheader("5️⃣ Sentiment Analysis (Agreement vs Disagreement)")
 st.markdown("**Purpose:** To separate agreement, neutrality, and disagreement clearly.")
 
@@ -224,18 +264,22 @@ def sentiment(col):
         "Agree (%)": (counts[4] + counts[5]) * 100
     })
 
-sentiment_df = df[attributes].apply(sentiment).T.reset_index()
-sentiment_df.rename(columns={"index":"Attribute"}, inplace=True)
-sentiment_df["Attribute"] = sentiment_df["Attribute"].str.replace("_"," ").str.title()
+def build_sentiment(frame):
+    sentiment_df = scores.apply(sentiment).T.reset_index()
+    sentiment_df.rename(columns={"index":"Attribute"}, inplace=True)
+    sentiment_df["Attribute"] = sentiment_df["Attribute"].str.replace("_"," ").str.title()
+    return sentiment_df
+
+sentiment_df = view.artifact("attribute_sentiment", build_sentiment)
 
-fig5 = px.bar(
+fig5 = figcache.figure(view, "hafizah_sentiment", lambda: px.bar(
     sentiment_df,
     x=["Disagree (%)","Neutral (%)","Agree (%)"],
     y="Attribute",
     orientation="h",
     barmode="relative",
     title="Diverging Likert Sentiment"
-)
+))
 st.plotly_chart(fig5, use_container_width=True)
 
 st.markdown("### 📋 Key Findings: Sentiment Breakdown")
@@ -250,6 +294,7 @@ resilience perceptions, while neutral responses indicate areas where opinions ar
 # ======================================
 # 6️⃣ ATTRIBUTE PRIORITY (TREEMAP)
 # ======================================
+profiler.checkpoint("Hafizah: treemap", rows=len(view))
 st.subheader("6️⃣ Attribute Priority Ranking")
 st.markdown("**Purpose:** To rank attributes based on relative strength.")
 
@@ -258,13 +303,13 @@ priority_df = pd.DataFrame({
     "Mean Score": mean_scores.round(2).values
 }).sort_values(by="Mean Score", ascending=False)
 
-fig6 = px.treemap(
+fig6 = figcache.figure(view, "hafizah_priority", lambda: px.treemap(
     priority_df,
     path=["Attribute"],
     values="Mean Score",
     color="Mean Score",
     color_continuous_scale="Blues"
-)
+))
 st.plotly_chart(fig6, use_container_width=True)
 
 st.markdown("### 📋 Key Findings: Attribute Ranking")
@@ -281,6 +326,7 @@ lower-ranked attributes highlight potential areas for targeted personal developm
 # CONCLUSION
 # ======================================
 st.markdown("---")
+profiler.checkpoint("Hafizah: conclusion")
 st.subheader("🏁 Conclusion")
 
 st.success(f"""
@@ -3,12 +3,7 @@ import plotly.express as px
 import pandas as pd
 import os
 
-# Check if data exists in session state before proceeding
-if "df" not in st.session_state:
-    st.error("Dataset not loaded. Please select a dataset first in the main app.")
-    st.stop()
-
-df = st.session_state.df
+from sses import aggplots, crossfilter, lazy, profiler, registry
 
 # Header + logo
 st.markdown("""
@@ -78,33 +73,52 @@ st.markdown('<div class="animated-divider"></div>', unsafe_allow_html=True)
 # 🔗 Dataset Selector (Cleaned / Raw)
 # ------------------------------
 st.markdown("## 📋 Select Dataset to Work With")
+# The Google Sheet datasets are left out while the sheet cannot be reached
+dataset_names = {"Cleaned Dataset": "group", "Raw Dataset": "raw_sheet", "Live Cleaned Dataset": "sheet_cleaned"}
 dataset_option = st.selectbox(
     "Choose dataset:",
-    options=["Cleaned Dataset", "Raw Dataset"]
+    options=[option for option, name in dataset_names.items() if registry.available(name)]
 )
 
+profiler.checkpoint("Home: load data")
 if dataset_option == "Cleaned Dataset":
     # Cleaned dataset from GitHub raw URL
-    cleaned_url = "https://raw.githubusercontent.com/nhusna01/SSES-survey-dashboard/refs/heads/main/dataset/cleaned_group_survey_data.csv"
     try:
-        df_current = pd.read_csv(cleaned_url)
+        view = crossfilter.view("group")
     except Exception as e:
         st.error(f"Error loading cleaned dataset from GitHub: {e}")
         st.stop()
-else:
+elif dataset_option == "Raw Dataset":
     # Raw dataset from Google Sheet URL
-    GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1_7nl2F8Vfd90h8ce2TreDW5D_m3WHr6vEFtg10xz3BI/export?format=csv&gid=1821075619"
     try:
-        df_current = pd.read_csv(GOOGLE_SHEET_URL)
+        view = crossfilter.view("raw_sheet")
     except Exception as e:
         st.error(f"Error loading raw dataset from Google Sheet: {e}")
         st.stop()
+else:
+    # Google Sheet cleaned in-process by the pipeline in sses/cleaning.py
+    try:
+        view = crossfilter.view("sheet_cleaned")
+    except Exception as e:
+        st.error(f"Error cleaning raw dataset from Google Sheet: {e}")
+        st.stop()
+
+# Rows selected by the global sidebar filters (every row when none are set)
+df_current = view.frame
+crossfilter.caption(view)
+
+# Missing-value counts: the raw sheet keeps them up to date as rows arrive
+if dataset_option == "Raw Dataset" and not view.is_filtered:
+    missing_counts = registry.get_summary("raw_sheet").missing.reindex(df_current.columns, fill_value=0)
+else:
+    missing_counts = df_current.isna().sum()
 
 
 # ------------------------------
 # 📌 Dashboard Overview (Summary Boxes)
 # ------------------------------
 st.markdown("---")
+profiler.checkpoint("Home: overview", rows=len(view))
 st.subheader("📌 Dashboard Overview")
 
 st.markdown(
@@ -120,18 +134,28 @@ st.markdown(
         </div>
         <div style="border: 1px solid #ddd; border-radius: 10px; padding: 1rem; flex:1; text-align:center;">
             <h3>⚠️ Missing Values</h3>
-            <p style="font-size:24px; font-weight:bold;">{df_current.isna().sum().sum()}</p>
+            <p style="font-size:24px; font-weight:bold;">{missing_counts.sum()}</p>
         </div>
     </div>
     """, unsafe_allow_html=True
 )
 
+# Memory saved by the compact schema applied at load time
+reports = registry.schema_reports().set_index("dataset")
+if dataset_names[dataset_option] in reports.index:
+    report = reports.loc[dataset_names[dataset_option]]
+    st.caption(
+        f"In memory: {report['bytes_after'] / 1024:,.1f} KB "
+        f"({report['bytes_saved'] / 1024:,.1f} KB saved by the typed schema, {report['ratio']}x smaller)"
+    )
+
 # ------------------------------
 # ⚠️ Inspect Missing Values Table
 # ------------------------------
 st.markdown("---")
+profiler.checkpoint("Home: missing values", rows=len(view))
 st.subheader("⚠️ Inspect Missing Values")
-missing_df = df_current.isna().sum().reset_index()
+missing_df = missing_counts.reset_index()
 missing_df.columns = ["Variable", "Missing Values"]
 missing_df = missing_df[missing_df["Missing Values"] > 0]
 
@@ -144,36 +168,44 @@ else:
 # 🔍 View Dataset Preview
 # ------------------------------
 st.markdown("---")
+profiler.checkpoint("Home: preview", rows=len(view))
 st.subheader("🔍 View Dataset Preview")
-with st.expander("Click to expand dataset preview"):
-    st.dataframe(df_current, use_container_width=True, height=400)
+# Collapsed expanders are skipped entirely: nothing is serialised until opened
+with lazy.expander("Click to expand dataset preview", key="home_preview") as is_open:
+    if is_open:
+        st.dataframe(df_current, use_container_width=True, height=400)
 
 # ------------------------------
 # 🧩 View Variables Available 
 # ------------------------------
 st.markdown("---")
+profiler.checkpoint("Home: variables", rows=len(view))
 st.subheader("🧩 View Variables Available")
 
-with st.expander("Click to expand and view all variables"):
-    # Create a DataFrame of variable names only
-    var_df = pd.DataFrame({"Variable Name": df_current.columns})
-    st.dataframe(var_df, use_container_width=True, height=300)
+with lazy.expander("Click to expand and view all variables", key="home_variables") as is_open:
+    if is_open:
+        # Create a DataFrame of variable names only
+        var_df = pd.DataFrame({"Variable Name": df_current.columns})
+        st.dataframe(var_df, use_container_width=True, height=300)
 
 
 # ------------------------------
 # 📈 View Summary Statistics
 # ------------------------------
 st.markdown("---")
+profiler.checkpoint("Home: summary statistics", rows=len(view))
 st.subheader("📈 View Summary Statistics")
 
 # Select only numeric columns
-numeric_cols = df_current.select_dtypes(include=['int64', 'float64']).columns
+numeric_cols = df_current.select_dtypes(include='number').columns
 
 if len(numeric_cols) == 0:
     st.warning("No numeric columns available in this dataset.")
 else:
-    with st.expander("Click to expand summary statistics"):
-        st.write(df_current[numeric_cols].describe().transpose())
+    with lazy.expander("Click to expand summary statistics", key="home_describe") as is_open:
+        if is_open:
+            # describe() is reused until the dataset or global filters change
+            st.write(lazy.memo("home_describe", view, lambda: df_current[numeric_cols].describe().transpose()))
 
 
 # ------------------------------
@@ -181,6 +213,7 @@ else:
 # ------------------------------
 
 st.markdown("---")
+profiler.checkpoint("Home: demographics", rows=len(view))
 st.subheader("👥 Demographic Analysis")
 
 # --- Normalize column names ---
@@ -211,7 +244,8 @@ if available_demo_cols:
     col1, col2 = st.columns([2, 1])
 
     with col1:
-        fig = px.pie(
+        # Slice sizes are counted here; only one value per slice is sent
+        fig = aggplots.pie(
             df_current,
             names=demo_col,
             hole=0.4,
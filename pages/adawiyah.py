@@ -3,6 +3,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from sses import correlation, crossfilter, distplots, lazy, profiler
+
 
 # Page Configuration
 st.set_page_config(page_title="Social & Emotional Impact Analysis", layout="wide")
@@ -68,18 +70,19 @@ st.markdown("---")
 # Initialize df as an empty DataFrame at the very start
 df = pd.DataFrame() 
 
-csv_url = "https://raw.githubusercontent.com/nhusna01/SSES-survey-dashboard/refs/heads/main/dataset/Adawiyah_SSES_cleaned.csv"
-
-@st.cache_data  
-def fetch_data(url):
-    data = pd.read_csv(url)
-    # ... (your indexing logic here) ...
-    return data
+@profiler.timed("adawiyah: fetch data")
+def fetch_data(name):
+    # Rows selected by the global sidebar filters (every row when none are set)
+    return crossfilter.view(name)
 
 # Attempt to fill 'df' with real data
 with st.spinner("Accessing Research Data..."):
     try:
-        df = fetch_data(csv_url)
+        view = fetch_data("adawiyah")
+        df = view.frame
+        crossfilter.caption(view)
+        if df.empty:
+            st.warning("No respondents match the global filters.")
     except Exception as e:
         st.error(f"Connection Error: {e}")
         
@@ -104,41 +107,48 @@ if not df.empty:
             use_container_width=True
         )
     # Data Preview Expander 
-    with st.expander("🔍 Preview & Filter Raw Dataset", expanded=True):
+    # Only built while open; collapsing it skips the section on every rerun
+    profiler.checkpoint("adawiyah: preview", rows=len(df))
+    with lazy.expander("🔍 Preview & Filter Raw Dataset", key="adawiyah_preview", expanded=True) as is_open:
+        if is_open:
         
-        # DATASET DESCRIPTION BOX
-        st.markdown("""
-            <div style="background-color: #FFF0F5; padding: 15px; border-radius: 10px; border-left: 5px solid #FFB6C1; margin-bottom: 20px;">
-                <p style="margin: 0; color: #333; font-size: 15px;">
-                    <b>About this Dataset:</b> This cleaned dataset contains survey responses that focused on 
-                    social-emotional well-being. It captures how individuals perceive their <b>social networks</b>, 
-                    <b>environmental safety</b>, and their internal ability to <b>manage emotions</b>.
-                </p>
-            </div>
-        """, unsafe_allow_html=True)
-
-        # Search and Filtering Logic
-        search_query = st.text_input("Search data by any value:", placeholder="Search by state, education level, or scores...")
+            # DATASET DESCRIPTION BOX
+            st.markdown("""
+                <div style="background-color: #FFF0F5; padding: 15px; border-radius: 10px; border-left: 5px solid #FFB6C1; margin-bottom: 20px;">
+                    <p style="margin: 0; color: #333; font-size: 15px;">
+                        <b>About this Dataset:</b> This cleaned dataset contains survey responses that focused on 
+                        social-emotional well-being. It captures how individuals perceive their <b>social networks</b>, 
+                        <b>environmental safety</b>, and their internal ability to <b>manage emotions</b>.
+                    </p>
+                </div>
+            """, unsafe_allow_html=True)
+
+            # Search and Filtering Logic
+            search_query = st.text_input(
+                "Search data by any value:",
+                placeholder="Search by state, education level, or scores...",
+                help="Terms must all match. Use `state:Selangor` to search one column and `sel*` to match the start of a value."
+            )
         
-        # Apply search filter
-        if search_query:
-            # Filters the dataframe if any column contains the search string
-            df_display = df[df.apply(lambda row: row.astype(str).str.contains(search_query, case=False).any(), axis=1)]
-            st.info(f"Showing {len(df_display)} matching results:")
-        else:
-            # Default view - showing first 10 rows to keep it clean
-            df_display = df.head(10)
-            st.caption("Showing first 10 rows. Use the search bar above to filter all records.")
-
-        # Display the table with interactive features
-        st.dataframe(
-            df_display, 
-            use_container_width=True,
-            column_config={
-                "life_satisfaction": st.column_config.NumberColumn("Satisfaction"),
-                "overall_health": st.column_config.NumberColumn("Health")
-            }
-        )
+            # Apply search filter
+            if search_query:
+                # Rows where any column contains the search string (prebuilt index)
+                df_display = df.iloc[view.search_index().search(search_query)]
+                st.info(f"Showing {len(df_display)} matching results:")
+            else:
+                # Default view - showing first 10 rows to keep it clean
+                df_display = df.head(10)
+                st.caption("Showing first 10 rows. Use the search bar above to filter all records.")
+
+            # Display the table with interactive features
+            st.dataframe(
+                df_display, 
+                use_container_width=True,
+                column_config={
+                    "life_satisfaction": st.column_config.NumberColumn("Satisfaction"),
+                    "overall_health": st.column_config.NumberColumn("Health")
+                }
+            )
 
 st.markdown("---")
 
@@ -150,30 +160,36 @@ if not df.empty:
     st.sidebar.write("Adjust the range to update the key metrics")
     
     # Example: Filtering by Overall Health Score to see how it impacts other metrics
+    # Precomputed filter masks give the slider bounds without scanning the column
+    filter_index = view.filter_index()
+
     if 'overall_health' in df.columns:
-        min_health = float(df['overall_health'].min())
-        max_health = float(df['overall_health'].max())
+        min_health, max_health = filter_index.bounds('overall_health')
         
         health_range = st.sidebar.slider(
             "Filter by Overall Health Score",
             min_health, max_health, (min_health, max_health)
         )
         
-        # Apply the filter to the dataframe
-        df_filtered = df[(df['overall_health'] >= health_range[0]) & (df['overall_health'] <= health_range[1])]
+        # KPI statistics kept per health score and merged over the selected range
+        kpi_stats = view.moments(by='overall_health').between(*health_range)
     else:
-        df_filtered = df
+        kpi_stats = view.moments()
 
+    profiler.checkpoint("adawiyah: KPIs", rows=len(df))
     st.subheader("Key Performance Indicators")
 
     # Layout: Summary Metrics in clean columns
     col1, col2, col3, col4 = st.columns(4)
 
-    # Calculations based on FILTERED data
-    avg_life_sat = df_filtered['life_satisfaction'].mean() if 'life_satisfaction' in df_filtered else 0
-    avg_social = df_filtered['social_support_index'].mean() if 'social_support_index' in df_filtered else 0
-    avg_safety = df_filtered['community_safety_index'].mean() if 'community_safety_index' in df_filtered else 0
-    avg_emotion = df_filtered['emotion_management_index'].mean() if 'emotion_management_index' in df_filtered else 0
+    # Calculations based on FILTERED rows
+    def filtered_mean(col):
+        return kpi_stats.mean([col]).iloc[0] if col in df else 0
+
+    avg_life_sat = filtered_mean('life_satisfaction')
+    avg_social = filtered_mean('social_support_index')
+    avg_safety = filtered_mean('community_safety_index')
+    avg_emotion = filtered_mean('emotion_management_index')
 
     # Custom CSS to make the metric boxes even neater
     st.markdown("""
@@ -229,343 +245,347 @@ st.markdown("---")
 st.markdown("### Research Visualizations")
 
 # VISUALIZATION 1: CORRELATION HEATMAP 
-with st.expander("Visualization 1: Correlation Heatmap", expanded=True):
+# The indices are derived features (sses.features), computed once per data version
+
+profiler.checkpoint("adawiyah: viz1 correlation", rows=len(df))
+with lazy.expander("Visualization 1: Correlation Heatmap", key="adawiyah_viz1", expanded=True) as is_open:
+    if is_open:
     
-    # Ensure indices are defined before plotting
-    # (Calculated here just in case they weren't defined earlier in your script)
-    if 'social_support_index' not in df.columns:
-        df['social_support_index'] = df[['social_support', 'social_time', 'community_care']].mean(axis=1)
-    if 'community_safety_index' not in df.columns:
-        df['community_safety_index'] = df[['neighborhood_safety', 'community_care']].mean(axis=1)
-    if 'emotion_management_index' not in df.columns:
-        df['emotion_management_index'] = df[['calm_under_pressure', 'emotional_control']].mean(axis=1)
-
-    viz1_cols = ['life_satisfaction', 'social_support_index', 'community_safety_index', 'emotion_management_index', 'overall_health']
-    available_viz_cols = [col for col in viz1_cols if col in df.columns]
-
-    if len(available_viz_cols) > 1:
-        corr_matrix = df[available_viz_cols].corr()
-
-        # Create Heatmap
-        fig1 = px.imshow(
-            corr_matrix, 
-            text_auto=".2f", 
+        viz1_cols = ['life_satisfaction', 'social_support_index', 'community_safety_index', 'emotion_management_index', 'overall_health']
+        available_viz_cols = [col for col in viz1_cols if col in df.columns]
+
+        if len(available_viz_cols) > 1:
+            # Sliced from the matrix cached for this data version and filter state
+            corr_matrix = correlation.matrix(view, available_viz_cols)
+
+            # Create Heatmap
+            fig1 = px.imshow(
+                corr_matrix, 
+                text_auto=".2f", 
+                color_continuous_scale='Reds', 
+                aspect="auto",
+                zmin=0, zmax=1,
+                labels=dict(color="Correlation Strength") # This names the color indicator
+            )
+
+            # Customizing the color bar 
+            fig1.update_layout(
+                title="<b>Variable Correlation Analysis</b>",
+                title_x=0.5,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                coloraxis_colorbar=dict(
+                    title="Strength",
+                    tickvals=[0, 0.5, 1],
+                    ticktext=["Weak (White)", "Medium", "Strong (Red)"], # Directly tells the user what colors mean
+                    lenmode="pixels", len=300,
+                )
+            )
+
+            # Simplified layout: Just the chart 
+            st.plotly_chart(fig1, use_container_width=True, key="heatmap_1")
+
+            # Interpretation Box
+            st.markdown(f"""
+                <div style="background-color: #FFF0F5; padding: 15px; border-radius: 10px; border-left: 5px solid #FFB6C1;">
+                    <p style="margin: 0; color: #333;">
+                        <b>Interpretation:</b> Health, emotional control, and social safety are all factors that contribute to life satisfaction. 
+                        Safety and support have a strong <b>0.68 correlation</b>, proving that community-level security is a directly correlated with  social connection.
+                    </p>
+                </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.warning("Not enough data to generate correlation heatmap.")
+
+# VISUALIZATION 2: SOCIAL & COMMUNITY IMPACT
+profiler.checkpoint("adawiyah: viz2 social impact", rows=len(df))
+with lazy.expander("Visualization 2: Social & Community Impact", key="adawiyah_viz2", expanded=True) as is_open:
+    if is_open:
+    
+        # Simplified Scatter Plot
+        fig2 = px.scatter(
+            df,
+            x='social_support_index',
+            y='life_satisfaction',
+            color='community_safety_index',
+            opacity=0.8,
             color_continuous_scale='Reds', 
-            aspect="auto",
-            zmin=0, zmax=1,
-            labels=dict(color="Correlation Strength") # This names the color indicator
+            labels={
+                'social_support_index': 'Support Score', 
+                'life_satisfaction': 'Satisfaction', 
+                'community_safety_index': 'Safety Level'
+            }
         )
 
-        # Customizing the color bar 
-        fig1.update_layout(
-            title="<b>Variable Correlation Analysis</b>",
+        # Integrated Color Indicator 
+        fig2.update_layout(
+            title="<b>Impact of Support & Safety on Satisfaction</b>",
             title_x=0.5,
-            plot_bgcolor='rgba(0,0,0,0)',
             paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
             coloraxis_colorbar=dict(
-                title="Strength",
-                tickvals=[0, 0.5, 1],
-                ticktext=["Weak (White)", "Medium", "Strong (Red)"], # Directly tells the user what colors mean
-                lenmode="pixels", len=300,
+                title="Community Safety",
+                tickvals=[df['community_safety_index'].min(), df['community_safety_index'].max()],
+                ticktext=["Low Safety (Light)", "High Safety (Dark Red)"],
+                lenmode="pixels", len=200,
             )
         )
 
-        # Simplified layout: Just the chart 
-        st.plotly_chart(fig1, use_container_width=True, key="heatmap_1")
+        # Display the chart full-width (No side columns)
+        st.plotly_chart(fig2, use_container_width=True, key="scatter_viz_2")
+
+    
 
         # Interpretation Box
         st.markdown(f"""
-            <div style="background-color: #FFF0F5; padding: 15px; border-radius: 10px; border-left: 5px solid #FFB6C1;">
+            <div style="background-color: #FFF0F5 ; padding: 15px; border-radius: 10px; border-left: 5px solid #FFB6C1;">
                 <p style="margin: 0; color: #333;">
-                    <b>Interpretation:</b> Health, emotional control, and social safety are all factors that contribute to life satisfaction. 
-                    Safety and support have a strong <b>0.68 correlation</b>, proving that community-level security is a directly correlated with  social connection.
+                    <b>Interpretation:</b> The distribution demonstrates that life satisfaction generally rises in line with social support.
+                    Furthermore, the concentration of <b>darker red dots</b> (High Safety) at greater satisfaction levels indicates that overall well-being is significantly strengthened by community safety.
                 </p>
             </div>
         """, unsafe_allow_html=True)
-    else:
-        st.warning("Not enough data to generate correlation heatmap.")
-
-# VISUALIZATION 2: SOCIAL & COMMUNITY IMPACT
-with st.expander("Visualization 2: Social & Community Impact", expanded=True):
-    
-    # Ensure indices are calculated
-    df['social_support_index'] = df[['social_support', 'social_time', 'community_care']].mean(axis=1)
-    df['community_safety_index'] = df[['neighborhood_safety', 'community_care']].mean(axis=1)
-
-    # Simplified Scatter Plot
-    fig2 = px.scatter(
-        df,
-        x='social_support_index',
-        y='life_satisfaction',
-        color='community_safety_index',
-        opacity=0.8,
-        color_continuous_scale='Reds', 
-        labels={
-            'social_support_index': 'Support Score', 
-            'life_satisfaction': 'Satisfaction', 
-            'community_safety_index': 'Safety Level'
-        }
-    )
-
-    # Integrated Color Indicator 
-    fig2.update_layout(
-        title="<b>Impact of Support & Safety on Satisfaction</b>",
-        title_x=0.5,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        coloraxis_colorbar=dict(
-            title="Community Safety",
-            tickvals=[df['community_safety_index'].min(), df['community_safety_index'].max()],
-            ticktext=["Low Safety (Light)", "High Safety (Dark Red)"],
-            lenmode="pixels", len=200,
-        )
-    )
-
-    # Display the chart full-width (No side columns)
-    st.plotly_chart(fig2, use_container_width=True, key="scatter_viz_2")
-
-    
-
-    # Interpretation Box
-    st.markdown(f"""
-        <div style="background-color: #FFF0F5 ; padding: 15px; border-radius: 10px; border-left: 5px solid #FFB6C1;">
-            <p style="margin: 0; color: #333;">
-                <b>Interpretation:</b> The distribution demonstrates that life satisfaction generally rises in line with social support.
-                Furthermore, the concentration of <b>darker red dots</b> (High Safety) at greater satisfaction levels indicates that overall well-being is significantly strengthened by community safety.
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
 
 
 # VISUALIZATION 3: DYNAMIC DISTRIBUTION (Histogram)
-with st.expander("Visualization 3: Distribution of Scores", expanded=True):
+profiler.checkpoint("adawiyah: viz3 distribution", rows=len(df))
+with lazy.expander("Visualization 3: Distribution of Scores", key="adawiyah_viz3", expanded=True) as is_open:
+    if is_open:
     
-    # Selection Menu
-    selected_dist = st.selectbox(
-        "Select Pillar to View Distribution:", 
-        ['life_satisfaction', 'social_support_index', 'emotion_management_index'],
-        key="dist_selector_v3"
-    )
+        # Selection Menu
+        selected_dist = st.selectbox(
+            "Select Pillar to View Distribution:", 
+            ['life_satisfaction', 'social_support_index', 'emotion_management_index'],
+            key="dist_selector_v3"
+        )
     
-    # Define Dynamic Interpretation Text
-    if selected_dist == 'life_satisfaction':
-        text = "The frequency bars show a clear right-skew. This means the majority of respondents are clustered in the 4.0 to 5.0 range, proving that high life satisfaction is the 'norm' for this group rather than the exception."
-    elif selected_dist == 'social_support_index':
-        text = "The histogram reveals a high concentration of scores around 3.5 to 4.0. The lack of bars on the far left (scores 1-2) highlights that very few individuals feel completely isolated or unsupported."
-    else:
-        text = "This distribution is more 'spread out' across the x-axis. While the peak is still at the center (Score 3), the presence of bars across the entire range suggests a high diversity in how people manage their emotions."
-
-    # Create the Histogram
-    # We use 'marginal="rug"' to show the exact 'point' data locations under the bars
-    fig3 = px.histogram(
-        df, 
-        x=selected_dist, 
-        nbins=20, 
-        marginal="rug", # Adds tiny lines at the bottom for every 'point' data entry
-        color_discrete_sequence=['#D32F2F'],
-        opacity=0.85,
-        labels={selected_dist: "Score (1-5)"}
-    ) 
+        # Define Dynamic Interpretation Text
+        if selected_dist == 'life_satisfaction':
+            text = "The frequency bars show a clear right-skew. This means the majority of respondents are clustered in the 4.0 to 5.0 range, proving that high life satisfaction is the 'norm' for this group rather than the exception."
+        elif selected_dist == 'social_support_index':
+            text = "The histogram reveals a high concentration of scores around 3.5 to 4.0. The lack of bars on the far left (scores 1-2) highlights that very few individuals feel completely isolated or unsupported."
+        else:
+            text = "This distribution is more 'spread out' across the x-axis. While the peak is still at the center (Score 3), the presence of bars across the entire range suggests a high diversity in how people manage their emotions."
+
+        # Create the Histogram
+        # We use 'marginal="rug"' to show the exact 'point' data locations under the bars
+        # (a sample of them once the dataset is too large to send every point)
+        fig3 = distplots.histogram_with_rug(
+            df, 
+            x=selected_dist, 
+            nbins=20, 
+            color_discrete_sequence=['#D32F2F'],
+            opacity=0.85,
+            labels={selected_dist: "Score (1-5)"}
+        ) 
     
-    fig3.update_layout(
-        title=f"<b>Frequency Distribution of {selected_dist.replace('_', ' ').title()}</b>",
-        paper_bgcolor='rgba(0,0,0,0)', 
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(range=[0.8, 5.2], gridcolor='#EEEEEE'),
-        yaxis_title="Number of Respondents",
-        bargap=0.05 # Small gap makes it look cleaner
-    )
+        fig3.update_layout(
+            title=f"<b>Frequency Distribution of {selected_dist.replace('_', ' ').title()}</b>",
+            paper_bgcolor='rgba(0,0,0,0)', 
+            plot_bgcolor='rgba(0,0,0,0)',
+            xaxis=dict(range=[0.8, 5.2], gridcolor='#EEEEEE'),
+            yaxis_title="Number of Respondents",
+            bargap=0.05 # Small gap makes it look cleaner
+        )
     
-    st.plotly_chart(fig3, use_container_width=True, key="dist_chart_v3")
+        st.plotly_chart(fig3, use_container_width=True, key="dist_chart_v3")
     
-    # Dynamic Interpretation Box
-    st.markdown(f"""
-        <div style="background-color: #FFF0F5 ; padding: 15px; border-radius: 10px; border-left: 5px solid #FFB6C1 ;">
-            <p style="margin: 0; color: #333;">
-                <b>Interpretation:</b> {text}
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
+        # Dynamic Interpretation Box
+        st.markdown(f"""
+            <div style="background-color: #FFF0F5 ; padding: 15px; border-radius: 10px; border-left: 5px solid #FFB6C1 ;">
+                <p style="margin: 0; color: #333;">
+                    <b>Interpretation:</b> {text}
+                </p>
+            </div>
+        """, unsafe_allow_html=True)
 
 st.markdown("---")
 
 # VISUALIZATION 4: GROUP WELL-BEING PROFILE
-with st.expander("Visualization 4: Group Psychological Profile", expanded=True):
+profiler.checkpoint("adawiyah: viz4 radar", rows=len(df))
+with lazy.expander("Visualization 4: Group Psychological Profile", key="adawiyah_viz4", expanded=True) as is_open:
+    if is_open:
     
-    # Prepare Data
-    categories = ['Life Sat.', 'Social Support', 'Safety', 'Emotion Mgmt.']
-    values = [
-        df['life_satisfaction'].mean(), 
-        df['social_support_index'].mean(), 
-        df['community_safety_index'].mean(), 
-        df['emotion_management_index'].mean()
-    ]
+        # Prepare Data
+        categories = ['Life Sat.', 'Social Support', 'Safety', 'Emotion Mgmt.']
+        values = [
+            df['life_satisfaction'].mean(), 
+            df['social_support_index'].mean(), 
+            df['community_safety_index'].mean(), 
+            df['emotion_management_index'].mean()
+        ]
     
-    # Close the loop
-    categories_closed = categories + [categories[0]]
-    values_closed = values + [values[0]]
+        # Close the loop
+        categories_closed = categories + [categories[0]]
+        values_closed = values + [values[0]]
 
-    import plotly.graph_objects as go
+        import plotly.graph_objects as go
     
-    fig5 = go.Figure()
-
-    fig5.add_trace(go.Scatterpolar(
-        r=values_closed,
-        theta=categories_closed,
-        fill='toself',
-        # UPDATED: Bold Deep Red line (#B22222)
-        line=dict(color='#B22222', width=5),
-        # UPDATED: Semi-transparent Red fill
-        fillcolor='rgba(178, 34, 34, 0.4)', 
-        name='Group Average'
-    ))
-
-    # Clean up the Layout
-    fig5.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 5],
-                # FIX: Darkened grid lines from #f0f0f0 to #BDBDBD
-                gridcolor="#BDBDBD", 
-                gridwidth=1,
-                tickfont=dict(color="#333", size=12),
-                angle=45, # Tilts labels for better reading
+        fig5 = go.Figure()
+
+        fig5.add_trace(go.Scatterpolar(
+            r=values_closed,
+            theta=categories_closed,
+            fill='toself',
+            # UPDATED: Bold Deep Red line (#B22222)
+            line=dict(color='#B22222', width=5),
+            # UPDATED: Semi-transparent Red fill
+            fillcolor='rgba(178, 34, 34, 0.4)', 
+            name='Group Average'
+        ))
+
+        # Clean up the Layout
+        fig5.update_layout(
+            polar=dict(
+                radialaxis=dict(
+                    visible=True,
+                    range=[0, 5],
+                    # FIX: Darkened grid lines from #f0f0f0 to #BDBDBD
+                    gridcolor="#BDBDBD", 
+                    gridwidth=1,
+                    tickfont=dict(color="#333", size=12),
+                    angle=45, # Tilts labels for better reading
+                ),
+                angularaxis=dict(
+                    # FIX: Darkened outer grid lines
+                    gridcolor="#BDBDBD",
+                    rotation=90, 
+                    direction="clockwise",
+                    tickfont=dict(size=13, color="black")
+                ),
+                bgcolor='rgba(0,0,0,0)'
             ),
-            angularaxis=dict(
-                # FIX: Darkened outer grid lines
-                gridcolor="#BDBDBD",
-                rotation=90, 
-                direction="clockwise",
-                tickfont=dict(size=13, color="black")
-            ),
-            bgcolor='rgba(0,0,0,0)'
-        ),
-        showlegend=False,
-        title={
-            'text': "<b>Average Dimensions of Well-being</b>",
-            'y': 0.98,
-            'x': 0.5,
-            'xanchor': 'center'
-        },
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(t=80, b=40, l=40, r=40) # Adds space so labels aren't cut off
-    )
+            showlegend=False,
+            title={
+                'text': "<b>Average Dimensions of Well-being</b>",
+                'y': 0.98,
+                'x': 0.5,
+                'xanchor': 'center'
+            },
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            margin=dict(t=80, b=40, l=40, r=40) # Adds space so labels aren't cut off
+        )
 
-    # Display Chart
-    st.plotly_chart(fig5, use_container_width=True, key="radar_viz_5")
+        # Display Chart
+        st.plotly_chart(fig5, use_container_width=True, key="radar_viz_5")
 
-    # Scientific Insight Box
-    st.markdown(f"""
-        <div style="background-color: #FFF0F5; padding: 15px; border-radius: 10px; border-left: 5px solid #FFB6C1 ;">
-            <p style="margin: 0; color: #333;">
-                <b>Interpretation:</b> A balanced psychological profile is shown by the radar chart, with all dimensions regularly averaging between 3.5 and 4.0. 
-                The group's overall well-being is shown by this symmetrical diamond shape, which indicates internal emotional regulation and external environmental factors like safety and support are in balance.
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
+        # Scientific Insight Box
+        st.markdown(f"""
+            <div style="background-color: #FFF0F5; padding: 15px; border-radius: 10px; border-left: 5px solid #FFB6C1 ;">
+                <p style="margin: 0; color: #333;">
+                    <b>Interpretation:</b> A balanced psychological profile is shown by the radar chart, with all dimensions regularly averaging between 3.5 and 4.0. 
+                    The group's overall well-being is shown by this symmetrical diamond shape, which indicates internal emotional regulation and external environmental factors like safety and support are in balance.
+                </p>
+            </div>
+        """, unsafe_allow_html=True)
     
 st.markdown("---")
 
 # VISUALIZATION 5: COMMUNITY CARE IMPACT 
-with st.expander("Visualization 5: Community Safety vs. Average Satisfaction", expanded=True):
+profiler.checkpoint("adawiyah: viz5 safety", rows=len(df))
+with lazy.expander("Visualization 5: Community Safety vs. Average Satisfaction", key="adawiyah_viz5", expanded=True) as is_open:
+    if is_open:
     
-    # Prepare Data: Average satisfaction per Community Safety level
-    # We use community_safety_index which we know exists in your df
-    if 'community_safety_index' in df.columns:
-        # We group by safety and find the mean satisfaction for each level
-        safety_avg = df.groupby('community_safety_index')['life_satisfaction'].mean().reset_index()
-
-        # Create Bar Chart
-        fig6 = px.bar(
-            safety_avg, 
-            x='community_safety_index', 
-            y='life_satisfaction',
-            color='life_satisfaction',
-            color_continuous_scale='Reds', # Unified Red/Pink theme
-            title="<b>How a Safe Community Drives Life Satisfaction</b>",
-            labels={
-                'community_safety_index': 'Community Safety Level (1-5)', 
-                'life_satisfaction': 'Average Satisfaction'
-            }
+        # Prepare Data: Average satisfaction per Community Safety level
+        # We use community_safety_index which we know exists in your df
+        if 'community_safety_index' in df.columns:
+            # Mean satisfaction for each safety level, precomputed once per data version and filter state
+            safety_avg = (
+                view.cube(dims=["community_safety_index"], items=["life_satisfaction"])
+                .mean('community_safety_index')
+                .reset_index()
+            )
+
+            # Create Bar Chart
+            fig6 = px.bar(
+                safety_avg, 
+                x='community_safety_index', 
+                y='life_satisfaction',
+                color='life_satisfaction',
+                color_continuous_scale='Reds', # Unified Red/Pink theme
+                title="<b>How a Safe Community Drives Life Satisfaction</b>",
+                labels={
+                    'community_safety_index': 'Community Safety Level (1-5)', 
+                    'life_satisfaction': 'Average Satisfaction'
+                }
+            )
+
+            # COMBINED LAYOUT UPDATES 
+            fig6.update_layout(
+                title="<b>How a Safe Community Drives Life Satisfaction</b>",
+                title_x=0.5,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                xaxis=dict(tickmode='linear'),
+                # IMPORTANT: Ensure showscale is True and configured here
+                coloraxis_showscale=True, 
+                coloraxis_colorbar=dict(
+                    title="Satisfaction",
+                    tickvals=[safety_avg['life_satisfaction'].min(), safety_avg['life_satisfaction'].max()],
+                    ticktext=["Lower", "Higher"],
+                    lenmode="pixels", len=200
+                )
+            )
+
+            # Display Chart 
+            st.plotly_chart(fig6, use_container_width=True, key="bar_viz_6")
+
+            # Insight Box
+            st.markdown(f"""
+                <div style="background-color: #FFF0F5; padding: 15px; border-radius: 10px; border-left: 5px solid #FFB6C1;">
+                    <p style="margin: 0; color: #333;">
+                        <b>Interpretation:</b> The bar chat clearly shows a positive trend, with the Average Satisfaction rising steadily as the Community Safety Level goes from 2 to 5. 
+                        Although the anomaly at safety level 2 demonstrates that a tiny segment of the population may still report high satisfaction despite decreased perceived safety, this suggests that a secure environment serves as a crucial basis for individual happiness.
+                    </p>
+                </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.warning("Column 'community_safety_index' not found.")
+        
+st.markdown("---")
+
+# VISUALIZATION 6: EMOTIONAL MANAGEMENT SHAPE
+profiler.checkpoint("adawiyah: viz6 violin", rows=len(df))
+with lazy.expander("Visualization 6: Emotional Stability across Health Status", key="adawiyah_viz6", expanded=True) as is_open:
+    if is_open:
+    
+        # Create Violin Plot
+        red_sequence = ['#FFCDD2', '#EF9A9A', '#E57373', '#EF5350', '#D32F2F']
+
+        fig7 = distplots.violin(
+            df, 
+            x='overall_health', 
+            y='emotion_management_index', 
+            color='overall_health',
+            color_discrete_sequence=red_sequence,
+            title="<b>The 'Shape' of Emotional Management by Health Status</b>"
         )
 
-        # COMBINED LAYOUT UPDATES 
-        fig6.update_layout(
-            title="<b>How a Safe Community Drives Life Satisfaction</b>",
-            title_x=0.5,
+        fig7.update_layout(
+            xaxis_title="Overall Health Status",
+            yaxis_title="Emotion Management Score",
             plot_bgcolor='rgba(0,0,0,0)',
             paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(tickmode='linear'),
-            # IMPORTANT: Ensure showscale is True and configured here
-            coloraxis_showscale=True, 
-            coloraxis_colorbar=dict(
-                title="Satisfaction",
-                tickvals=[safety_avg['life_satisfaction'].min(), safety_avg['life_satisfaction'].max()],
-                ticktext=["Lower", "Higher"],
-                lenmode="pixels", len=200
-            )
+            showlegend=False
         )
 
-        # Display Chart 
-        st.plotly_chart(fig6, use_container_width=True, key="bar_viz_6")
+        # Layout: Chart + Guide
+        col_chart7, col_info7 = st.columns([4, 1])
+        with col_chart7:
+            st.plotly_chart(fig7, use_container_width=True, key="violin_viz_7")
+    
+        with col_info7:
+            st.write("") 
+            with st.popover("Guide"):
+                st.markdown("The **width** of the violin shows where most people are. A 'fat' middle means most people have average scores.")
 
         # Insight Box
         st.markdown(f"""
             <div style="background-color: #FFF0F5; padding: 15px; border-radius: 10px; border-left: 5px solid #FFB6C1;">
                 <p style="margin: 0; color: #333;">
-                    <b>Interpretation:</b> The bar chat clearly shows a positive trend, with the Average Satisfaction rising steadily as the Community Safety Level goes from 2 to 5. 
-                    Although the anomaly at safety level 2 demonstrates that a tiny segment of the population may still report high satisfaction despite decreased perceived safety, this suggests that a secure environment serves as a crucial basis for individual happiness.
+                    <b>Interpretation:</b> This graph shows that as health improves, emotional regulation becomes more reliable. 
+                    The respondents with "Excellent" health (Level 5) have the most steady and effective emotional resilience, as evidenced by the violins' changing fatness.
                 </p>
             </div>
         """, unsafe_allow_html=True)
-    else:
-        st.warning("Column 'community_safety_index' not found.")
-        
-st.markdown("---")
-
-# VISUALIZATION 6: EMOTIONAL MANAGEMENT SHAPE
-with st.expander("Visualization 6: Emotional Stability across Health Status", expanded=True):
-    
-    # Create Violin Plot
-    red_sequence = ['#FFCDD2', '#EF9A9A', '#E57373', '#EF5350', '#D32F2F']
-
-    fig7 = px.violin(
-        df, 
-        x='overall_health', 
-        y='emotion_management_index', 
-        color='overall_health',
-        box=True, 
-        points="all",
-        color_discrete_sequence=red_sequence,
-        title="<b>The 'Shape' of Emotional Management by Health Status</b>"
-    )
-
-    fig7.update_layout(
-        xaxis_title="Overall Health Status",
-        yaxis_title="Emotion Management Score",
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        showlegend=False
-    )
-
-    # Layout: Chart + Guide
-    col_chart7, col_info7 = st.columns([4, 1])
-    with col_chart7:
-        st.plotly_chart(fig7, use_container_width=True, key="violin_viz_7")
-    
-    with col_info7:
-        st.write("") 
-        with st.popover("Guide"):
-            st.markdown("The **width** of the violin shows where most people are. A 'fat' middle means most people have average scores.")
-
-    # Insight Box
-    st.markdown(f"""
-        <div style="background-color: #FFF0F5; padding: 15px; border-radius: 10px; border-left: 5px solid #FFB6C1;">
-            <p style="margin: 0; color: #333;">
-                <b>Interpretation:</b> This graph shows that as health improves, emotional regulation becomes more reliable. 
-                The respondents with "Excellent" health (Level 5) have the most steady and effective emotional resilience, as evidenced by the violins' changing fatness.
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
@@ -3,6 +3,8 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from sses import aggplots, correlation, crossfilter, distplots, features, lazy, profiler, resampling
+
 # ===============================
 # 🧠 PAGE TITLE CONFIGURATION
 # ===============================
@@ -81,14 +83,17 @@ st.markdown("""
 # -------------------------------
 # Load dataset from GitHub
 # -------------------------------
-DATA_URL = "https://raw.githubusercontent.com/nhusna01/SSES-survey-dashboard/refs/heads/main/dataset/Husna_SSES_cleaned.csv"
-
-@st.cache_data
-def load_data(url):
-    df = pd.read_csv(url)
-    return df
-
-df = load_data(DATA_URL)
+@profiler.timed("husna: load data")
+def load_data(name):
+    # Rows selected by the global sidebar filters (every row when none are set)
+    return crossfilter.view(name)
+
+view = load_data("husna")
+df = view.frame
+crossfilter.caption(view)
+if df.empty:
+    st.warning("No respondents match the global filters.")
+    st.stop()
     
 # ===============================
 # 🧩 MAIN OBJECTIVE
@@ -139,6 +144,7 @@ st.markdown(
 # ===============================
 # 📋 DATA SUMMARY
 # ===============================
+profiler.checkpoint("husna: data summary", rows=len(view))
 st.subheader("📋 Data Summary")
 
 summary_option = st.selectbox(
@@ -155,7 +161,8 @@ summary_option = st.selectbox(
 if summary_option == "Overall Dataset Overview":
     st.markdown("**Dataset Structure and Basic Information**")
 
-    summary_df = pd.DataFrame({
+    # Summary tables are reused until the dataset or global filters change
+    summary_df = lazy.memo("husna_overview", view, lambda: pd.DataFrame({
         "Metric": [
             "Number of Observations",
             "Number of Variables",
@@ -168,11 +175,13 @@ if summary_option == "Overall Dataset Overview":
             df.select_dtypes(include='number').shape[1],
             df.select_dtypes(exclude='number').shape[1]
         ]
-    })
+    }))
 
     st.dataframe(summary_df, use_container_width=True)
-    st.markdown("**Full Dataset Summary**")
-    st.dataframe(df, use_container_width=True)
+    # The full dump is only serialised while its expander is open
+    with lazy.expander("**Full Dataset Summary**", key="husna_full_dataset") as is_open:
+        if is_open:
+            st.dataframe(df, use_container_width=True)
 
 # ---------- CATEGORICAL SUMMARY ----------
 elif summary_option == "Categorical Variables Summary":
@@ -185,8 +194,9 @@ elif summary_option == "Categorical Variables Summary":
         categorical_cols
     )
 
-    st.write(df[selected_cat].value_counts())
-    st.bar_chart(df[selected_cat].value_counts())
+    value_counts = lazy.memo("husna_categorical", view, lambda: df[selected_cat].value_counts(), selected_cat)
+    st.write(value_counts)
+    st.bar_chart(value_counts)
 
 # ---------- NUMERICAL SUMMARY ----------
 elif summary_option == "Numerical Variables Summary":
@@ -199,7 +209,7 @@ elif summary_option == "Numerical Variables Summary":
         numerical_cols
     )
 
-    st.dataframe(df[selected_num].describe().to_frame(name="Value"))
+    st.dataframe(lazy.memo("husna_numerical", view, lambda: df[selected_num].describe().to_frame(name="Value"), selected_num))
 
     st.markdown("**Distribution**")
     st.bar_chart(df[selected_num])
@@ -208,13 +218,15 @@ elif summary_option == "Numerical Variables Summary":
 elif summary_option == "Missing Values Summary":
     st.markdown("**Missing Data Overview**")
 
-    missing_df = pd.DataFrame({
-        "Variable": df.columns,
-        "Missing Count": df.isnull().sum(),
-        "Missing Percentage (%)": (df.isnull().mean() * 100).round(2)
-    })
+    def missing_summary():
+        missing_df = pd.DataFrame({
+            "Variable": df.columns,
+            "Missing Count": df.isnull().sum(),
+            "Missing Percentage (%)": (df.isnull().mean() * 100).round(2)
+        })
+        return missing_df[missing_df["Missing Count"] > 0]
 
-    missing_df = missing_df[missing_df["Missing Count"] > 0]
+    missing_df = lazy.memo("husna_missing", view, missing_summary)
 
     if missing_df.empty:
         st.success("No missing values detected in the dataset.")
@@ -225,17 +237,14 @@ elif summary_option == "Missing Values Summary":
 #  SUMMARY BOXES
 # ===============================
 
+profiler.checkpoint("husna: KPIs", rows=len(view))
 st.subheader("📊 Performance Metrics")
 
 
 # -------------------- DATA --------------------
 # df assumed already loaded
 
-employment_mapping = {
-    0: "Employed",
-    1: "Student",
-    2: "Unemployed"
-}
+employment_mapping = features.EMPLOYMENT_LABELS
 
 attribute_cols = [
     "calm_under_pressure", "cheerful",
@@ -246,10 +255,12 @@ attribute_cols = [
 ]
 
 # -------------------- METRICS --------------------
-employment_groups = df["employment_status"].map(employment_mapping).nunique()
-avg_overall_health = round(df["overall_health"].mean(), 2)
+# Means come from the dataset's running statistics rather than a column scan
+kpi_stats = view.moments()
+employment_groups = df["employment_status_label"].nunique()
+avg_overall_health = round(kpi_stats.mean(["overall_health"]).iloc[0], 2)
 avg_community_participation = round(
-    df[["community_participation", "community_impact"]].mean().mean(), 2
+    kpi_stats.mean(["community_participation", "community_impact"]).mean(), 2
 )
 total_attributes = len(attribute_cols)
 
@@ -416,26 +427,26 @@ status_mapping = {
     "Unemployed": 2
 }
 
+profiler.checkpoint("husna: sidebar filters", rows=len(view))
+# Precomputed per-value masks: only the matching row positions are built
+filter_index = view.filter_index()
+
 if selected_group and selected_group != "All":
-    filtered_df = df[df["employment_status"] == status_mapping[selected_group]]
+    selected_codes = [status_mapping[selected_group]]
+    filtered_df = df.iloc[filter_index.select(filter_index.isin("employment_status", selected_codes))]
 else:
-    filtered_df = df.copy()
+    selected_codes = list(status_mapping.values())
+    filtered_df = df
+
+# Group means per employment code, precomputed once per data version and filter state
+employment_cube = view.cube(dims=["employment_status"])
 
 st.caption(f"Currently viewing data for: **{selected_group}**")
 
 # -----------------------------
 # Prepare Labels and Colors
 # -----------------------------
-status_mapping_str = {0: 'EMPLOYED', 1: 'STUDENT', 2: 'UNEMPLOYED'}
-if filtered_df['employment_status'].dtype in [int, float]:
-    filtered_df['employment_status'] = filtered_df['employment_status'].map(status_mapping_str)
-filtered_df['employment_status'] = filtered_df['employment_status'].astype(str)
-
-filtered_df['employment_status_label'] = filtered_df['employment_status'].map({
-    'EMPLOYED': 'Employed',
-    'STUDENT': 'Student',
-    'UNEMPLOYED': 'Unemployed'
-})
+# employment_status_label is a derived feature (sses.features)
 
 color_map = {
     'EMPLOYED': '#440154',   # Dark purple
@@ -453,6 +464,7 @@ st.markdown(f"## {objective_icons[selected_sub]} {subobjectives[selected_sub]}")
 # 1️⃣ Correlation Heatmap
 # ===============================
 if selected_sub == "Correlation Between Likert Variables":
+    profiler.checkpoint("husna: correlation", rows=len(filtered_df))
 
     # -----------------------------
     # 1️⃣ Likert variables
@@ -503,19 +515,23 @@ if selected_sub == "Correlation Between Likert Variables":
         st.stop()
 
     # -----------------------------
-    # 6️⃣ Convert to numeric
+    # 6️⃣ Slice the correlation matrix
     # -----------------------------
-    df_corr = df_target[existing_vars].apply(pd.to_numeric, errors='coerce')
+    # Every pair is computed once per employment group and data version, so
+    # changing the variable selection above only slices the cached matrix
+    # Grouped on the label the selectbox offers, so every listed status
+    # (including ones without an employment code, such as Retired) works
+    correlation_matrix = correlation.matrix(
+        view, existing_vars, by='employment_status_label', group=target_status
+    )
 
-    if df_corr.dropna(how='all').shape[1] < 2:
+    if correlation_matrix.isna().all().all():
         st.warning("Not enough numeric data to compute correlation.")
         st.stop()
 
     # -----------------------------
-    # 7️⃣ Compute correlation matrix
+    # 7️⃣ Check correlation matrix
     # -----------------------------
-    correlation_matrix = df_corr.corr()
-
     if correlation_matrix.empty:
         st.warning("Correlation matrix is empty.")
         st.stop()
@@ -572,6 +588,7 @@ if selected_sub == "Correlation Between Likert Variables":
 # 2️⃣ Social & Emotional Skills Radar
 # ===============================
 elif selected_sub == "Social & Emotional Skills":
+    profiler.checkpoint("husna: radar", rows=len(filtered_df))
     # -----------------------------
     # Define radar variables (Likert-scale columns)
     # -----------------------------
@@ -593,15 +610,16 @@ elif selected_sub == "Social & Emotional Skills":
         default=filtered_df['employment_status_label'].unique()
     )
 
-    # Filter dataframe based on selection
-    df_radar = filtered_df[
-        filtered_df['employment_status_label'].isin(employment_options)
-    ]
-
     # -----------------------------
-    # Compute averages for each employment group
+    # Averages for each selected employment group (from the aggregate cube)
     # -----------------------------
-    df_avg = df_radar.groupby('employment_status_label')[radar_vars].mean().reset_index()
+    df_avg = (
+        employment_cube.mean('employment_status', radar_vars)
+        .rename(index=employment_mapping)
+        .loc[lambda means: means.index.isin(employment_options)]
+        .rename_axis('employment_status_label')
+        .reset_index()
+    )
 
     # -----------------------------
     # Create color map automatically for any employment status
@@ -651,6 +669,33 @@ elif selected_sub == "Social & Emotional Skills":
 
     st.plotly_chart(fig, use_container_width=True)
 
+    # -----------------------------
+    # Uncertainty of the group gaps (resampled only when opened)
+    # -----------------------------
+    with lazy.expander("🎲 How certain are these differences?", key="husna_uncertainty") as is_open:
+        if is_open:
+            gaps = resampling.compare(view, 'employment_status', radar_vars)
+            gaps = gaps.assign(
+                group_a=gaps['group_a'].map(employment_mapping),
+                group_b=gaps['group_b'].map(employment_mapping),
+                variable=gaps['variable'].str.replace("_", " ").str.title(),
+            )
+            gaps = gaps[gaps['group_a'].isin(employment_options) & gaps['group_b'].isin(employment_options)]
+            st.dataframe(
+                gaps[['variable', 'group_a', 'group_b', 'difference', 'ci_low', 'ci_high', 'p_value']]
+                .rename(columns={
+                    'variable': 'Skill', 'group_a': 'Group A', 'group_b': 'Group B',
+                    'difference': 'Difference (A - B)', 'ci_low': '95% CI (low)',
+                    'ci_high': '95% CI (high)', 'p_value': 'p-value',
+                })
+                .round(3),
+                hide_index=True,
+            )
+            st.caption(
+                f"Bootstrap 95% confidence intervals ({resampling.N_BOOTSTRAP} resamples) and "
+                f"permutation p-values ({resampling.N_PERMUTATIONS} shuffles) for each pair of groups."
+            )
+
     # -----------------------------
     # Interpretation
     # -----------------------------
@@ -678,6 +723,7 @@ elif selected_sub == "Social & Emotional Skills":
 # 3️⃣ Task Persistence & Enjoy Learning Boxplots
 # ===============================
 elif selected_sub == "Task Persistence & Enjoy Learning":
+    profiler.checkpoint("husna: boxplots", rows=len(filtered_df))
     # Columns to visualize (Likert-scale 1–5)
     columns_to_plot = ['task_persistence', 'enjoy_learning']
 
@@ -708,12 +754,11 @@ elif selected_sub == "Task Persistence & Enjoy Learning":
 
     # Create boxplots for each Likert-scale column (1–5)
     for col in columns_to_plot:
-        fig_box = px.box(
+        fig_box = distplots.box(
             df_filtered,
             x='employment_status_label',
             y=col,
-            color='employment_status_label',
-            points='all',  # show all individual points
+            color='employment_status_label',  # all individual points (a sample on large data)
             color_discrete_sequence=viridis_colors,
             title=f'{col.replace("_"," ").title()} by Employment Status',
             hover_data={col: True}
@@ -762,6 +807,7 @@ elif selected_sub == "Task Persistence & Enjoy Learning":
 # 4️⃣ Social Skills Grouped Bar Chart
 # ===============================
 elif selected_sub == "Social Skills Grouped Bar Chart":
+    profiler.checkpoint("husna: grouped bars", rows=len(filtered_df))
     social_skills = ['enjoy_learning', 'helping_others']
     selected_skills = st.multiselect(
         "Select Social Skill(s) to Display",
@@ -775,11 +821,12 @@ elif selected_sub == "Social Skills Grouped Bar Chart":
             'helping_others': '#21918c'
         }
 
-        # Compute mean scores by employment status
+        # Mean scores by employment status (from the aggregate cube)
         df_avg = (
-            filtered_df
-            .groupby('employment_status_label')[selected_skills]
-            .mean()
+            employment_cube.mean('employment_status', selected_skills)
+            .loc[lambda means: means.index.isin(selected_codes)]
+            .rename(index=employment_mapping)
+            .rename_axis('employment_status_label')
             .reset_index()
         )
 
@@ -840,6 +887,7 @@ elif selected_sub == "Social Skills Grouped Bar Chart":
 # 5️⃣ Community Participation Histogram
 # ===============================
 if selected_sub == "Community Participation":
+    profiler.checkpoint("husna: community histogram", rows=len(filtered_df))
 
     community_vars = ['community_participation', 'community_impact']
 
@@ -864,13 +912,13 @@ if selected_sub == "Community Participation":
         'STUDENT': '#21918c',
         'UNEMPLOYED': '#fde725'
     }
-    fig = px.histogram(
+    # One bar per Likert score, counted here rather than in the browser
+    fig = aggplots.histogram(
         df_hist,
         x='Likert Score',
         color='employment_status_label',
         facet_col='Community Dimension',
         barmode='overlay',
-        nbins=5,
         title='Distribution of Community Participation Scores by Employment Status',
         labels={'Likert Score': 'Likert Scale'},
         color_discrete_map=color_map
@@ -912,6 +960,7 @@ if selected_sub == "Community Participation":
 # 6️⃣ Wellbeing and Life Satisfaction Violin Plot
 # ===============================
 elif selected_sub == "Wellbeing and Life Satisfaction":
+    profiler.checkpoint("husna: violin", rows=len(filtered_df))
 
     wellbeing_vars = ['life_satisfaction', 'overall_health']
     selected_var = st.selectbox("Select wellbeing indicator:", wellbeing_vars)
@@ -921,13 +970,11 @@ elif selected_sub == "Wellbeing and Life Satisfaction":
     # -----------------------------
     viridis_colors = px.colors.sequential.Viridis  # built-in Viridis palette
 
-    fig = px.violin(
+    fig = distplots.violin(
         filtered_df,
         x='employment_status_label',
         y=selected_var,
         color='employment_status_label',
-        box=True,
-        points='all',
         color_discrete_sequence=viridis_colors,
         title=f'Distribution of {selected_var.replace("_"," ").title()} by Employment Status'
     )
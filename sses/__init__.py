@@ -0,0 +1 @@
+"""Shared data and analysis helpers for the SSES survey dashboard pages."""
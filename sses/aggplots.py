@@ -0,0 +1,50 @@
+"""
+Bar, histogram and pie charts built from counts instead of raw rows.
+
+``px.histogram`` and ``px.pie`` send the whole column to the browser and let
+Plotly.js bin it there, so the payload grows with the number of respondents.
+These helpers count on the server - ``np.bincount`` for small non-negative
+integer codes such as the Int8 Likert columns, a grouped ``size()``
+otherwise - and hand Plotly one bar or slice per category. Categories keep
+the order in which they first appear, as Plotly Express would show them.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+_BINCOUNT_MAX = 1024
+
+
+def _is_small_code(series):
+    if not pd.api.types.is_integer_dtype(series) or series.isna().any() or series.empty:
+        return False
+    return 0 <= series.min() and series.max() < _BINCOUNT_MAX
+
+
+def counts(df, by):
+    """Rows per combination of the `by` columns, as a frame with a ``count`` column."""
+    by = [by] if isinstance(by, str) else list(by)
+    if len(by) == 1 and _is_small_code(df[by[0]]):
+        series = df[by[0]]
+        tally = np.bincount(series.to_numpy(dtype="int64"))
+        # First-appearance order, as the grouped path below produces
+        order = pd.unique(series.to_numpy())
+        return pd.DataFrame({by[0]: pd.array(order, dtype=series.dtype), "count": tally[order]})
+    return df.groupby(by, sort=False, observed=True).size().reset_index(name="count")
+
+
+def histogram(df, x, color=None, facet_col=None, barmode="relative", **px_kwargs):
+    """`px.histogram` of a categorical or Likert column, with one bar per value."""
+    by = [column for column in (x, color, facet_col) if column is not None]
+    fig = px.bar(
+        counts(df, by), x=x, y="count", color=color, facet_col=facet_col,
+        barmode=barmode, **px_kwargs,
+    )
+    # Histogram bars touch unless the page asks for a gap
+    fig.update_layout(bargap=0)
+    return fig
+
+
+def pie(df, names, **px_kwargs):
+    """`px.pie(df, names=...)` with the slice sizes counted here."""
+    return px.pie(counts(df, names), names=names, values="count", **px_kwargs)
@@ -0,0 +1,293 @@
+"""
+Cleaning pipeline for the raw SSES Google Form export.
+
+This is the importable form of ``dataset/Data Cleaning.py``. Each stage takes a
+DataFrame and returns a new one, and `clean` runs them in order:
+
+1. ``rename`` - map the long form questions to short snake_case names
+2. ``normalize_age`` - replace en/em dashes and non-breaking spaces in age bands
+3. ``drop_duplicate_columns`` - drop columns whose values repeat another column
+4. ``drop_unused_columns`` - drop the timestamp and e-mail columns
+5. ``cap_outliers`` - cap numeric columns to the 1.5 x IQR fences
+
+`StreamingCleaner` gathers what the whole-column stages need while an export
+is read in chunks (see `sses.ingest`), so the cleaned frame is built from the
+stored rows without another copy of them.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from sses.moments import Moments
+from sses.schema import LIKERT_COLUMNS
+
+COLUMN_RENAMES = {
+    'Timestamp': 'timestamp',
+    'Username': 'username',
+    'Age (Years)': 'age',
+    'Gender': 'gender',
+    'Marital Status': 'marital_status',
+    'Highest Level of Education': 'education_level',
+    'Employment Status': 'employment_status',
+    'State': 'state',
+    'Main Language Spoken at Home': 'home_language',
+
+    'How often do you feel satisfied with your life as a whole these days?': 'life_satisfaction',
+    'I have felt cheerful and in good spirits.': 'cheerful',
+    'I have woken up feeling fresh and rested.': 'well_rested',
+    'In general, how would you describe your overall health?': 'overall_health',
+
+    'I often spend time with friends or family. ': 'social_time',
+    'I often try to help others when they are in need.  ': 'helping_others',
+    'People around me are supportive when I face difficulties.  ': 'social_support',
+    'With enough effort everyone can increase their social skills. ': 'social_skills_growth',
+    'I feel safe in my neighborhood.  ': 'neighborhood_safety',
+    'People in my community care about one another. ': 'community_care',
+    'I believe I can make a positive difference in my community.': 'community_impact',
+
+    'I enjoy learning new things in my daily life.  ': 'enjoy_learning',
+    'I am motivated to improve my skills and knowledge. ': 'self_motivation',
+
+    'What are your main goals for the next few years? \n(Please answer in one word.)': 'future_goals',
+
+    'I can stay calm even when under pressure.  ': 'calm_under_pressure',
+    'I can control my emotions when I feel angry or upset.  ': 'emotional_control',
+    'I find it easy to work well with others.  ': 'teamwork',
+    'I finish tasks even when they are difficult.  ': 'task_persistence',
+    'I can adapt easily to new or unexpected situations. ': 'adaptability',
+
+    'Some people are just not good at interacting with others, no matter how hard they try. ': 'fixed_social_belief',
+    'Everyone deserves equal opportunities to succeed.  ': 'equal_opportunity_belief',
+    'I believe emotional well-being is as important as physical health.  ': 'wellbeing_belief',
+
+    'How often do you participate in community, volunteer, or group activities?  ': 'community_participation',
+    'How often do you spend time doing physical exercise or sports?  ': 'physical_activity'
+}
+
+UNUSED_COLUMNS = ['timestamp', 'Email Address']
+
+
+# ------------------------------
+# Stages
+# ------------------------------
+def rename_columns(df):
+    return df.rename(columns=COLUMN_RENAMES)
+
+
+def normalize_age(df):
+    if 'age' not in df.columns:
+        return df
+    df = df.copy()
+    df['age'] = (
+        df['age']
+        .astype("string")
+        .str.replace('\u2013', '-', regex=False)   # en dash
+        .str.replace('\u2014', '-', regex=False)   # em dash
+        .str.replace('\xa0', ' ', regex=False)     # non-breaking space
+        .str.strip()
+    )
+    return df
+
+
+def _comparable(series):
+    # Numbers compare as floats so 3 and 3.0 match, as they would after df.T
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype("float64")
+    return series.astype(object)
+
+
+def _column_digest(series):
+    row_hashes = pd.util.hash_pandas_object(series, index=False).to_numpy()
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).digest()
+
+
+def duplicate_column_mask(df):
+    """
+    Boolean mask marking columns whose values repeat an earlier column.
+
+    Each column is hashed on its own and only columns whose digests collide
+    are compared value by value. Only column positions are remembered, so at
+    most two converted columns exist at a time (``df.T.duplicated()`` copies
+    the whole frame into object dtype).
+    """
+    mask = np.zeros(df.shape[1], dtype=bool)
+    seen = {}    # digest -> positions of the distinct columns with that digest
+    for position in range(df.shape[1]):
+        candidates = seen.setdefault(_column_digest(_comparable(df.iloc[:, position])), [])
+        if candidates:
+            column = _comparable(df.iloc[:, position])
+            if any(column.equals(_comparable(df.iloc[:, earlier])) for earlier in candidates):
+                mask[position] = True
+                continue
+        candidates.append(position)
+    return mask
+
+
+def find_duplicate_columns(df):
+    """Columns whose values are identical to an earlier column."""
+    return df.columns[duplicate_column_mask(df)].tolist()
+
+
+def drop_duplicate_columns(df):
+    mask = duplicate_column_mask(df)
+    return df.loc[:, ~mask] if mask.any() else df
+
+
+def drop_unused_columns(df):
+    return df.drop(columns=UNUSED_COLUMNS, errors='ignore')
+
+
+def iqr_bounds(data):
+    """Lower and upper 1.5 x IQR fences for every column, from one quantile pass."""
+    quartiles = data.quantile([0.25, 0.75])
+    q1, q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
+def count_outliers_iqr(data):
+    """Number of values outside the IQR fences, per numeric column."""
+    numeric = data.select_dtypes(include='number')
+    lower, upper = iqr_bounds(numeric)
+    outliers = numeric.lt(lower, axis=1) | numeric.gt(upper, axis=1)
+    return outliers.sum().to_frame(name='Outlier_Count')
+
+
+def _clip(series, lower, upper):
+    if pd.isna(lower):
+        return series
+    if (isinstance(series.dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_integer_dtype(series)
+            and not (float(lower).is_integer() and float(upper).is_integer())):
+        # Nullable integers cannot hold fractional fences; NumPy integers upcast on their own
+        series = series.astype("float64")
+    return series.clip(lower=lower, upper=upper)
+
+
+def cap_outliers(df):
+    numeric_cols = df.select_dtypes(include='number').columns
+    if len(numeric_cols) == 0:
+        return df
+    lower, upper = iqr_bounds(df[numeric_cols])
+    return df.assign(**{column: _clip(df[column], lower[column], upper[column]) for column in numeric_cols})
+
+
+STAGES = [
+    ("rename", rename_columns),
+    ("normalize_age", normalize_age),
+    ("drop_duplicate_columns", drop_duplicate_columns),
+    ("drop_unused_columns", drop_unused_columns),
+    ("cap_outliers", cap_outliers),
+]
+
+
+def clean(df, stages=None):
+    """Run the named `stages` (default: all of them, in order) over `df`."""
+    selected = STAGES if stages is None else [(name, fn) for name, fn in STAGES if name in stages]
+    for _, stage in selected:
+        df = stage(df)
+    return df
+
+
+# ------------------------------
+# Streaming
+# ------------------------------
+def raw_dtypes():
+    """
+    Explicit `pd.read_csv` dtypes for the questions of the raw export. Scores
+    are read as ``float32``, which the C parser converts directly (``Int8``
+    goes through `pd.to_numeric` and parses several times slower);
+    `apply_schema` makes them ``Int8`` in the cleaned frame.
+    """
+    return {
+        question: "float32" if column in LIKERT_COLUMNS else "str"
+        for question, column in COLUMN_RENAMES.items()
+    }
+
+
+class StreamingCleaner:
+    """
+    `clean` fed the export one chunk at a time (the aggregate interface of
+    `sses.ingest`: ``reset()`` and ``update(chunk)``), without keeping rows.
+
+    Each chunk is renamed and its ages normalised, every column is hashed
+    into a running digest, and the Likert items are counted per level
+    (`sses.moments`). `clean` then needs no whole-column pass but the age
+    normalisation: duplicate columns are found from the digests, and the IQR
+    fences come from the level counts rather than a sort of the rows.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.rows = 0
+        self._columns = None
+        self._digests = []
+        self._moments = Moments()
+
+    def update(self, chunk):
+        chunk = normalize_age(rename_columns(chunk))
+        if self._columns is None:
+            self._columns = list(chunk.columns)
+            self._digests = [hashlib.blake2b(digest_size=16) for _ in self._columns]
+        for position, digest in enumerate(self._digests):
+            column = _comparable(chunk.iloc[:, position])
+            digest.update(pd.util.hash_pandas_object(column, index=False).to_numpy().tobytes())
+        self._moments.update(drop_unused_columns(chunk))
+        self.rows += len(chunk)
+        return self
+
+    def clean(self, df):
+        """
+        `clean(df)` for `df`, the rows this cleaner was fed. The kept columns
+        are `df`'s own (views under copy-on-write); only the age column and
+        columns that have values outside their fences are rewritten.
+        """
+        df = drop_unused_columns(normalize_age(rename_columns(df)))
+        return _cap_from_moments(df.loc[:, ~self._duplicate_mask(df)], self._moments)
+
+    def _duplicate_mask(self, df):
+        # Columns are matched by digest; a kept column equal to an earlier
+        # dropped column (an e-mail copied into Username) counts as a repeat.
+        digests = dict(zip(self._columns, (digest.digest() for digest in self._digests)))
+        unused, repeats = set(), set()
+        for column in self._columns:
+            if column in UNUSED_COLUMNS:
+                unused.add(digests[column])
+            elif digests[column] in unused:
+                repeats.add(column)
+
+        mask = np.zeros(df.shape[1], dtype=bool)
+        seen = {}       # digest -> position of the first kept column with it
+        for position, column in enumerate(df.columns):
+            earlier = seen.setdefault(digests[column], position)
+            if column in repeats:
+                mask[position] = True
+            elif earlier != position:
+                # Equal digests are confirmed value by value, as in `duplicate_column_mask`
+                mask[position] = _comparable(df.iloc[:, position]).equals(_comparable(df.iloc[:, earlier]))
+        return mask
+
+
+def _cap_from_moments(df, moments):
+    """`cap_outliers`, with quartiles read from `moments` where it has level counts."""
+    numeric_cols = df.select_dtypes(include='number').columns
+    if len(numeric_cols) == 0:
+        return df
+    capped = {}
+    for column in numeric_cols:
+        series = df[column]
+        levels = moments.levels(column) if column in moments.columns else None
+        if levels is not None:
+            q1, q3 = moments.quantile(column, 0.25), moments.quantile(column, 0.75)
+            lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+            present = np.flatnonzero(levels)
+            if not len(present) or (lower <= present[0] and present[-1] <= upper):
+                continue    # nothing to cap: keep the column as it is
+        else:
+            q1, q3 = series.quantile([0.25, 0.75])
+            lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        capped[column] = _clip(series, lower, upper)
+    return df.assign(**capped) if capped else df
+
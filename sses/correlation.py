@@ -0,0 +1,170 @@
+"""
+Correlation matrices computed once and sliced by the pages.
+
+`matrix` returns the correlation of any subset of a dataset's numeric
+columns. The full matrix for all columns is computed once per (data version,
+global filter state, group, method) and cached on the dataset view, so
+changing which variables a page shows is a lookup, not a recomputation.
+
+Methods:
+
+- ``pearson``: pairwise-complete, like ``DataFrame.corr()``. With no missing
+  values it is one matrix product of the standardised columns; otherwise the
+  per-pair counts, sums and sums of squares come from four matrix products
+  over the value and presence masks.
+- ``spearman``: Pearson on the column ranks (average ranks for ties). It
+  matches pandas exactly when there are no missing values; with missing
+  values each column is ranked once rather than once per pair.
+- ``polychoric``: maximum-likelihood correlation of the latent normals
+  behind two ordinal (Likert) items, using thresholds from the marginal
+  proportions. Columns with more than ``MAX_LEVELS`` levels get NaN.
+"""
+import numpy as np
+import pandas as pd
+
+METHODS = ("pearson", "spearman", "polychoric")
+MAX_LEVELS = 10
+
+_RHO_BOUND = 0.995
+_LIMIT = 8.0    # stands in for +/- infinity in the threshold vectors
+_NODES, _WEIGHTS = np.polynomial.legendre.leggauss(20)
+
+
+# ------------------------------
+# Pearson / Spearman
+# ------------------------------
+def pearson(values):
+    """Pairwise-complete Pearson correlation of the columns of a 2-D float array."""
+    present = ~np.isnan(values)
+    centered = values - np.nanmean(values, axis=0)
+
+    if present.all():
+        std = centered.std(axis=0, ddof=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = centered / std
+            corr = z.T @ z / (len(values) - 1)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return np.clip(corr, -1.0, 1.0)
+
+    mask = present.astype("float64")
+    x = np.where(present, centered, 0.0)
+    n = mask.T @ mask
+    sums = x.T @ mask                # sums[i, j]: sum of column i over rows where j is present too
+    squares = (x * x).T @ mask
+    products = x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = products - sums * sums.T / n
+        var = squares - sums ** 2 / n
+        corr = cov / np.sqrt(var * var.T)
+    corr[n < 2] = np.nan
+    np.fill_diagonal(corr, np.where(np.diag(var) > 0, 1.0, np.nan))
+    return np.clip(corr, -1.0, 1.0)
+
+
+def spearman(values):
+    ranks = pd.DataFrame(values).rank().to_numpy(dtype="float64")
+    return pearson(ranks)
+
+
+# ------------------------------
+# Polychoric
+# ------------------------------
+def _bivariate_cdf(h, k, rho):
+    """
+    Standard bivariate normal CDF on the grid h x k, from
+    Phi2 = Phi(h) Phi(k) + integral over r in [0, rho] of phi2(h, k, r),
+    evaluated with Gauss-Legendre quadrature.
+    """
+    from scipy.special import ndtr
+
+    r = rho * (_NODES + 1) / 2
+    hh, kk = h[:, None, None], k[None, :, None]
+    one_minus = 1 - r * r
+    density = np.exp(-(hh * hh - 2 * hh * kk * r + kk * kk) / (2 * one_minus)) / (2 * np.pi * np.sqrt(one_minus))
+    return ndtr(h)[:, None] * ndtr(k)[None, :] + density @ _WEIGHTS * rho / 2
+
+
+def _thresholds(codes, levels):
+    from scipy.special import ndtri
+
+    cumulative = np.cumsum(np.bincount(codes, minlength=levels))[:-1] / len(codes)
+    return np.concatenate([[-_LIMIT], np.clip(ndtri(cumulative), -_LIMIT, _LIMIT), [_LIMIT]])
+
+
+def polychoric_pair(a, b):
+    """Polychoric correlation of two integer-coded ordinal arrays (no missing values)."""
+    from scipy.optimize import minimize_scalar
+
+    a_levels, a_codes = np.unique(a, return_inverse=True)
+    b_levels, b_codes = np.unique(b, return_inverse=True)
+    if len(a_levels) < 2 or len(b_levels) < 2:
+        return np.nan
+    table = np.bincount(a_codes * len(b_levels) + b_codes, minlength=len(a_levels) * len(b_levels))
+    table = table.reshape(len(a_levels), len(b_levels))
+    h = _thresholds(a_codes, len(a_levels))
+    k = _thresholds(b_codes, len(b_levels))
+
+    def neg_log_likelihood(rho):
+        cdf = _bivariate_cdf(h, k, rho)
+        cells = cdf[1:, 1:] - cdf[:-1, 1:] - cdf[1:, :-1] + cdf[:-1, :-1]
+        return -(table * np.log(np.maximum(cells, 1e-300))).sum()
+
+    return minimize_scalar(neg_log_likelihood, bounds=(-_RHO_BOUND, _RHO_BOUND), method="bounded").x
+
+
+def polychoric(values):
+    """Polychoric correlation matrix; columns that are not ordinal codes get NaN."""
+    columns = values.shape[1]
+    ordinal = [
+        len(np.unique(col[~np.isnan(col)])) <= MAX_LEVELS
+        and np.array_equal(col[~np.isnan(col)], np.round(col[~np.isnan(col)]))
+        for col in values.T
+    ]
+    corr = np.full((columns, columns), np.nan)
+    for i in range(columns):
+        if not ordinal[i]:
+            continue
+        corr[i, i] = 1.0
+        for j in range(i + 1, columns):
+            if not ordinal[j]:
+                continue
+            both = ~np.isnan(values[:, i]) & ~np.isnan(values[:, j])
+            if both.sum() > 1:
+                corr[i, j] = corr[j, i] = polychoric_pair(values[both, i], values[both, j])
+    return corr
+
+
+_METHODS = {"pearson": pearson, "spearman": spearman, "polychoric": polychoric}
+
+
+# ------------------------------
+# Cached matrices
+# ------------------------------
+def compute(frame, method="pearson"):
+    """Correlation matrix of every numeric column of `frame`."""
+    numeric = frame.select_dtypes(include="number")
+    values = numeric.to_numpy(dtype="float64", na_value=np.nan)
+    return pd.DataFrame(_METHODS[method](values), index=numeric.columns, columns=numeric.columns)
+
+
+def _prepare(frame, by, group, impute):
+    if by is not None:
+        frame = frame[frame[by] == group]
+    numeric = frame.select_dtypes(include="number")
+    if impute == "median":
+        numeric = numeric.astype("float64").fillna(numeric.median())
+    return numeric
+
+
+def matrix(view, columns=None, method="pearson", by=None, group=None, impute=None):
+    """
+    Correlation of `columns` (default: all numeric columns) in `view` - a
+    `crossfilter.DatasetView` - optionally restricted to the rows where
+    `by == group`, with missing values median-imputed when `impute="median"`.
+    Sliced from the full matrix cached for that data version and group.
+    """
+    if method not in _METHODS:
+        raise ValueError(f"Unknown correlation method {method!r}; expected one of {METHODS}")
+    key = ("correlation", method, by, group, impute)
+    full = view.artifact(key, lambda frame: compute(_prepare(frame, by, group, impute), method))
+    return full if columns is None else full.loc[list(columns), list(columns)]
@@ -0,0 +1,283 @@
+"""
+Global filter context shared by every dashboard page.
+
+`render_sidebar` (called from ``main.py`` before the page runs) draws one set
+of filters - state, gender, employment status, age band and education level -
+whose selections live in ``st.session_state`` and therefore follow the analyst
+from page to page. Pages ask for a `DatasetView` instead of the full dataset:
+the matching rows are computed once per (data version, filter state) against
+a per-version index and shared by every session with the same selection, and
+the view hands out filtered frames, cubes and indexes built on those rows.
+"""
+import copy
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sses import features, registry
+from sses.cleaning import COLUMN_RENAMES
+from sses.cube import AggregateCube
+from sses.filters import FilterIndex
+from sses.ingest import AppendBuffer
+from sses.moments import GroupedMoments, Moments
+from sses.schema import CATEGORY_SETS, canonical_key
+from sses.search import SearchIndex
+
+# Dimension -> (label, candidate columns in the order they are tried). The
+# derived columns of `sses.features` come first; the raw sheet, which has no
+# derived columns, is matched on its text answers.
+DIMENSIONS = {
+    "state": ("State", ["state"]),
+    "gender": ("Gender", ["gender"]),
+    "employment_status": ("Employment Status", ["employment_status_label", "employment_status"]),
+    "age_band": ("Age Band", ["age_band", "age"]),
+    "education_level": ("Education Level", ["education_level"]),
+}
+
+_SESSION_PREFIX = "global_filter_"
+_MAX_VIEWS = 64
+
+
+def _options(dim):
+    column = DIMENSIONS[dim][1][0]
+    return features.AGE_BANDS if column == "age_band" else CATEGORY_SETS[column]
+
+
+# ------------------------------
+# Sidebar
+# ------------------------------
+def render_sidebar():
+    """Draw the global filters; selections persist across page switches."""
+    with st.sidebar.expander("🌐 Global Filters (all pages)"):
+        for dim, (label, _) in DIMENSIONS.items():
+            st.multiselect(label, options=_options(dim), key=_SESSION_PREFIX + dim, placeholder="All")
+        if any(current_filters().values()):
+            st.button("Clear global filters", on_click=clear_filters)
+
+
+def clear_filters():
+    for dim in DIMENSIONS:
+        st.session_state[_SESSION_PREFIX + dim] = []
+
+
+def current_filters():
+    """Selected canonical keys per dimension (empty tuple = no filter)."""
+    state = st.session_state
+    return {
+        dim: tuple(sorted(canonical_key(v) for v in state.get(_SESSION_PREFIX + dim, [])))
+        for dim in DIMENSIONS
+    }
+
+
+# ------------------------------
+# Shared index per data version
+# ------------------------------
+class _Codes:
+    """Growable per-row codes of one text dimension and the canonical key of every code."""
+
+    def __init__(self):
+        self.buffer = AppendBuffer("intp")
+        self.keys = []
+        self._positions = {}    # value -> code
+
+    def extend(self, codes, values):
+        """Append rows whose `codes` index into `values` (as from ``pd.factorize``)."""
+        table = np.array([self._position(value) for value in values] + [-1], dtype="intp")
+        self.buffer.extend(table[codes])
+
+    def _position(self, value):
+        if value not in self._positions:
+            self._positions[value] = len(self.keys)
+            self.keys.append(canonical_key(value))
+        return self._positions[value]
+
+
+class _CrossIndex:
+    """
+    Per-row dimension codes and the canonical key of every code. Categorical
+    columns lend their own codes; other columns are encoded once, and only the
+    appended rows are encoded when the dataset grows (see `extend`).
+    """
+
+    def __init__(self, frame):
+        self.n_rows = len(frame)
+        renamed = {COLUMN_RENAMES.get(c, c): c for c in frame.columns}
+        self._columns = {}      # dim -> (column, _Codes, or None for a Categorical)
+        for dim, (_, candidates) in DIMENSIONS.items():
+            for candidate in candidates:
+                if candidate not in renamed:
+                    continue
+                series = frame[renamed[candidate]]
+                codes = None
+                if not isinstance(series.dtype, pd.CategoricalDtype):
+                    encoded = self._encode(series)
+                    if encoded is None:
+                        continue
+                    codes = _Codes()
+                    codes.extend(*encoded)
+                self._columns[dim] = (renamed[candidate], codes)
+                break
+        self.dimensions = self._dimensions(frame)
+
+    @staticmethod
+    def _encode(series):
+        """(codes, value per code) of a text `series`, or None if it cannot be filtered on."""
+        if pd.api.types.is_numeric_dtype(series):
+            # Codes and ages are filtered through their derived columns
+            return None
+        return pd.factorize(series)
+
+    def _dimensions(self, frame):
+        dimensions = {}
+        for dim, (column, codes) in self._columns.items():
+            if codes is None:
+                series = frame[column]
+                dimensions[dim] = (series.array.codes, [canonical_key(v) for v in series.cat.categories])
+            else:
+                dimensions[dim] = (codes.buffer.view(self.n_rows), codes.keys)
+        return dimensions
+
+    def extend(self, frame, start):
+        """Index of `frame`, whose first `start` rows are the rows indexed here."""
+        index = copy.copy(self)
+        index.n_rows = len(frame)
+        for dim, (column, codes) in self._columns.items():
+            categorical = isinstance(frame[column].dtype, pd.CategoricalDtype)
+            encoded = None if categorical else self._encode(frame[column].iloc[start:])
+            if categorical != (codes is None) or (codes is not None and encoded is None):
+                # The column changed type: index it afresh
+                return _CrossIndex(frame)
+            if codes is not None:
+                codes.extend(*encoded)
+        index.dimensions = index._dimensions(frame)
+        return index
+
+    def rows(self, filters):
+        """Positions matching `filters`, or None when nothing is filtered."""
+        mask = None
+        for dim, keys in filters.items():
+            if not keys or dim not in self.dimensions:
+                continue
+            codes, code_keys = self.dimensions[dim]
+            wanted = [code for code, key in enumerate(code_keys) if key in keys]
+            dim_mask = np.isin(codes, wanted)
+            mask = dim_mask if mask is None else mask & dim_mask
+        return None if mask is None else np.flatnonzero(mask)
+
+
+# ------------------------------
+# Views
+# ------------------------------
+class DatasetView:
+    """A dataset restricted to the rows selected by the global filters."""
+
+    def __init__(self, handle, rows, applied, filters=()):
+        self.name = handle.name
+        self.version = handle.version
+        self.filters = filters      # hashable filter state this view was built for
+        self.n_total = len(handle.frame)
+        self.rows = rows
+        self.applied = applied      # dimension labels that actually filtered this dataset
+        self._handle = handle
+        self._frame = None
+        self._artifacts = {}
+        self._lock = threading.Lock()
+
+    @property
+    def is_filtered(self):
+        return self.rows is not None
+
+    def __len__(self):
+        return self.n_total if self.rows is None else len(self.rows)
+
+    @property
+    def frame(self):
+        """Copy-on-write view of the filtered rows (taken once per view)."""
+        if self.rows is None:
+            return self._handle.frame
+        with self._lock:
+            if self._frame is None:
+                self._frame = self._handle.frame.iloc[self.rows].reset_index(drop=True)
+        return self._frame.copy(deep=False)
+
+    def artifact(self, key, build):
+        """Object built by `build(frame)` from this view, once per view (per data version when unfiltered)."""
+        if self.rows is None:
+            return registry.get_artifact(self.name, key, build)
+        frame = self.frame
+        with self._lock:
+            if key not in self._artifacts:
+                _stats["misses"] += 1
+                self._artifacts[key] = build(frame)
+            else:
+                _stats["hits"] += 1
+            return self._artifacts[key]
+
+    def cube(self, dims=None, items=None):
+        key = ("cube", None if dims is None else tuple(dims), None if items is None else tuple(items))
+        return self.artifact(key, lambda frame: AggregateCube.build(frame, dims=dims, items=items))
+
+    def filter_index(self):
+        return self.artifact("filters", FilterIndex)
+
+    def search_index(self):
+        return self.artifact("search", SearchIndex)
+
+    def moments(self, by=None):
+        """KPI statistics for the view, partitioned by column `by` when given."""
+        if by is None:
+            if self.rows is None:
+                return registry.get_moments(self.name)
+            return self.artifact("moments", Moments.from_frame)
+        return self.artifact(("moments", by), lambda frame: GroupedMoments.from_frame(frame, by))
+
+
+_views = OrderedDict()
+_views_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}     # view and filtered-artifact lookups
+
+
+def view(name, filters=None):
+    """
+    `DatasetView` of dataset `name` under `filters` (default: the session's
+    global filters). Views are shared between sessions with the same
+    selection and dropped least-recently-used first.
+    """
+    handle = registry.get_handle(name)
+    filters = current_filters() if filters is None else filters
+    key = (name, handle.version, tuple(sorted(filters.items())))
+
+    with _views_lock:
+        cached = _views.get(key)
+        if cached is not None:
+            _views.move_to_end(key)
+            _stats["hits"] += 1
+            return cached
+        _stats["misses"] += 1
+
+    index = registry.get_artifact(name, "crossfilter", _CrossIndex)
+    applied = [DIMENSIONS[d][0] for d, keys in filters.items() if keys and d in index.dimensions]
+    result = DatasetView(handle, index.rows(filters), applied, key[2])
+
+    with _views_lock:
+        _views[key] = result
+        while len(_views) > _MAX_VIEWS:
+            _views.popitem(last=False)
+    return result
+
+
+def info():
+    with _views_lock:
+        return {"views": len(_views), **_stats}
+
+
+def caption(dataset_view):
+    """Tell the reader which global filters this page is showing."""
+    if dataset_view.is_filtered:
+        st.caption(
+            f"🌐 Global filters ({', '.join(dataset_view.applied)}): "
+            f"showing {len(dataset_view)} of {dataset_view.n_total} responses."
+        )
@@ -0,0 +1,159 @@
+"""
+Precomputed demographic x Likert aggregate cube.
+
+For every dimension (a demographic column) and every Likert item the cube holds
+the response count, sum and sum of squares per level, plus a histogram of
+whole-number scores 1-5. It is built once per data version with one
+`np.bincount` per (dimension, item), after which means, standard deviations,
+counts and distributions for any subset of levels cost O(levels) instead of a
+scan over the rows.
+"""
+import numpy as np
+import pandas as pd
+
+from sses.schema import CATEGORY_SETS, LIKERT_COLUMNS
+
+LIKERT_LEVELS = [1, 2, 3, 4, 5]
+
+
+class _DimensionStats:
+    def __init__(self, labels, size, count, total, total_sq, hist):
+        self.labels = labels
+        self.size = size            # rows per level
+        self.count = count          # (levels, items) non-missing responses
+        self.total = total          # (levels, items) sum of scores
+        self.total_sq = total_sq    # (levels, items) sum of squared scores
+        self.hist = hist            # (levels, items, 5) whole-number score counts
+
+
+class AggregateCube:
+    """Count / sum / sum-of-squares / histogram per dimension level and item."""
+
+    def __init__(self, items, dimensions):
+        self.items = list(items)
+        self._dims = dimensions
+
+    @classmethod
+    def build(cls, df, dims=None, items=None):
+        """
+        Build the cube from `df`. `dims` defaults to the schema's demographic
+        columns and `items` to the Likert columns present in `df`; any
+        low-cardinality column can be used as a dimension.
+        """
+        if dims is None:
+            dims = [c for c in CATEGORY_SETS if c in df.columns]
+        if items is None:
+            items = [c for c in LIKERT_COLUMNS if c in df.columns]
+
+        values = df[items].to_numpy(dtype="float64", na_value=np.nan)
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+        whole = present & (filled == np.round(filled)) & (filled >= 1) & (filled <= 5)
+        level_index = np.where(whole, filled, 1).astype(np.int64) - 1
+
+        dimensions = {}
+        for dim in dims:
+            codes, labels = _codes(df[dim])
+            n_levels = len(labels)
+            # Rows with a missing dimension value only count towards totals
+            keep = codes >= 0
+            codes = codes[keep]
+
+            size = np.bincount(codes, minlength=n_levels)
+            count = np.empty((n_levels, len(items)))
+            total = np.empty((n_levels, len(items)))
+            total_sq = np.empty((n_levels, len(items)))
+            hist = np.empty((n_levels, len(items), 5))
+            for j in range(len(items)):
+                x = filled[keep, j]
+                count[:, j] = np.bincount(codes, weights=present[keep, j], minlength=n_levels)
+                total[:, j] = np.bincount(codes, weights=x, minlength=n_levels)
+                total_sq[:, j] = np.bincount(codes, weights=x * x, minlength=n_levels)
+                hist[:, j, :] = np.bincount(
+                    codes * 5 + level_index[keep, j], weights=whole[keep, j], minlength=n_levels * 5
+                ).reshape(n_levels, 5)
+            dimensions[dim] = _DimensionStats(labels, size, count, total, total_sq, hist)
+
+        # A single-level dimension holding every row serves overall figures
+        n = len(df)
+        dimensions[None] = _DimensionStats(
+            pd.Index(["All"]), np.array([n]),
+            present.sum(axis=0)[None, :], filled.sum(axis=0)[None, :],
+            (filled * filled).sum(axis=0)[None, :],
+            np.stack([(whole & (filled == lvl)).sum(axis=0) for lvl in LIKERT_LEVELS], axis=-1)[None, :, :],
+        )
+        return cls(items, dimensions)
+
+    @property
+    def dimensions(self):
+        return [d for d in self._dims if d is not None]
+
+    # ------------------------------
+    # Queries
+    # ------------------------------
+    def _select(self, dim, items, levels):
+        stats = self._dims[dim]
+        items = self.items if items is None else list(items)
+        cols = [self.items.index(i) for i in items]
+        rows = np.arange(len(stats.labels)) if levels is None else stats.labels.get_indexer(list(levels))
+        if (rows < 0).any():
+            missing = [lvl for lvl, r in zip(levels, rows) if r < 0]
+            raise KeyError(f"Unknown levels for {dim!r}: {missing}")
+        return stats, items, cols, rows
+
+    def _frame(self, stats, values, rows, items, dim, drop_empty):
+        frame = pd.DataFrame(values, index=stats.labels[rows], columns=items)
+        frame.index.name = dim
+        if drop_empty:
+            frame = frame[stats.size[rows] > 0]
+        return frame
+
+    def size(self, dim):
+        """Number of rows per level of `dim`."""
+        stats = self._dims[dim]
+        return pd.Series(stats.size, index=stats.labels, name="count")
+
+    def count(self, dim=None, items=None, levels=None):
+        stats, items, cols, rows = self._select(dim, items, levels)
+        return self._frame(stats, stats.count[np.ix_(rows, cols)], rows, items, dim, levels is None)
+
+    def mean(self, dim=None, items=None, levels=None):
+        """Mean score per level of `dim` (overall when `dim` is None)."""
+        stats, items, cols, rows = self._select(dim, items, levels)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = stats.total[np.ix_(rows, cols)] / stats.count[np.ix_(rows, cols)]
+        return self._frame(stats, values, rows, items, dim, levels is None)
+
+    def std(self, dim=None, items=None, levels=None):
+        """Sample standard deviation per level of `dim`."""
+        stats, items, cols, rows = self._select(dim, items, levels)
+        n = stats.count[np.ix_(rows, cols)]
+        s = stats.total[np.ix_(rows, cols)]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = (stats.total_sq[np.ix_(rows, cols)] - s * s / n) / (n - 1)
+        return self._frame(stats, np.sqrt(np.clip(var, 0, None)), rows, items, dim, levels is None)
+
+    def pooled_mean(self, dim=None, items=None, levels=None):
+        """Mean per item over the chosen `levels` of `dim` combined."""
+        stats, items, cols, rows = self._select(dim, items, levels)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = stats.total[np.ix_(rows, cols)].sum(axis=0) / stats.count[np.ix_(rows, cols)].sum(axis=0)
+        return pd.Series(values, index=items)
+
+    def histogram(self, dim, item, levels=None, normalize=False):
+        """Whole-number score counts (columns 1-5) per level of `dim`."""
+        stats, _, cols, rows = self._select(dim, [item], levels)
+        counts = stats.hist[rows, cols[0], :]
+        if normalize:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                counts = counts / counts.sum(axis=1, keepdims=True)
+        frame = pd.DataFrame(counts, index=stats.labels[rows], columns=LIKERT_LEVELS)
+        frame.index.name = dim
+        return frame if levels is not None else frame[stats.size[rows] > 0]
+
+
+def _codes(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(dtype=np.int64), pd.Index(series.cat.categories)
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes.astype(np.int64), pd.Index(uniques)
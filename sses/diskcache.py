@@ -0,0 +1,84 @@
+"""
+On-disk columnar cache of cleaned, typed frames.
+
+Frames are written as uncompressed Feather (Arrow IPC) files keyed by dataset
+name and source content hash, so a cold start only re-parses a CSV whose
+content has changed. Each file holds a single record batch and is read back
+memory-mapped: float and categorical columns without missing values are
+views of the mapped file, while nullable integer columns (and columns with
+missing values) are still copied into their pandas dtypes. Categorical and
+nullable integer dtypes survive the round trip. The cache is skipped when
+pyarrow is not installed.
+"""
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow ships with streamlit
+    pa = None
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.environ.get("SSES_CACHE_DIR", Path(__file__).resolve().parents[1] / ".cache" / "frames"))
+
+# Bump when the cleaning or schema code changes what a cached frame looks like,
+# or when the file layout changes (3: one record batch per file)
+FORMAT_VERSION = 3
+
+
+def enabled():
+    return feather is not None and os.environ.get("SSES_DISK_CACHE", "1") != "0"
+
+
+def _path(name, digest):
+    return CACHE_DIR / f"{name}-{digest[:20]}-v{FORMAT_VERSION}.feather"
+
+
+def load(name, digest):
+    """(frame, metadata) cached for (`name`, `digest`), or None."""
+    if not enabled():
+        return None
+    path = _path(name, digest)
+    if not path.exists():
+        return None
+    try:
+        table = feather.read_table(path, memory_map=True)
+        metadata = json.loads((table.schema.metadata or {}).get(b"sses", b"{}"))
+        return table.to_pandas(split_blocks=True), metadata
+    except Exception:
+        logger.warning("Ignoring unreadable cache file %s", path, exc_info=True)
+        return None
+
+
+def save(name, digest, frame, metadata=None):
+    """
+    Write `frame` (plus a small JSON-able `metadata` dict) for (`name`,
+    `digest`) and drop older files for `name`.
+    """
+    if not enabled():
+        return
+    path = _path(name, digest)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b"sses": json.dumps(metadata or {}).encode(),
+        })
+        with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix=".tmp", delete=False) as tmp:
+            feather.write_feather(table.combine_chunks(), tmp.name, compression="uncompressed",
+                                  chunksize=max(len(table), 1))
+        os.replace(tmp.name, path)
+    except Exception:
+        logger.warning("Could not write cache file %s", path, exc_info=True)
+        return
+
+    for stale in CACHE_DIR.glob(f"{name}-*.feather"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
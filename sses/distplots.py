@@ -0,0 +1,254 @@
+"""
+Distribution charts that stay small as the survey grows.
+
+Violins, boxes and rug marginals drawn with ``points='all'`` ship one marker
+per respondent, and the browser computes the density and quartiles from
+them. Up to ``SSES_POINT_THRESHOLD`` rows (default 5000) the helpers below
+return exactly the Plotly Express figure the pages used to build. Above it
+they draw the same chart from numbers computed here - a KDE curve per group,
+the box quartiles and fences, bin counts - plus a stratified sample of at
+most ``SSES_POINT_SAMPLE`` points (default 1000), so the payload no longer
+depends on the number of rows.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+POINT_THRESHOLD = int(os.environ.get("SSES_POINT_THRESHOLD", "5000"))
+POINT_SAMPLE = int(os.environ.get("SSES_POINT_SAMPLE", "1000"))
+
+KDE_POINTS = 100
+_KDE_BINS = 512
+_SEED = 0
+
+
+# ------------------------------
+# Statistics
+# ------------------------------
+def box_stats(values):
+    """Quartiles and Tukey fences, computed the way Plotly draws a box."""
+    values = np.sort(np.asarray(values, dtype="float64"))
+    values = values[~np.isnan(values)]
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {
+        "q1": q1, "median": median, "q3": q3,
+        "lowerfence": inside[0], "upperfence": inside[-1],
+        "mean": values.mean(),
+    }
+
+
+def kde(values, points=KDE_POINTS):
+    """
+    Gaussian KDE with Plotly's violin defaults (Silverman bandwidth, curve
+    extended two bandwidths past the data). Large inputs are binned first,
+    so the cost depends on the number of distinct values, not rows.
+    """
+    values = np.asarray(values, dtype="float64")
+    values = values[~np.isnan(values)]
+    std = values.std(ddof=1) if len(values) > 1 else 0.0
+    q1, q3 = np.quantile(values, [0.25, 0.75])
+    spread = min(std, (q3 - q1) / 1.349) or std or 1.0
+    bandwidth = 1.059 * spread * len(values) ** -0.2
+
+    centers, weights = np.unique(values, return_counts=True)
+    if len(centers) > _KDE_BINS:
+        weights, edges = np.histogram(values, bins=_KDE_BINS)
+        centers = (edges[:-1] + edges[1:]) / 2
+
+    grid = np.linspace(values.min() - 2 * bandwidth, values.max() + 2 * bandwidth, points)
+    z = (grid[:, None] - centers[None, :]) / bandwidth
+    density = np.exp(-0.5 * z ** 2) @ weights / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+    return grid, density
+
+
+def stratified_sample(df, by, size=POINT_SAMPLE, seed=_SEED):
+    """At most `size` rows, split across the groups of `by` in proportion to their size."""
+    if len(df) <= size:
+        return df
+    rng = np.random.default_rng(seed)
+    codes, _ = pd.factorize(df[by]) if by is not None else (np.zeros(len(df), dtype=int), None)
+    picked = []
+    for code in np.unique(codes):
+        rows = np.flatnonzero(codes == code)
+        take = max(1, round(size * len(rows) / len(df)))
+        picked.append(rng.choice(rows, size=min(take, len(rows)), replace=False))
+    return df.iloc[np.sort(np.concatenate(picked))]
+
+
+def _groups(df, x, color, colors):
+    """(label, colour) per group of `x`; one colour for every group unless `color` is `x`, as in Plotly Express."""
+    if color not in (None, x):
+        raise ValueError(f"color={color!r} must be x ({x!r}) or None once the chart is summarised")
+    palette = colors or px.colors.qualitative.Plotly
+    if x is None:
+        labels = [None]
+    else:
+        labels = [label for label in pd.unique(df[x]) if pd.notna(label)]
+        if pd.api.types.is_numeric_dtype(df[x]):
+            labels.sort()
+    return [(label, palette[i % len(palette) if color is not None else 0]) for i, label in enumerate(labels)]
+
+
+def _hover_columns(hover_data, x, y):
+    """Extra columns named by Plotly Express' `hover_data` (a list, or a dict of column -> shown)."""
+    if hover_data is None:
+        return []
+    names = [name for name, shown in hover_data.items() if shown] if isinstance(hover_data, dict) else hover_data
+    return [name for name in names if name not in (x, y)]
+
+
+def _point_hover(sample, x, label, y, columns):
+    """customdata and hovertemplate for the sampled points of one group."""
+    rows = sample if label is None else sample[sample[x] == label]
+    extra = "".join(f"<br>{name}=%{{customdata[{i}]}}" for i, name in enumerate(columns))
+    template = f"{x}={label}<br>{y}=%{{y}}{extra}<extra>sample</extra>"
+    return (rows[columns].to_numpy() if columns else None), template
+
+
+def _values(df, x, label, y):
+    series = df[y] if label is None else df.loc[df[x] == label, y]
+    return series.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _base_layout(fig, x, y, title):
+    fig.update_layout(
+        title=title,
+        xaxis_title=x,
+        yaxis_title=y,
+        legend_title_text=x,
+        legend_tracegroupgap=0,
+        margin=dict(t=60),
+    )
+    return fig
+
+
+# ------------------------------
+# Charts
+# ------------------------------
+def violin(df, x, y, color=None, title=None, color_discrete_sequence=None, threshold=None):
+    """`px.violin(..., box=True, points='all')`, summarised above `threshold` rows."""
+    threshold = POINT_THRESHOLD if threshold is None else threshold
+    if len(df) <= threshold:
+        return px.violin(
+            df, x=x, y=y, color=color, box=True, points="all",
+            color_discrete_sequence=color_discrete_sequence, title=title,
+        )
+
+    # Numeric positions stand in for the categories so curves can be offset
+    fig = go.Figure()
+    groups = _groups(df, x, color, color_discrete_sequence)
+    sample = stratified_sample(df[[x, y]], x)
+    rng = np.random.default_rng(_SEED)
+    for position, (label, colour) in enumerate(groups):
+        values = _values(df, x, label, y)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            continue
+        grid, density = kde(values)
+        half_width = 0.4 * density / density.max()
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([position - half_width, (position + half_width)[::-1]]),
+            y=np.concatenate([grid, grid[::-1]]),
+            fill="toself", mode="lines", line=dict(color=colour, width=1),
+            name=str(label), legendgroup=str(label), showlegend=color is not None, hoverinfo="skip",
+        ))
+        stats = box_stats(values)
+        fig.add_trace(go.Box(
+            x=[position], **{k: [v] for k, v in stats.items()},
+            width=0.08, marker_color=colour, name=str(label), legendgroup=str(label),
+            showlegend=False,
+        ))
+        points = _values(sample, x, label, y)
+        fig.add_trace(go.Scatter(
+            x=position + rng.uniform(-0.15, 0.15, len(points)), y=points,
+            mode="markers", marker=dict(color=colour, size=4, opacity=0.5),
+            name=str(label), legendgroup=str(label), showlegend=False,
+            hovertemplate=f"{x}={label}<br>{y}=%{{y}}<extra>sample</extra>",
+        ))
+
+    fig.update_xaxes(tickvals=list(range(len(groups))), ticktext=[str(label) for label, _ in groups])
+    return _base_layout(fig, x, y, title)
+
+
+def box(df, x, y, color=None, title=None, color_discrete_sequence=None, threshold=None, hover_data=None):
+    """
+    `px.box(..., points='all')`, summarised above `threshold` rows. The
+    `hover_data` columns are shown on the (sampled) points either way.
+    """
+    threshold = POINT_THRESHOLD if threshold is None else threshold
+    if len(df) <= threshold:
+        return px.box(
+            df, x=x, y=y, color=color, points="all",
+            color_discrete_sequence=color_discrete_sequence, title=title, hover_data=hover_data,
+        )
+
+    fig = go.Figure()
+    hover = _hover_columns(hover_data, x, y)
+    sample = stratified_sample(df[[x, y, *hover]], x)
+    for label, colour in _groups(df, x, color, color_discrete_sequence):
+        values = _values(df, x, label, y)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            continue
+        stats = box_stats(values)
+        fig.add_trace(go.Box(
+            x=[label], **{k: [v] for k, v in stats.items()},
+            marker_color=colour, name=str(label), legendgroup=str(label), offsetgroup=str(label),
+            showlegend=color is not None,
+        ))
+        # Sampled points drawn by an invisible box in the same slot
+        points = _values(sample, x, label, y)
+        customdata, hovertemplate = _point_hover(sample, x, label, y, hover)
+        fig.add_trace(go.Box(
+            x=[label] * len(points), y=points, boxpoints="all", jitter=0.3, pointpos=-1.8,
+            fillcolor="rgba(255,255,255,0)", line=dict(color="rgba(255,255,255,0)"),
+            marker=dict(color=colour), hoveron="points", name=str(label),
+            legendgroup=str(label), offsetgroup=str(label), showlegend=False,
+            customdata=customdata, hovertemplate=hovertemplate,
+        ))
+    fig.update_layout(boxmode="overlay")
+    return _base_layout(fig, x, y, title)
+
+
+def histogram_with_rug(df, x, nbins, color_discrete_sequence=None, opacity=None, labels=None, threshold=None):
+    """`px.histogram(..., marginal='rug')`; above `threshold` rows the bars are
+    binned here and the rug shows a sample."""
+    threshold = POINT_THRESHOLD if threshold is None else threshold
+    if len(df) <= threshold:
+        return px.histogram(
+            df, x=x, nbins=nbins, marginal="rug",
+            color_discrete_sequence=color_discrete_sequence, opacity=opacity, labels=labels,
+        )
+
+    colour = (color_discrete_sequence or px.colors.qualitative.Plotly)[0]
+    values = df[x].to_numpy(dtype="float64", na_value=np.nan)
+    values = values[~np.isnan(values)]
+    counts, edges = np.histogram(values, bins=nbins)
+    rug = stratified_sample(df[[x]], None)[x]
+    title = (labels or {}).get(x, x)
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+        marker_color=colour, opacity=opacity, showlegend=False,
+        hovertemplate=f"{title}=%{{x}}<br>count=%{{y}}<extra></extra>",
+    ))
+    fig.add_trace(go.Box(
+        x=rug, boxpoints="all", jitter=0, fillcolor="rgba(255,255,255,0)",
+        line=dict(color="rgba(255,255,255,0)"), marker=dict(color=colour, symbol="line-ns-open"),
+        hoveron="points", showlegend=False, xaxis="x2", yaxis="y2", name="",
+    ))
+    # Same two-panel layout Plotly Express uses for a marginal rug
+    fig.update_layout(
+        xaxis=dict(anchor="y", domain=[0.0, 1.0], title_text=title),
+        xaxis2=dict(anchor="y2", domain=[0.0, 1.0], matches="x", showticklabels=False),
+        yaxis=dict(anchor="x", domain=[0.0, 0.8316], title_text="count"),
+        yaxis2=dict(anchor="x2", domain=[0.8416, 1.0], showgrid=False, showticklabels=False, ticks=""),
+        margin=dict(t=60),
+    )
+    return fig
@@ -0,0 +1,115 @@
+"""
+Derived features shared by every dashboard page.
+
+Composite indices and categorical bins are added to each dataset once per
+data version, when the registry types it (`sses.registry`), and so are
+cached on disk with the frame and seen by cubes, filters and KPI statistics
+like any survey column. Each feature is added only to datasets that have its
+input columns:
+
+- indices: the mean of a few Likert items per row, skipping missing answers
+  (``df[items].mean(axis=1)``), summed over the Int8 scores;
+- Likert bins: 1-2 / 3 / 4-5 as three ordered labels, by ``np.select``;
+- ``employment_status_label``: employment codes or spellings decoded to one
+  set of labels;
+- ``age_band``: the survey's age bands, binned from numeric ages.
+"""
+import numpy as np
+import pandas as pd
+
+from sses.schema import CATEGORY_SETS, canonical_key
+
+INDICES = {
+    'social_support_index': ['social_support', 'social_time', 'community_care'],
+    'community_safety_index': ['neighborhood_safety', 'community_care'],
+    'emotion_management_index': ['calm_under_pressure', 'emotional_control'],
+}
+
+# Bin -> (Likert item, labels for scores <= 2, == 3 and above)
+LIKERT_BINS = {
+    'calm_cat': ('calm_under_pressure', ['Low', 'Medium', 'High']),
+    'overall_health_cat': ('overall_health', ['Poor', 'Moderate', 'Good']),
+}
+
+# Husna's file stores employment as codes
+EMPLOYMENT_LABELS = {0: 'Employed', 1: 'Student', 2: 'Unemployed'}
+
+AGE_BANDS = CATEGORY_SETS['age']
+_AGE_EDGES = [18, 25, 35, 45]
+
+
+# ------------------------------
+# Building blocks
+# ------------------------------
+def row_mean(frame, columns):
+    """Mean of `columns` per row, skipping missing values (NaN when all are missing)."""
+    parts = [frame[column] for column in columns]
+    present = np.column_stack([part.notna().to_numpy() for part in parts])
+    if all(pd.api.types.is_integer_dtype(part) for part in parts):
+        values = np.column_stack([part.to_numpy(dtype="int8", na_value=0) for part in parts])
+        total = values.sum(axis=1, dtype="int16")
+    else:
+        values = np.column_stack([part.to_numpy(dtype="float64", na_value=np.nan) for part in parts])
+        total = np.where(present, values, 0.0).sum(axis=1)
+    count = present.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return pd.Series(np.where(count > 0, total / count, np.nan), index=frame.index)
+
+
+def likert_bin(series, labels):
+    """`labels` for scores <= 2, == 3 and anything higher, as an ordered Categorical."""
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    codes = np.select([np.isnan(values), values <= 2, values == 3], [-1, 0, 1], default=2)
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(labels, ordered=True)),
+                     index=series.index)
+
+
+def _decode(series, dtype, lookup):
+    """`series` as a Categorical of `dtype`, each distinct value looked up once."""
+    codes, uniques = pd.factorize(series)
+    table = np.array([lookup(value) for value in uniques] + [-1], dtype="int64")
+    return pd.Series(pd.Categorical.from_codes(table[codes], dtype=dtype), index=series.index)
+
+
+def employment_label(series):
+    dtype = pd.CategoricalDtype(CATEGORY_SETS['employment_status_label'])
+    positions = {canonical_key(label): i for i, label in enumerate(dtype.categories)}
+    if pd.api.types.is_numeric_dtype(series):
+        codes = {code: positions[canonical_key(label)] for code, label in EMPLOYMENT_LABELS.items()}
+        return _decode(series, dtype, lambda code: codes.get(code, -1))
+    return _decode(series, dtype, lambda value: positions.get(canonical_key(value), -1))
+
+
+def age_band(series):
+    dtype = pd.CategoricalDtype(AGE_BANDS, ordered=True)
+    if pd.api.types.is_numeric_dtype(series):
+        age = series.to_numpy(dtype="float64", na_value=np.nan)
+        codes = np.where(np.isnan(age), -1, np.digitize(np.nan_to_num(age), _AGE_EDGES))
+        return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), index=series.index)
+    positions = {canonical_key(band): i for i, band in enumerate(AGE_BANDS)}
+    return _decode(series, dtype, lambda value: positions.get(canonical_key(value), -1))
+
+
+# ------------------------------
+# Every feature
+# ------------------------------
+def compute(frame):
+    """The features `frame` has the input columns for, as new columns."""
+    features = {}
+    for name, columns in INDICES.items():
+        if all(column in frame.columns for column in columns):
+            features[name] = row_mean(frame, columns)
+    for name, (column, labels) in LIKERT_BINS.items():
+        if column in frame.columns:
+            features[name] = likert_bin(frame[column], labels)
+    if 'employment_status' in frame.columns:
+        features['employment_status_label'] = employment_label(frame['employment_status'])
+    if 'age' in frame.columns:
+        features['age_band'] = age_band(frame['age'])
+    return features
+
+
+def add(frame):
+    """`frame` with its derived features (replacing any copies baked into the file)."""
+    features = compute(frame)
+    return frame.assign(**features) if features else frame
@@ -0,0 +1,113 @@
+"""
+Conditional HTTP fetching for the polled survey sources.
+
+A single pooled ``requests.Session`` is kept for the whole process, and for
+every URL we remember the ``ETag`` / ``Last-Modified`` validators and a hash of
+the last body. Polls send ``If-None-Match`` / ``If-Modified-Since`` so an
+unchanged sheet costs a 304, and when the server ignores validators (Google
+Sheets exports often do) the content hash still tells the caller it can skip
+re-parsing.
+
+Bodies are streamed: they are hashed as they arrive and written to a spooled
+temporary file, which stays in memory up to ``SPOOL_BYTES`` and spills to
+disk beyond that, so a large export is never held as one ``bytes`` object.
+"""
+import hashlib
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import BinaryIO
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+SPOOL_BYTES = 8 * 1024 * 1024
+BLOCK_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class FetchResult:
+    """
+    Outcome of a fetch. `body` is a binary file positioned at the start of
+    the body, which the caller closes; it is None when the server answered 304.
+    """
+    url: str
+    changed: bool
+    digest: str
+    body: BinaryIO | None = None
+    status: int = 200
+
+
+@dataclass
+class _Validators:
+    etag: str | None
+    last_modified: str | None
+    digest: str
+
+
+class ConditionalFetcher:
+    """Fetch URLs over one pooled session, skipping unchanged bodies."""
+
+    def __init__(self, pool_size=10, timeout=30):
+        self.timeout = timeout
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._validators = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, url, conditional=True):
+        """
+        Fetch `url`. With `conditional=False` the body is always downloaded
+        and returned, which callers need when they have no cached copy.
+        """
+        with self._lock:
+            known = self._validators.get(url)
+
+        headers = {}
+        if conditional and known is not None:
+            if known.etag:
+                headers["If-None-Match"] = known.etag
+            if known.last_modified:
+                headers["If-Modified-Since"] = known.last_modified
+
+        with self._session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304 and known is not None:
+                return FetchResult(url=url, changed=False, digest=known.digest, status=304)
+            response.raise_for_status()
+
+            body = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+            hasher = hashlib.sha256()
+            try:
+                for block in response.iter_content(BLOCK_BYTES):
+                    hasher.update(block)
+                    body.write(block)
+            except BaseException:
+                body.close()
+                raise
+            body.seek(0)
+        digest = hasher.hexdigest()
+        with self._lock:
+            self._validators[url] = _Validators(
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                digest=digest,
+            )
+
+        changed = not conditional or known is None or known.digest != digest
+        return FetchResult(url=url, changed=changed, digest=digest, body=body,
+                           status=response.status_code)
+
+    def forget(self, url=None):
+        """Drop stored validators for `url`, or for every URL."""
+        with self._lock:
+            if url is None:
+                self._validators.clear()
+            else:
+                self._validators.pop(url, None)
+
+
+# Shared by every session served by this process
+fetcher = ConditionalFetcher()
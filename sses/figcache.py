@@ -0,0 +1,87 @@
+"""
+Figure cache shared by every session.
+
+Building a Plotly figure (Plotly Express groupbys, template merging, trace
+validation) is a large part of a rerun, yet most figures only depend on the
+data and one or two widgets. `figure` keys each built figure by (dataset
+version and global filter state, figure id, widget values) and returns the
+cached object while those are unchanged. Entries are weighed by the size of
+their serialised JSON and evicted least-recently-used first once the cache
+exceeds its memory budget (``SSES_FIGURE_CACHE_MB``, default 64).
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = int(float(os.environ.get("SSES_FIGURE_CACHE_MB", "64")) * 1024 * 1024)
+
+
+class FigureCache:
+    """LRU of built figures bounded by the total size of their JSON."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (figure, nbytes)
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        figure = build()
+        nbytes = len(pio.to_json(figure, validate=False))
+        if nbytes > self.max_bytes:
+            logger.debug("Figure %s (%d bytes) exceeds the cache budget", key[1], nbytes)
+            return figure
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous[1]
+            self._entries[key] = (figure, nbytes)
+            self._nbytes += nbytes
+            while self._nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._nbytes -= evicted
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def info(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+cache = FigureCache()
+
+
+def figure(view, figure_id, build, *widget_values):
+    """
+    Figure `figure_id` for `view` (a `crossfilter.DatasetView`), built by
+    `build()` only when the data version, global filters or `widget_values`
+    change. The returned figure is shared: callers must not modify it.
+    """
+    key = ((view.name, view.version, view.filters), figure_id, widget_values)
+    return cache.get(key, build)
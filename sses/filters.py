@@ -0,0 +1,87 @@
+"""
+Filter-mask engine for sidebar filters.
+
+A `FilterIndex` is built once per data version and keeps, per filterable
+column, a packed bitmask for every distinct value (for `equals` / `isin`) or a
+sorted index (for numeric `between` ranges, i.e. sliders). Filters combine with
+bitwise AND on the packed bits and only the matching row positions are
+materialized; pages then read just the columns they need at those rows.
+"""
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    """Lazily built per-value bitmasks and sorted numeric indexes for one frame."""
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self._columns = {column: df[column] for column in df.columns}
+        self._value_masks = {}
+        self._sorted = {}
+
+    # ------------------------------
+    # Building blocks
+    # ------------------------------
+    def _masks_for(self, column):
+        if column not in self._value_masks:
+            codes, uniques = pd.factorize(self._columns[column])
+            self._value_masks[column] = {
+                value: np.packbits(codes == code) for code, value in enumerate(uniques)
+            }
+        return self._value_masks[column]
+
+    def _sorted_for(self, column):
+        if column not in self._sorted:
+            values = self._columns[column].to_numpy(dtype="float64", na_value=np.nan)
+            order = np.argsort(values, kind="stable")   # NaN sorts last
+            sorted_values = values[order]
+            n_valid = int((~np.isnan(sorted_values)).sum())
+            self._sorted[column] = (order[:n_valid], sorted_values[:n_valid])
+        return self._sorted[column]
+
+    def _empty(self):
+        return np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+
+    # ------------------------------
+    # Filters (each returns packed bits)
+    # ------------------------------
+    def all(self):
+        return np.packbits(np.ones(self.n_rows, dtype=bool))
+
+    def equals(self, column, value):
+        return self._masks_for(column).get(value, self._empty())
+
+    def isin(self, column, values):
+        masks = self._masks_for(column)
+        bits = self._empty()
+        for value in values:
+            if value in masks:
+                bits = bits | masks[value]
+        return bits
+
+    def between(self, column, low, high):
+        """Rows with `low` <= value <= `high`, found by binary search."""
+        order, sorted_values = self._sorted_for(column)
+        start = np.searchsorted(sorted_values, low, side="left")
+        stop = np.searchsorted(sorted_values, high, side="right")
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[order[start:stop]] = True
+        return np.packbits(mask)
+
+    def bounds(self, column):
+        """(min, max) of a numeric column, ignoring missing values."""
+        _, sorted_values = self._sorted_for(column)
+        return float(sorted_values[0]), float(sorted_values[-1])
+
+    # ------------------------------
+    # Combining
+    # ------------------------------
+    def select(self, *filters):
+        """Row positions matching every filter (all rows when none are given)."""
+        if not filters:
+            return np.arange(self.n_rows)
+        bits = filters[0]
+        for other in filters[1:]:
+            bits = bits & other
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
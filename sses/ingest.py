@@ -0,0 +1,434 @@
+"""
+Incremental ingestion of append-only survey exports.
+
+Google Form responses are only ever appended to the sheet, so each refresh of
+the export is normally the previous export plus a few new rows. An
+`IncrementalTable` keeps a digest of the last export it saw and parses only
+what was added since, appending it to the cached table. Registered aggregates
+are fed just the new rows, so refresh cost grows with the number of new
+responses rather than with the size of the survey.
+
+With ``chunk_rows`` set, every parse streams the export in chunks of that
+many rows: each chunk is hashed, appended and handed to the aggregates before
+the next one is read. The export itself can be a file (such as the spooled
+body from `sses.fetch`), which is only ever read in blocks, so peak memory
+during a sync is one chunk on top of the stored table, however large the
+export.
+
+Each chunk is typed once (the table's ``transform``) and written into
+growable column buffers (`AppendBuffer`). The table's frame is a set of
+zero-copy views of the first rows of those buffers, so handing out the frame
+after a sync does not copy the rows already stored.
+"""
+import hashlib
+import io
+import logging
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_BLOCK_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class SyncResult:
+    """What a call to `IncrementalTable.sync` did."""
+    appended_rows: int
+    total_rows: int
+    rebuilt: bool
+
+
+class ColumnSummary:
+    """Per-column row, missing-value and numeric-sum counts, updated per chunk."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.rows = 0
+        self.missing = pd.Series(dtype="int64")
+        self.sums = pd.Series(dtype="float64")
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        missing = chunk.isna().sum()
+        sums = chunk.select_dtypes(include="number").sum()
+        # Keep the export's column order rather than the sorted union
+        self.missing = self.missing.add(missing, fill_value=0).astype("int64").reindex(
+            self.missing.index.union(missing.index, sort=False))
+        self.sums = self.sums.add(sums, fill_value=0).reindex(self.sums.index.union(sums.index, sort=False))
+
+    def means(self):
+        present = self.rows - self.missing.reindex(self.sums.index, fill_value=0)
+        return self.sums / present.replace(0, np.nan)
+
+
+class AppendBuffer:
+    """
+    NumPy array grown in place. New values are written past the rows already
+    handed out, so earlier `view` slices never change, and capacity doubles
+    when full, so appending n rows costs O(n) overall.
+    """
+
+    def __init__(self, dtype):
+        self._array = np.empty(0, dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def dtype(self):
+        return self._array.dtype
+
+    def extend(self, values):
+        end = self._size + len(values)
+        if end > len(self._array):
+            grown = np.empty(max(end, 2 * len(self._array)), dtype=self._array.dtype)
+            grown[:self._size] = self._array[:self._size]
+            self._array = grown
+        self._array[self._size:end] = values
+        self._size = end
+
+    def widen(self, dtype):
+        """Store values as `dtype` from now on (earlier views keep the old array)."""
+        self._array = self._array.astype(dtype)
+
+    def view(self, stop=None):
+        return self._array[:self._size if stop is None else stop]
+
+
+def _code_dtype(n_categories):
+    # The code width pandas itself picks, so Categoricals wrap the buffer without a copy
+    for dtype in ("int8", "int16", "int32"):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype("int64")
+
+
+class _NumpyColumn:
+    def __init__(self, dtype):
+        self.dtype = dtype
+        self._values = AppendBuffer(dtype)
+
+    def accepts(self, series):
+        return series.dtype == self.dtype
+
+    def extend(self, array):
+        self._values.extend(np.asarray(array))
+
+    def view(self, stop):
+        return self._values.view(stop)
+
+
+class _MaskedColumn:
+    """Nullable ``Int8``/``Float32``/``boolean`` columns: values and mask kept apart."""
+
+    def __init__(self, dtype):
+        self.dtype = dtype
+        self._values = AppendBuffer(dtype.numpy_dtype)
+        self._mask = AppendBuffer(bool)
+
+    def accepts(self, series):
+        return series.dtype == self.dtype
+
+    def extend(self, array):
+        self._values.extend(array.to_numpy(dtype=self.dtype.numpy_dtype, na_value=self.dtype.numpy_dtype.type(0)))
+        self._mask.extend(array.isna())
+
+    def view(self, stop):
+        return self.dtype.construct_array_type()(self._values.view(stop), self._mask.view(stop))
+
+
+class _CategoricalColumn:
+    """Categorical codes; categories first seen in a later chunk are appended."""
+
+    def __init__(self, dtype):
+        self.dtype = dtype
+        self._codes = AppendBuffer(_code_dtype(len(dtype.categories)))
+
+    def accepts(self, series):
+        return isinstance(series.dtype, pd.CategoricalDtype) and series.dtype.ordered == self.dtype.ordered
+
+    def extend(self, array):
+        categories = self.dtype.categories
+        if array.categories.equals(categories):
+            self._codes.extend(array.codes)
+            return
+        new = array.categories[categories.get_indexer(array.categories) == -1]
+        if len(new):
+            categories = categories.append(new)
+            self.dtype = pd.CategoricalDtype(categories, ordered=self.dtype.ordered)
+            if _code_dtype(len(categories)) != self._codes.dtype:
+                self._codes.widen(_code_dtype(len(categories)))
+        # Trailing -1 so missing values (code -1) stay missing
+        positions = np.append(categories.get_indexer(array.categories), -1)
+        self._codes.extend(positions[array.codes])
+
+    def view(self, stop):
+        return pd.Categorical.from_codes(self._codes.view(stop), dtype=self.dtype, validate=False)
+
+
+class _ChunkedColumn:
+    """Other extension arrays (Arrow-backed text): chunks joined on read, which Arrow does without copying."""
+
+    def __init__(self, dtype):
+        self.dtype = dtype
+        self._arrays = []
+
+    def accepts(self, series):
+        return series.dtype == self.dtype
+
+    def extend(self, array):
+        self._arrays.append(array)
+
+    def view(self, stop):
+        if len(self._arrays) > 1:
+            self._arrays = [type(self._arrays[0])._concat_same_type(self._arrays)]
+        return self._arrays[0][:stop]
+
+
+def _column(dtype):
+    if isinstance(dtype, pd.CategoricalDtype):
+        return _CategoricalColumn(dtype)
+    if isinstance(dtype, np.dtype):
+        return _NumpyColumn(dtype)
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype) and issubclass(
+            dtype.construct_array_type(), (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)):
+        return _MaskedColumn(dtype)
+    return _ChunkedColumn(dtype)
+
+
+class _ColumnStore:
+    """The stored rows of a table, one growable buffer per column."""
+
+    def __init__(self):
+        self.rows = 0
+        self._columns = {}
+
+    def append(self, chunk):
+        for name, series in chunk.items():
+            column = self._columns.get(name)
+            if column is None or not self.rows:
+                column = self._columns[name] = _column(series.dtype)
+            elif not column.accepts(series):
+                # A chunk that no longer fits the stored dtype: join the two once
+                joined = pd.concat([pd.Series(column.view(self.rows)), series], ignore_index=True)
+                column = self._columns[name] = _column(joined.dtype)
+                column.extend(joined.array)
+                continue
+            column.extend(series.array)
+        self.rows += len(chunk)
+
+    def frame(self):
+        return pd.DataFrame({name: column.view(self.rows) for name, column in self._columns.items()},
+                            index=pd.RangeIndex(self.rows), copy=False)
+
+
+def _digest(data, start=0, stop=None, hasher=None):
+    """blake2b of file `data` from byte `start` to `stop` (the end if None), read in blocks."""
+    hasher = hasher or hashlib.blake2b(digest_size=16)
+    data.seek(start)
+    while stop is None or data.tell() < stop:
+        block = data.read(_BLOCK_BYTES if stop is None else min(_BLOCK_BYTES, stop - data.tell()))
+        if not block:
+            break
+        hasher.update(block)
+    return hasher
+
+
+class IncrementalTable:
+    """
+    Cached table fed with successive snapshots of the same CSV export.
+
+    New rows are detected in two steps. If the new export starts with the
+    bytes of the previous one, only the tail is parsed. Otherwise the export is
+    parsed and the previous rows are compared by row hash, chunk by chunk; if
+    they are unchanged the extra rows are treated as appended, and if they were
+    edited or removed the table and its aggregates are rebuilt.
+
+    `read_options` are passed to `pd.read_csv`. If its explicit ``dtype``
+    does not fit an export (a text answer in a numeric question), the table
+    is rebuilt once with inferred dtypes.
+
+    `transform`, when given, is called on every parsed chunk and its result is
+    what the table stores and the aggregates see. If it has a ``reset()``, it
+    is reset with the aggregates when the table is rebuilt. `generation`
+    counts rebuilds: within one generation rows are only ever appended.
+
+    A table may be shared between threads: `sync`, `register` and `frame`
+    hold the table's lock, so one sync runs at a time and the frame is never
+    taken from half-extended buffers.
+    """
+
+    def __init__(self, read_options=None, chunk_rows=None, transform=None):
+        self.read_options = read_options or {}
+        self.chunk_rows = chunk_rows
+        self.transform = transform
+        self.aggregates = []
+        self.generation = 0
+        # Length, digest and row-boundary flag of the last export, instead of its bytes
+        self._raw = (0, None, False)
+        self._columns = None
+        self._dtypes = None
+        self._store = _ColumnStore()
+        self._frame = None
+        self._row_hashes = AppendBuffer("uint64")
+        self._lock = threading.RLock()
+
+    def register(self, aggregate):
+        """Feed `aggregate` (anything with reset() and update(chunk)) the table's rows."""
+        with self._lock:
+            self.aggregates.append(aggregate)
+            aggregate.reset()
+            if self._columns is not None:
+                aggregate.update(self.frame)
+        return aggregate
+
+    @property
+    def frame(self):
+        """The stored rows, as views of the column buffers (taken once per sync)."""
+        with self._lock:
+            if self._frame is None or len(self._frame) != len(self):
+                self._frame = self._store.frame() if self._columns is not None else pd.DataFrame()
+            return self._frame
+
+    def __len__(self):
+        return len(self._row_hashes)
+
+    def sync(self, data):
+        """
+        Bring the table up to date with `data`, the latest full export, as
+        bytes or as a seekable binary file (read in blocks, never whole).
+        """
+        stream = io.BytesIO(data) if isinstance(data, (bytes, bytearray, memoryview)) else data
+        with self._lock:
+            try:
+                return self._sync(stream)
+            except (TypeError, ValueError):
+                if "dtype" not in self.read_options:
+                    raise
+                logger.warning("Export does not fit the explicit dtypes; rebuilding with inferred dtypes",
+                               exc_info=True)
+                self.read_options = {k: v for k, v in self.read_options.items() if k != "dtype"}
+                return self._rebuild(stream)
+
+    def _sync(self, data):
+        prefix = self._known_prefix(data)
+        if prefix is not None:
+            appended = 0
+            for chunk in self._read(data, start=self._raw[0], header=None, names=self._columns):
+                if len(chunk):
+                    self._append(self._conform(chunk))
+                    appended += len(chunk)
+            self._remember(data, prefix)
+            return SyncResult(appended_rows=appended, total_rows=len(self), rebuilt=False)
+
+        if self._columns is None:
+            return self._rebuild(data)
+
+        # Stream the export, checking the known rows before appending the rest
+        known = len(self._row_hashes)
+        known_hashes = self._row_hashes.view()
+        offset = appended = 0
+        for chunk in self._read(data):
+            if list(chunk.columns) != self._columns:
+                return self._rebuild(data)
+            chunk = self._conform(chunk)
+            hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+            overlap = min(max(known - offset, 0), len(chunk))
+            if not np.array_equal(hashes[:overlap], known_hashes[offset:offset + overlap]):
+                return self._rebuild(data)
+            if overlap < len(chunk):
+                self._append(chunk.iloc[overlap:].reset_index(drop=True), hashes[overlap:])
+                appended += len(chunk) - overlap
+            offset += len(chunk)
+        if offset < known:
+            return self._rebuild(data)
+        self._remember(data)
+        return SyncResult(appended_rows=appended, total_rows=len(self), rebuilt=False)
+
+    def _rebuild(self, data):
+        logger.info("Export rows were edited or removed; rebuilding the table")
+        self.generation += 1
+        self._columns = self._dtypes = None
+        self._store = _ColumnStore()
+        self._frame = None
+        self._row_hashes = AppendBuffer("uint64")
+        for aggregate in [*self.aggregates, self.transform]:
+            if hasattr(aggregate, "reset"):
+                aggregate.reset()
+        for chunk in self._read(data):
+            if self._columns is None:
+                self._columns = list(chunk.columns)
+            self._append(self._conform(chunk))
+        if self._columns is None:
+            # A header-only export yields no chunks
+            data.seek(0)
+            header = pd.read_csv(data, nrows=0, **self.read_options)
+            self._columns = list(header.columns)
+            self._append(self._conform(header))
+        self._remember(data)
+        return SyncResult(appended_rows=len(self), total_rows=len(self), rebuilt=True)
+
+    def _read(self, data, start=0, **options):
+        """The rows of CSV file `data` from byte `start`, as frames of at most `chunk_rows` rows (one frame if unset)."""
+        options = {**self.read_options, **options}
+        data.seek(start)
+        if self.chunk_rows is None:
+            yield pd.read_csv(data, **options)
+            return
+        with pd.read_csv(data, chunksize=self.chunk_rows, **options) as reader:
+            yield from reader
+
+    def _conform(self, chunk):
+        """`chunk` with the dtypes of the first parsed rows wherever its values allow."""
+        if self._dtypes is None:
+            # A header-only export parses every column as object; wait for rows
+            if len(chunk):
+                self._dtypes = chunk.dtypes
+            return chunk
+        for column, dtype in self._dtypes.items():
+            if chunk[column].dtype != dtype:
+                try:
+                    chunk[column] = chunk[column].astype(dtype)
+                except (TypeError, ValueError):
+                    pass
+        return chunk
+
+    def _remember(self, data, prefix=None):
+        """Record `data`'s length and digest, continuing the digest `prefix` of the previous export if given."""
+        hasher = _digest(data, start=self._raw[0] if prefix is not None else 0, hasher=prefix)
+        size = data.tell()
+        data.seek(max(size - 1, 0))
+        self._raw = (size, hasher.digest(), data.read(1) == b"\n")
+
+    def _known_prefix(self, data):
+        """Digest of the previous export if `data` starts with it and only adds rows, else None."""
+        # Only trust a byte-prefix match when the old export ended on a row
+        # boundary; otherwise its last row may have been extended in place.
+        length, digest, on_boundary = self._raw
+        if not length or data.seek(0, io.SEEK_END) < length:
+            return None
+        prefix = _digest(data, stop=length)
+        if prefix.digest() != digest:
+            return None
+        head = data.read(2)
+        if not head or on_boundary or head.startswith((b"\n", b"\r\n")):
+            return prefix
+        return None
+
+    def _append(self, chunk, hashes=None):
+        # Rows are hashed as parsed, so later exports can be compared before typing
+        if hashes is None:
+            hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        if self.transform is not None:
+            chunk = self.transform(chunk)
+        self._store.append(chunk)
+        self._row_hashes.extend(hashes)
+        for aggregate in self.aggregates:
+            aggregate.update(chunk)
@@ -0,0 +1,69 @@
+"""
+Lazy page sections.
+
+Streamlit runs the body of every expander on each rerun, even when it is
+collapsed, so hidden tables and figures cost as much as visible ones.
+`expander` only runs its body while the reader has it open, and `memo` keeps
+what a section computed so reopening it, or rerunning for an unrelated
+widget, reuses the result until the data or filter state changes.
+"""
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import streamlit as st
+
+MAX_ENTRIES = 128
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+@contextmanager
+def expander(label, key, expanded=False, **kwargs):
+    """
+    `st.expander` that reports whether it is open. Opening or closing it
+    reruns the page, so callers can skip their content while it is closed::
+
+        with lazy.expander("Preview", key="home_preview") as is_open:
+            if is_open:
+                st.dataframe(df)
+    """
+    box = st.expander(label, expanded=expanded, key=key, on_change="rerun", **kwargs)
+    with box:
+        yield box.open
+
+
+def memo(section, view, build, *args):
+    """
+    Result of `build()` for `section` of a page, shared between sessions and
+    reused while `view` (a `crossfilter.DatasetView`) has the same data
+    version and filter state. `args` are the section's own widget values.
+    Results must be treated as read-only by the caller.
+    """
+    key = (section, view.name, view.version, view.filters, args)
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            _stats["hits"] += 1
+            return _memo[key]
+        _stats["misses"] += 1
+
+    result = build()
+
+    with _memo_lock:
+        _memo[key] = result
+        while len(_memo) > MAX_ENTRIES:
+            _memo.popitem(last=False)
+    return result
+
+
+def clear():
+    with _memo_lock:
+        _memo.clear()
+
+
+def info():
+    with _memo_lock:
+        return {"entries": len(_memo), **_stats}
@@ -0,0 +1,244 @@
+"""
+Mergeable summary statistics for KPI cards.
+
+`Moments` keeps, per numeric column, the count, mean and sum of squared
+deviations (Welford / Chan et al.), plus exact counts per level for columns
+that only hold small non-negative integers such as the 1-5 Likert items.
+Level counts give exact medians and quartiles without the rows. Two
+`Moments` built on different rows merge into the statistics of their union,
+so an `IncrementalTable` can feed one the new rows as they arrive
+(it follows the aggregate interface: ``reset()`` and ``update(chunk)``).
+
+`GroupedMoments` keeps one `Moments` per value of a grouping column. The
+statistics of any set of groups, such as a slider range, come from merging
+those partitions.
+"""
+import numpy as np
+import pandas as pd
+
+MAX_LEVEL = 10
+
+
+class Moments:
+    """Count, mean, variance and (for small integer columns) level counts per column."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.rows = 0
+        self.columns = pd.Index([])
+        self._count = np.zeros(0)
+        self._mean = np.zeros(0)
+        self._m2 = np.zeros(0)
+        self._levels = {}       # column -> counts per level 0..MAX_LEVEL
+
+    @classmethod
+    def from_frame(cls, frame):
+        moments = cls()
+        moments.update(frame)
+        return moments
+
+    # ------------------------------
+    # Updating
+    # ------------------------------
+    def update(self, chunk):
+        """Add the rows of `chunk` (its numeric columns)."""
+        numeric = chunk.select_dtypes(include="number")
+        values = numeric.to_numpy(dtype="float64", na_value=np.nan)
+        present = ~np.isnan(values)
+        count = present.sum(axis=0).astype("float64")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, np.nansum(values, axis=0) / count, 0.0)
+        m2 = np.nansum((values - mean) ** 2, axis=0)
+
+        other = Moments()
+        other.rows = len(chunk)
+        other.columns = numeric.columns
+        other._count, other._mean, other._m2 = count, mean, m2
+        for i, column in enumerate(numeric.columns):
+            observed = values[present[:, i], i]
+            if len(observed) == 0:
+                other._levels[column] = np.zeros(MAX_LEVEL + 1, dtype="int64")
+            elif (np.all(observed == np.round(observed)) and observed.min() >= 0
+                  and observed.max() <= MAX_LEVEL):
+                other._levels[column] = np.bincount(observed.astype("int64"), minlength=MAX_LEVEL + 1)
+        self.merge(other)
+        return self
+
+    def merge(self, other):
+        """Fold the statistics of `other` (built on different rows) into this one."""
+        columns = self.columns.union(other.columns, sort=False)
+        a, b = self._aligned(columns), other._aligned(columns)
+        count = a[0] + b[0]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = b[1] - a[1]
+            mean = np.where(count > 0, a[1] + delta * b[0] / count, 0.0)
+            m2 = a[2] + b[2] + np.where(count > 0, delta ** 2 * a[0] * b[0] / count, 0.0)
+
+        levels = {}
+        for column in columns:
+            # Level counts survive only while every part of the column has them
+            mine = self._levels.get(column) if column in self.columns else np.zeros(MAX_LEVEL + 1, dtype="int64")
+            theirs = other._levels.get(column) if column in other.columns else np.zeros(MAX_LEVEL + 1, dtype="int64")
+            if mine is not None and theirs is not None:
+                levels[column] = mine + theirs
+
+        self.rows += other.rows
+        self.columns = columns
+        self._count, self._mean, self._m2 = count, mean, m2
+        self._levels = levels
+        return self
+
+    def _aligned(self, columns):
+        positions = self.columns.get_indexer(columns)
+        found = positions >= 0
+        arrays = []
+        for array in (self._count, self._mean, self._m2):
+            out = np.zeros(len(columns))
+            out[found] = array[positions[found]]
+            arrays.append(out)
+        return arrays
+
+    # ------------------------------
+    # Statistics
+    # ------------------------------
+    def _series(self, array, columns, name):
+        series = pd.Series(array, index=self.columns, name=name)
+        return series if columns is None else series.reindex(columns)
+
+    def count(self, columns=None):
+        return self._series(self._count, columns, "count")
+
+    def missing(self, columns=None):
+        return self._series(self.rows - self._count, columns, "missing")
+
+    def mean(self, columns=None):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self._series(np.where(self._count > 0, self._mean, np.nan), columns, "mean")
+
+    def var(self, columns=None, ddof=1):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = np.where(self._count > ddof, self._m2 / (self._count - ddof), np.nan)
+        return self._series(var, columns, "var")
+
+    def std(self, columns=None, ddof=1):
+        return np.sqrt(self.var(columns, ddof)).rename("std")
+
+    def levels(self, column):
+        """Counts per level 0..MAX_LEVEL, or None when `column` is not small integers."""
+        return self._levels.get(column)
+
+    def quantile(self, column, q):
+        """Exact quantile (pandas' linear interpolation) from the level counts."""
+        levels = self._levels.get(column)
+        if levels is None:
+            raise ValueError(f"{column!r} has no level counts; quantiles need the rows")
+        n = levels.sum()
+        if n == 0:
+            return np.nan
+        cumulative = np.cumsum(levels)
+        position = (n - 1) * q
+        low, high = int(np.floor(position)), int(np.ceil(position))
+        value_low = np.searchsorted(cumulative, low, side="right")
+        value_high = np.searchsorted(cumulative, high, side="right")
+        return value_low + (value_high - value_low) * (position - low)
+
+    def iqr(self, column):
+        return self.quantile(column, 0.75) - self.quantile(column, 0.25)
+
+    def pooled(self, columns):
+        """
+        Moments of the values of `columns` taken together, as if the columns
+        were stacked into one (``df[columns].stack()``).
+        """
+        positions = self.columns.get_indexer(columns)
+        count, mean, m2 = self._count[positions], self._mean[positions], self._m2[positions]
+        total = count.sum()
+        pooled = Moments()
+        pooled.rows = total
+        pooled.columns = pd.Index(["pooled"])
+        pooled._count = np.array([total])
+        pooled._mean = np.array([(count * mean).sum() / total if total else 0.0])
+        pooled._m2 = np.array([(m2 + count * (mean - pooled._mean[0]) ** 2).sum()])
+        if all(self._levels.get(column) is not None for column in columns):
+            pooled._levels = {"pooled": sum(self._levels[column] for column in columns)}
+        return pooled
+
+    def median_imputed(self, columns=None, frame=None):
+        """
+        Moments after filling each column's missing values with its median
+        (``df.fillna(df.median())``). The median comes from the level counts;
+        for a column with missing values and no level counts (fractional
+        values) it is taken from `frame`, the rows these moments describe,
+        and without `frame` that column's moments are left as they are.
+        """
+        columns = self.columns if columns is None else pd.Index(columns)
+        filled = Moments()
+        filled.rows = self.rows
+        filled.columns = columns
+        positions = self.columns.get_indexer(columns)
+        filled._count = self._count[positions].copy()
+        filled._mean = self._mean[positions].copy()
+        filled._m2 = self._m2[positions].copy()
+        filled._levels = {column: self._levels[column] for column in columns if column in self._levels}
+
+        missing = self.rows - filled._count
+        for i, column in enumerate(columns):
+            if missing[i] == 0:
+                continue
+            if column in self._levels:
+                median = self.quantile(column, 0.5)
+            elif frame is not None:
+                median = pd.to_numeric(frame[column], errors="coerce").median()
+            else:
+                continue
+            if np.isnan(median):
+                continue
+            block = Moments()
+            block.rows = 0
+            block.columns = pd.Index([column])
+            block._count, block._mean, block._m2 = np.array([missing[i]]), np.array([median]), np.zeros(1)
+            if median == int(median):
+                block._levels = {column: np.bincount([int(median)], minlength=MAX_LEVEL + 1) * int(missing[i])}
+            filled.merge(block)
+        return filled
+
+
+class GroupedMoments:
+    """`Moments` partitioned by the values of one column."""
+
+    def __init__(self, by):
+        self.by = by
+        self.reset()
+
+    def reset(self):
+        self.groups = {}
+
+    @classmethod
+    def from_frame(cls, frame, by):
+        grouped = cls(by)
+        grouped.update(frame)
+        return grouped
+
+    def update(self, chunk):
+        for key, part in chunk.groupby(self.by, sort=False, observed=True):
+            self.groups.setdefault(key, Moments()).merge(Moments.from_frame(part))
+        return self
+
+    def merge(self, other):
+        for key, moments in other.groups.items():
+            self.groups.setdefault(key, Moments()).merge(moments)
+        return self
+
+    def combined(self, keys=None):
+        """`Moments` of the union of the groups in `keys` (default: all groups)."""
+        total = Moments()
+        for key, moments in self.groups.items():
+            if keys is None or key in keys:
+                total.merge(moments)
+        return total
+
+    def between(self, low, high):
+        """`Moments` of the groups whose key lies in [low, high]."""
+        return self.combined([key for key in self.groups if low <= key <= high])
@@ -0,0 +1,249 @@
+"""
+Rerun profiler.
+
+Opt-in instrumentation for finding where a rerun's time goes. When enabled
+(``SSES_PROFILE=1``, or ``?profile=1`` in the page URL) each rerun is split
+into sections and every section records:
+
+- wall time,
+- rows processed (as reported by the page),
+- payload bytes: the size of the messages Streamlit sent to the browser
+  (counted through a private Streamlit hook, imported only while profiling;
+  "unknown" where the running Streamlit does not have it),
+- cache hits and misses across the shared caches (figures, lazy sections,
+  dataset views and per-version artifacts).
+
+Sections are either wrapped (`section`, or `timed` for loader functions) or
+marked with `checkpoint`, which ends the previous checkpoint section - the
+natural fit for a page script that runs top to bottom. The results appear
+in a "Rerun profile" panel in the sidebar and are appended as one JSON line
+per rerun to a rotating log (``logs/perf.log``, or ``SSES_PROFILE_LOG``).
+
+Cache counters are process-wide, so with several sessions rerunning at once
+a section's hits and misses may include other sessions' lookups. When the
+profiler is off every call here returns immediately.
+"""
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from sses import crossfilter, figcache, lazy, registry
+
+LOG_PATH = Path(os.environ.get("SSES_PROFILE_LOG", Path(__file__).resolve().parents[1] / "logs" / "perf.log"))
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 5
+
+_local = threading.local()
+_log = None
+_log_lock = threading.Lock()
+
+
+def enabled():
+    if os.environ.get("SSES_PROFILE", "") not in ("", "0"):
+        return True
+    try:
+        return st.query_params.get("profile") == "1"
+    except Exception:
+        return False
+
+
+# ------------------------------
+# Counters
+# ------------------------------
+def _cache_counts():
+    """Total hits and misses of the shared caches so far."""
+    sources = [figcache.cache.info(), lazy.info(), crossfilter.info(), registry.artifact_info()]
+    return sum(s["hits"] for s in sources), sum(s["misses"] for s in sources)
+
+
+def _script_run_ctx():
+    try:
+        from streamlit.runtime.scriptrunner_utils.script_run_context import get_script_run_ctx
+    except ImportError:
+        return None
+    return get_script_run_ctx()
+
+
+def _count_payload(ctx):
+    """
+    Count the bytes of every message `ctx` sends from now on (once per
+    context). False when `ctx` has no ``_enqueue`` to wrap.
+    """
+    enqueue = getattr(ctx, "_enqueue", None)
+    if enqueue is None:
+        return False
+    if getattr(enqueue, "_sses_profiled", False):
+        return True
+
+    def counting(msg):
+        run = getattr(_local, "run", None)
+        if run is not None and run.sent is not None:
+            run.sent += msg.ByteSize()
+        enqueue(msg)
+
+    counting._sses_profiled = True
+    ctx._enqueue = counting
+    return True
+
+
+# ------------------------------
+# Runs and sections
+# ------------------------------
+class _Section:
+    def __init__(self, run, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self._run = run
+        self._started = time.perf_counter()
+        self._sent = run.sent
+        self._hits, self._misses = _cache_counts()
+
+    def close(self):
+        hits, misses = _cache_counts()
+        self._run.sections.append({
+            "section": self.name,
+            "ms": round((time.perf_counter() - self._started) * 1000, 1),
+            "rows": self.rows,
+            "bytes": None if self._sent is None else self._run.sent - self._sent,
+            "hits": hits - self._hits,
+            "misses": misses - self._misses,
+        })
+
+
+class _Run:
+    def __init__(self, counted=True):
+        self.started = time.perf_counter()
+        self.sent = 0 if counted else None      # None: payload bytes unknown
+        self.sections = []
+        self.checkpoint = None
+
+
+class _NoSection:
+    """Stand-in yielded while the profiler is off; `rows` can still be set."""
+    rows = None
+
+
+def start():
+    """Begin profiling this rerun (call once, at the top of the main script)."""
+    _local.run = None
+    if not enabled():
+        return
+    ctx = _script_run_ctx()
+    _local.run = _Run(counted=ctx is not None and _count_payload(ctx))
+
+
+def _current():
+    return getattr(_local, "run", None)
+
+
+def _end_checkpoint(run):
+    if run.checkpoint is not None:
+        run.checkpoint.close()
+        run.checkpoint = None
+
+
+@contextmanager
+def section(name, rows=None):
+    """
+    Time the enclosed block as section `name`. The yielded object's `rows`
+    can be set inside the block once the row count is known.
+    """
+    run = _current()
+    if run is None:
+        yield _NoSection()
+        return
+    _end_checkpoint(run)
+    current = _Section(run, name, rows)
+    try:
+        yield current
+    finally:
+        current.close()
+
+
+def timed(name):
+    """
+    Decorator recording each call as section `name`; rows default to the
+    length of the returned dataset.
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with section(name) as current:
+                result = function(*args, **kwargs)
+                if current.rows is None and hasattr(result, "__len__"):
+                    current.rows = len(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def checkpoint(name, rows=None):
+    """End the current checkpoint section and start section `name`."""
+    run = _current()
+    if run is None:
+        return
+    _end_checkpoint(run)
+    run.checkpoint = _Section(run, name, rows)
+
+
+# ------------------------------
+# Reporting
+# ------------------------------
+def _logger():
+    global _log
+    with _log_lock:
+        if _log is None:
+            LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(LOG_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _log = logging.getLogger(f"{__name__}.runs")
+            _log.setLevel(logging.INFO)
+            _log.propagate = False
+            _log.addHandler(handler)
+        return _log
+
+
+def finish(page=None):
+    """
+    End this rerun's profile: log it under `page` and show the sidebar panel.
+    Call after the page has run (in a ``finally`` block, so stopped pages are
+    logged too).
+    """
+    run = _current()
+    if run is None:
+        return
+    _local.run = None
+    _end_checkpoint(run)
+    total_ms = round((time.perf_counter() - run.started) * 1000, 1)
+    record = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "page": page,
+        "total_ms": total_ms,
+        "bytes": run.sent,
+        "sections": run.sections,
+    }
+    try:
+        _logger().info(json.dumps(record, default=int))
+    except OSError:
+        logging.getLogger(__name__).warning("Could not write the profile log %s", LOG_PATH, exc_info=True)
+    _render(record)
+
+
+def _render(record):
+    table = pd.DataFrame(record["sections"], columns=["section", "ms", "rows", "bytes", "hits", "misses"])
+    table["rows"] = table["rows"].astype("Int64")
+    table["bytes"] = table["bytes"].astype("Int64")
+    sent = "bytes unknown" if record["bytes"] is None else f"{record['bytes'] / 1024:.1f} KB sent"
+    with st.sidebar.expander("⏱️ Rerun profile", expanded=True):
+        st.caption(f"{record['page'] or 'This page'}: {record['total_ms']:.0f} ms, {sent}")
+        # The panel itself is drawn after the totals were taken
+        st.dataframe(table, hide_index=True)
@@ -0,0 +1,599 @@
+"""
+Dataset registry shared by every dashboard page.
+
+Each survey dataset (the raw Google Sheet export, the cleaned group CSV and the
+four per-analyst CSVs) is registered once here. Pages ask for a dataset by name
+and are served from a single in-process cache per source, so switching pages no
+longer triggers a fresh network round-trip.
+
+The loading mode is read from the ``SSES_DATA_MODE`` environment variable:
+
+- ``local-first`` (default): serve the copy bundled in ``dataset/`` straight
+  away and refresh from the remote in a background thread, swapping in the new
+  data only when its content hash changed.
+- ``remote``: always load from the remote URL.
+- ``offline``: only ever read the bundled copies (air-gapped deployments).
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent import futures
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from sses import cleaning, diskcache, features
+from sses.cube import AggregateCube
+from sses.fetch import fetcher
+from sses.filters import FilterIndex
+from sses.search import SearchIndex
+from sses.ingest import ColumnSummary, IncrementalTable
+from sses.moments import Moments
+from sses.schema import CATEGORY_SETS, LIKERT_COLUMNS, SchemaReport, apply_schema
+
+logger = logging.getLogger(__name__)
+
+# Pages get shallow views of the shared frames; copy-on-write (always on from
+# pandas 3) turns any column a page modifies into a private copy.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# ------------------------------
+# Registered sources
+# ------------------------------
+GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1_7nl2F8Vfd90h8ce2TreDW5D_m3WHr6vEFtg10xz3BI/export?format=csv&gid=1821075619"
+GITHUB_DATASET_URL = "https://raw.githubusercontent.com/nhusna01/SSES-survey-dashboard/refs/heads/main/dataset/"
+DATA_DIR = Path(os.environ.get("SSES_DATA_DIR", Path(__file__).resolve().parents[1] / "dataset"))
+
+DATA_MODES = ("local-first", "remote", "offline")
+DATA_MODE = os.environ.get("SSES_DATA_MODE", "local-first")
+if DATA_MODE not in DATA_MODES:
+    raise ValueError(f"SSES_DATA_MODE must be one of {DATA_MODES}, got {DATA_MODE!r}")
+
+
+@dataclass(frozen=True)
+class DataSource:
+    """
+    A named dataset and how long a loaded copy stays fresh (seconds).
+    Append-only sources are ingested incrementally (see `sses.ingest`).
+    """
+    name: str
+    url: str
+    ttl: float | None = None
+    local_file: str | None = None
+    append_only: bool = False
+
+    @property
+    def local_path(self):
+        if self.local_file is None:
+            return None
+        path = DATA_DIR / self.local_file
+        return path if path.exists() else None
+
+
+SOURCES = {
+    source.name: source
+    for source in [
+        DataSource("raw_sheet", GOOGLE_SHEET_URL, ttl=15, append_only=True),
+        DataSource("group", GITHUB_DATASET_URL + "cleaned_group_survey_data.csv", ttl=3600,
+                   local_file="cleaned_group_survey_data.csv"),
+        DataSource("husna", GITHUB_DATASET_URL + "Husna_SSES_cleaned.csv", ttl=3600,
+                   local_file="Husna_SSES_cleaned.csv"),
+        DataSource("adawiyah", GITHUB_DATASET_URL + "Adawiyah_SSES_cleaned.csv", ttl=3600,
+                   local_file="Adawiyah_SSES_cleaned.csv"),
+        DataSource("atiqah", GITHUB_DATASET_URL + "Atiqah_SSES_Cleaned.csv", ttl=3600,
+                   local_file="Atiqah_SSES_Cleaned.csv"),
+        DataSource("hafizah", GITHUB_DATASET_URL + "Hafizah_SSES_Cleaned.csv", ttl=3600,
+                   local_file="Hafizah_SSES_Cleaned.csv"),
+    ]
+}
+
+# Datasets computed in-process from another registered dataset, rebuilt
+# whenever the content of their base dataset changes
+DERIVED = {
+    "sheet_cleaned": ("raw_sheet", cleaning.clean),
+}
+
+
+# ------------------------------
+# In-process cache
+# ------------------------------
+@dataclass(frozen=True)
+class DatasetHandle:
+    """
+    Read-only reference to the process-wide copy of a dataset. `version`
+    changes whenever the content does, so sessions can tell they are behind.
+    """
+    name: str
+    version: str
+    loaded_at: float
+    _frame: pd.DataFrame = field(repr=False)
+
+    @property
+    def frame(self):
+        """Copy-on-write view: cheap to take, and page edits stay private."""
+        return self._frame.copy(deep=False)
+
+    def __len__(self):
+        return len(self._frame)
+
+
+@dataclass
+class _CacheEntry:
+    frame: pd.DataFrame
+    digest: str
+    loaded_at: float
+    origin: str
+    hits: int = 0
+    # (table generation, rows) for append-only tables: a later entry of the
+    # same generation holds these rows followed by appended ones
+    extent: tuple | None = None
+
+    def extends(self, extent):
+        return (self.extent is not None and extent is not None
+                and self.extent[0] == extent[0] and self.extent[1] >= extent[1])
+
+    def is_fresh(self, ttl, now):
+        return ttl is None or now - self.loaded_at < ttl
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+_source_locks = {name: threading.Lock() for name in [*SOURCES, *DERIVED]}
+# Source -> event set when its background refresh finishes
+_refreshing = {}
+
+# A source with nothing cached whose fetch failed is not fetched again for
+# RETRY_AFTER seconds (or its TTL if longer); callers get the last error
+RETRY_AFTER = 60
+_failures = {}
+
+class _ChunkTyper:
+    """
+    Types and extends each chunk of an append-only table once, totalling the
+    memory saved. Chunks with none of the schema's columns (the raw export,
+    still under its question-text headers and typed by its read dtypes) are
+    passed through untouched.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.report = SchemaReport(0, 0)
+
+    def __call__(self, chunk):
+        if not any(column in LIKERT_COLUMNS or column in CATEGORY_SETS for column in chunk.columns):
+            return chunk
+        typed, report = apply_schema(chunk)
+        self.report = SchemaReport(self.report.bytes_before + report.bytes_before,
+                                   self.report.bytes_after + report.bytes_after)
+        return features.add(typed)
+
+
+# Append-only sources keep one incrementally synced table for the process,
+# read in chunks of CHUNK_ROWS rows so a large export never sits in memory
+# as one object-heavy frame. Each chunk is typed as it arrives and the typed
+# chunks are the stored table.
+CHUNK_ROWS = int(os.environ.get("SSES_INGEST_CHUNK_ROWS", 50_000))
+_tables = {
+    name: IncrementalTable(read_options={"dtype": cleaning.raw_dtypes()}, chunk_rows=CHUNK_ROWS,
+                           transform=_ChunkTyper())
+    for name, source in SOURCES.items() if source.append_only
+}
+_summaries = {name: table.register(ColumnSummary()) for name, table in _tables.items()}
+_moments = {name: table.register(Moments()) for name, table in _tables.items()}
+# What their cleaned form needs from the whole table (duplicate-column
+# digests, Likert level counts) is gathered chunk by chunk alongside
+_cleaners = {name: table.register(cleaning.StreamingCleaner()) for name, table in _tables.items()}
+_schema_reports = {}
+_artifacts = {}
+_building = {}      # (name, key) -> Future of an artifact being built
+_artifact_stats = {"hits": 0, "misses": 0}
+
+
+def _parse(name, data):
+    table = _tables.get(name)
+    if table is None:
+        data.seek(0)
+        return pd.read_csv(data)
+    result = table.sync(data)
+    logger.info("Synced %s: %d new rows, %d total", name, result.appended_rows, result.total_rows)
+    return table.frame
+
+
+def _typed(name, digest, build):
+    """
+    Cleaned, typed frame for `name` at content `digest`, with its derived
+    features. It is read from the on-disk columnar cache when present;
+    otherwise `build()` produces the raw frame, which is typed, extended and
+    written to the cache.
+    """
+    cached = diskcache.load(name, digest)
+    if cached is not None:
+        frame, metadata = cached
+        if "bytes_before" in metadata:
+            _schema_reports[name] = SchemaReport(metadata["bytes_before"], metadata["bytes_after"])
+        return frame
+
+    frame, report = apply_schema(build())
+    frame = features.add(frame)
+    _schema_reports[name] = report
+    logger.info("Typed schema for %s: %d -> %d bytes (%.1fx smaller)",
+                name, report.bytes_before, report.bytes_after, report.ratio)
+    diskcache.save(name, digest, frame,
+                   metadata={"bytes_before": report.bytes_before, "bytes_after": report.bytes_after})
+    return frame
+
+
+def _make_entry(name, data, origin, digest=None):
+    """Cache entry for `name` from `data`, a binary file holding the CSV export."""
+    if digest is None:
+        data.seek(0)
+        digest = hashlib.file_digest(data, "sha256").hexdigest()
+    if name in _tables:
+        # Append-only tables keep their own incrementally updated, typed copy
+        table = _tables[name]
+        frame = _parse(name, data)
+        if table.transform.report.bytes_before:
+            _schema_reports[name] = table.transform.report
+        extent = (table.generation, len(frame))
+    else:
+        frame = _typed(name, digest, lambda: _parse(name, data))
+        extent = None
+    return _CacheEntry(frame=frame, digest=digest, loaded_at=time.monotonic(), origin=origin, extent=extent)
+
+
+def _refresh_from_remote(name, entry):
+    """
+    Fetch `name` from its remote URL with a conditional request. The cached
+    entry is kept (and its TTL restarted) when the server answers 304 or the
+    body hashes the same, so unchanged data is never re-parsed.
+    """
+    result = fetcher.fetch(SOURCES[name].url, conditional=entry is not None)
+    if entry is not None and (not result.changed or result.digest == entry.digest):
+        if result.body is not None:
+            result.body.close()
+        entry.loaded_at = time.monotonic()
+        return entry
+
+    with result.body:
+        entry = _make_entry(name, result.body, origin="remote", digest=result.digest)
+    _store(name, entry)
+    logger.info("Loaded new data for %s from %s", name, SOURCES[name].url)
+    return entry
+
+
+def _store(name, entry):
+    with _cache_lock:
+        _cache[name] = entry
+        _failures.pop(name, None)
+
+
+def _record_failure(name, error):
+    with _cache_lock:
+        _failures[name] = (time.monotonic(), error)
+
+
+def _backing_off(name):
+    """Seconds left before `name` may be fetched again, and the last error (0, None if it may)."""
+    failed_at, error = _failures.get(name, (None, None))
+    if failed_at is None:
+        return 0, None
+    wait = max(RETRY_AFTER, SOURCES[name].ttl or 0) - (time.monotonic() - failed_at)
+    return (wait, error) if wait > 0 else (0, None)
+
+
+def _serves_local(source):
+    return DATA_MODE != "remote" and source.local_path is not None
+
+
+def _refresh_in_background(name):
+    """Start (at most one) background refresh of `name` from its remote URL."""
+    with _cache_lock:
+        if name in _refreshing:
+            return
+        _refreshing[name] = threading.Event()
+        entry = _cache.get(name)
+    threading.Thread(target=_background_refresh, args=(name, entry and entry.loaded_at), daemon=True,
+                     name=f"sses-refresh-{name}").start()
+
+
+def _background_refresh(name, loaded_at):
+    # Under the source lock, like a foreground load, so the two never fetch
+    # or sync the same source at once
+    with _source_locks[name]:
+        try:
+            entry = _cache.get(name)
+            if entry is None or entry.loaded_at == loaded_at:
+                _refresh_from_remote(name, entry)
+            # otherwise it was reloaded while this thread waited for the lock
+        except Exception as error:
+            logger.warning("Background refresh of %s failed; keeping current copy", name, exc_info=True)
+            # Back off for one TTL instead of retrying on every rerun
+            entry = _cache.get(name)
+            if entry is not None:
+                entry.loaded_at = time.monotonic()
+            else:
+                _record_failure(name, error)
+        finally:
+            with _cache_lock:
+                _refreshing.pop(name).set()
+
+
+def get_handle(name):
+    """
+    Shared handle on dataset `name`, loading it only when the cached copy has
+    expired. Concurrent callers share a single load per source. If a refresh
+    fails while an expired copy is still cached, that copy is served instead.
+
+    In ``local-first`` mode the bundled copy is served immediately and expired
+    entries are refreshed in the background; in ``offline`` mode bundled
+    copies never expire.
+    """
+    entry = _get_derived_entry(name) if name in DERIVED else _get_entry(name)
+    return DatasetHandle(name=name, version=entry.digest[:12], loaded_at=entry.loaded_at, _frame=entry.frame)
+
+
+def get_dataset(name):
+    """Copy-on-write view of dataset `name` (see `get_handle`)."""
+    return get_handle(name).frame
+
+
+def available(name):
+    """
+    Whether dataset `name` can be served: it is cached, has a bundled copy, or
+    may be fetched (not in ``offline`` mode, and not backing off after a
+    failed fetch).
+    """
+    base = DERIVED[name][0] if name in DERIVED else name
+    if base in _cache or _serves_local(SOURCES[base]):
+        return True
+    return DATA_MODE != "offline" and not _backing_off(base)[0]
+
+
+def poll_handle(name):
+    """
+    Handle on source `name` without waiting on the network: the cached or
+    bundled copy, refreshed in the background when expired. None while a
+    source with no bundled copy is still being fetched, or is unavailable.
+    """
+    source = SOURCES[name]
+    if not available(name):
+        return None
+    entry = _cache.get(name)
+    if entry is None and _serves_local(source):
+        return get_handle(name)
+    if entry is None or not entry.is_fresh(source.ttl, time.monotonic()):
+        _refresh_in_background(name)
+    if entry is None:
+        return None
+    return DatasetHandle(name=name, version=entry.digest[:12], loaded_at=entry.loaded_at, _frame=entry.frame)
+
+
+def _get_entry(name):
+    source = SOURCES[name]
+    refresh = _refreshing.get(name)
+    if refresh is not None and name not in _cache:
+        # The first fetch is already running in the background: wait for it
+        refresh.wait()
+
+    with _source_locks[name]:
+        entry = _cache.get(name)
+        now = time.monotonic()
+
+        if entry is None and _serves_local(source):
+            with source.local_path.open("rb") as data:
+                entry = _make_entry(name, data, origin="local")
+            _store(name, entry)
+            if DATA_MODE == "local-first":
+                _refresh_in_background(name)
+        elif entry is None and DATA_MODE == "offline":
+            raise FileNotFoundError(f"Dataset {name!r} has no local copy and SSES_DATA_MODE is offline")
+        elif entry is None or not entry.is_fresh(source.ttl, now):
+            if DATA_MODE == "offline":
+                entry.hits += 1
+            elif _serves_local(source):
+                entry.hits += 1
+                _refresh_in_background(name)
+            elif entry is None and _backing_off(name)[0]:
+                wait, error = _backing_off(name)
+                raise ConnectionError(f"Fetching {name!r} failed; retrying in {wait:.0f}s ({error})") from error
+            elif entry is not None and name in _refreshing:
+                # A background refresh is on its way; serve the expired copy meanwhile
+                entry.hits += 1
+            else:
+                try:
+                    entry = _refresh_from_remote(name, entry)
+                except Exception as error:
+                    if entry is None:
+                        _record_failure(name, error)
+                        raise
+                    logger.warning("Refreshing %s failed; serving cached copy", name, exc_info=True)
+        else:
+            entry.hits += 1
+
+    return entry
+
+
+def _derive(base_name, transform, frame):
+    cleaner = _cleaners.get(base_name)
+    if transform is cleaning.clean and cleaner is not None and cleaner.rows == len(frame):
+        return cleaner.clean(frame)
+    return transform(frame)
+
+
+def _get_derived_entry(name):
+    base_name, transform = DERIVED[name]
+    base = _get_entry(base_name)
+
+    with _source_locks[name]:
+        entry = _cache.get(name)
+        if entry is None or entry.digest != base.digest:
+            frame = _typed(name, base.digest, lambda: _derive(base_name, transform, base.frame))
+            entry = _CacheEntry(frame=frame, digest=base.digest,
+                                loaded_at=base.loaded_at, origin=f"derived:{base_name}")
+            _store(name, entry)
+        else:
+            entry.hits += 1
+
+    return entry
+
+
+def get_artifact(name, key, build):
+    """
+    Object computed from dataset `name` by `build(frame)`, built once per data
+    version and shared by every session. `key` identifies what is built.
+
+    When only rows were appended since the cached object was built and it has
+    an ``extend(frame, start)`` method, the object for the new version is
+    ``extend(frame, start)`` with `start` the number of rows it already covers.
+
+    Objects are built outside the dataset's lock, so a slow build (such as a
+    resampling run) does not hold up other sessions loading the dataset;
+    sessions asking for an object that is being built wait for that build.
+    """
+    entry = _get_derived_entry(name) if name in DERIVED else _get_entry(name)
+    while True:
+        with _source_locks[name]:
+            cached = _artifacts.get((name, key))
+            if cached is not None and cached[0] == entry.digest:
+                _artifact_stats["hits"] += 1
+                return cached[1]
+            pending = _building.get((name, key))
+            if pending is None:
+                _artifact_stats["misses"] += 1
+                pending = _building[(name, key)] = futures.Future()
+                break
+        # Built by another session (possibly for another version): wait, then look again
+        futures.wait([pending])
+
+    try:
+        if cached is not None and hasattr(cached[1], "extend") and entry.extends(cached[2]):
+            artifact = cached[1].extend(entry.frame, cached[2][1])
+        else:
+            artifact = build(entry.frame)
+    except BaseException as error:
+        with _source_locks[name]:
+            del _building[(name, key)]
+        pending.set_exception(error)
+        raise
+    with _source_locks[name]:
+        _artifacts[(name, key)] = (entry.digest, artifact, entry.extent)
+        del _building[(name, key)]
+    pending.set_result(artifact)
+    return artifact
+
+
+def get_cube(name, dims=None, items=None):
+    """
+    Aggregate cube (see `sses.cube`) for dataset `name`, built once per data
+    version for the given `dims` and `items` (defaults: demographics x Likert).
+    """
+    key = ("cube", None if dims is None else tuple(dims), None if items is None else tuple(items))
+    return get_artifact(name, key, lambda frame: AggregateCube.build(frame, dims=dims, items=items))
+
+
+def get_filter_index(name):
+    """Sidebar filter masks (see `sses.filters`) for dataset `name`."""
+    return get_artifact(name, "filters", FilterIndex)
+
+
+def get_search_index(name):
+    """Cell search index (see `sses.search`) for dataset `name`."""
+    return get_artifact(name, "search", SearchIndex)
+
+
+def get_summary(name):
+    """
+    Column counts for an append-only dataset, updated with each batch of new
+    rows. Call after `get_dataset(name)` so the table is current.
+    """
+    return _summaries[name]
+
+
+def get_moments(name):
+    """
+    KPI statistics (see `sses.moments`) for dataset `name`. Append-only
+    datasets update them with each batch of new rows; others compute them
+    once per data version.
+    """
+    if name in _moments:
+        _get_entry(name)
+        return _moments[name]
+    return get_artifact(name, "moments", Moments.from_frame)
+
+
+def schema_reports():
+    """Memory saved by the typed schema, one row per loaded dataset."""
+    rows = [
+        {
+            "dataset": name,
+            "bytes_before": report.bytes_before,
+            "bytes_after": report.bytes_after,
+            "bytes_saved": report.bytes_saved,
+            "ratio": round(report.ratio, 2),
+        }
+        for name, report in _schema_reports.items()
+    ]
+    return pd.DataFrame(rows, columns=["dataset", "bytes_before", "bytes_after", "bytes_saved", "ratio"])
+
+
+def _drop_artifacts(name):
+    # list() copies the keys in one step, so concurrent builds can still store
+    for key in [key for key in list(_artifacts) if key[0] == name]:
+        del _artifacts[key]
+
+
+def evict(name=None):
+    """
+    Drop one cached dataset, or every cached dataset when `name` is None,
+    with the artifacts (cubes, indexes, ...) built on it.
+    """
+    with _cache_lock:
+        if name is None:
+            _cache.clear()
+            _artifacts.clear()
+        else:
+            _cache.pop(name, None)
+            _drop_artifacts(name)
+
+
+def _ttl(name):
+    return SOURCES[DERIVED[name][0] if name in DERIVED else name].ttl
+
+
+def evict_expired():
+    """Drop every cached dataset whose TTL has passed, with its artifacts."""
+    now = time.monotonic()
+    with _cache_lock:
+        for name in [n for n, e in _cache.items() if not e.is_fresh(_ttl(n), now)]:
+            del _cache[name]
+            _drop_artifacts(name)
+
+
+def cache_info():
+    """Summary of the cache contents, one row per cached dataset."""
+    now = time.monotonic()
+    with _cache_lock:
+        rows = [
+            {
+                "dataset": name,
+                "rows": len(entry.frame),
+                "age_seconds": round(now - entry.loaded_at, 1),
+                "ttl_seconds": _ttl(name),
+                "hits": entry.hits,
+                "origin": entry.origin,
+            }
+            for name, entry in _cache.items()
+        ]
+    return pd.DataFrame(rows, columns=["dataset", "rows", "age_seconds", "ttl_seconds", "hits", "origin"])
+
+
+def artifact_info():
+    """Number of cached artifacts and how often they were reused or built."""
+    with _cache_lock:
+        return {"artifacts": len(_artifacts), **_artifact_stats}
@@ -0,0 +1,164 @@
+"""
+Bootstrap confidence intervals and permutation p-values for group means.
+
+`compare` answers "how sure are we that group A's mean differs from group
+B's?" for several columns at once. Resamples are drawn in batches as index
+matrices, turned into weight rows, so each batch of means is one matrix
+product. Large jobs are split across a process pool
+(``SSES_RESAMPLE_WORKERS``, default: all cores), and each batch gets its own
+child of one `SeedSequence`, so the result is the same however many workers
+run it. Results are cached on the dataset view per data version and filter
+state.
+"""
+import atexit
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+N_BOOTSTRAP = 2000
+N_PERMUTATIONS = 2000
+CONFIDENCE = 0.95
+
+WORKERS = int(os.environ.get("SSES_RESAMPLE_WORKERS", os.cpu_count() or 1))
+# Below this many resampled values the pool costs more than it saves
+PARALLEL_MIN_WORK = 20_000_000
+_BATCH_ELEMENTS = 4_000_000
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # "spawn" keeps workers clear of the server's threads and locks
+            _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+# ------------------------------
+# Batches (run in worker processes)
+# ------------------------------
+# Each resample is a row of weights over the observations, so a whole batch
+# of group means is one matrix product; NaNs get weight through a separate
+# presence mask so every column keeps its own count.
+def _weighted_means(weights, values):
+    present = ~np.isnan(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (weights @ np.where(present, values, 0.0)) / (weights @ present)
+
+
+def _bootstrap_weights(rng, n, size):
+    draws = rng.integers(0, n, (size, n)) + np.arange(size)[:, None] * n
+    return np.bincount(draws.ravel(), minlength=size * n).reshape(size, n).astype("float64")
+
+
+def _bootstrap_batch(a, b, size, seed):
+    """Mean differences of `size` bootstrap resamples of a and b, shape (size, columns)."""
+    rng = np.random.default_rng(seed)
+    return (_weighted_means(_bootstrap_weights(rng, len(a), size), a)
+            - _weighted_means(_bootstrap_weights(rng, len(b), size), b))
+
+
+def _permutation_batch(pooled, n_a, observed, size, seed):
+    """How many of `size` label shuffles give a difference at least as extreme as `observed`."""
+    rng = np.random.default_rng(seed)
+    # A random n_a-subset per row: the positions of the n_a smallest random keys
+    chosen = np.argpartition(rng.random((size, len(pooled))), n_a - 1, axis=1)[:, :n_a]
+    in_a = np.zeros((size, len(pooled)))
+    np.put_along_axis(in_a, chosen, 1.0, axis=1)
+    diffs = _weighted_means(in_a, pooled) - _weighted_means(1.0 - in_a, pooled)
+    return (np.abs(diffs) >= np.abs(observed) - 1e-12).sum(axis=0)
+
+
+def _run(function, total, rows_per_draw, columns, seed, *args):
+    """Run `function(*args, size, seed)` over batches covering `total` draws."""
+    # Batches are sized by their (draws x rows) weight matrix
+    batch = max(1, min(total, _BATCH_ELEMENTS // max(1, rows_per_draw)))
+    sizes = [min(batch, total - start) for start in range(0, total, batch)]
+    seeds = seed.spawn(len(sizes))
+    if total * rows_per_draw * columns >= PARALLEL_MIN_WORK and WORKERS > 1 and len(sizes) > 1:
+        pool = _executor()
+        futures = [pool.submit(function, *args, size, child) for size, child in zip(sizes, seeds)]
+        return [future.result() for future in futures]
+    return [function(*args, size, child) for size, child in zip(sizes, seeds)]
+
+
+# ------------------------------
+# Comparisons
+# ------------------------------
+def _seed(*parts):
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).digest()
+    return np.random.SeedSequence(int.from_bytes(digest, "little"))
+
+
+def mean_difference(a, b, n_bootstrap=N_BOOTSTRAP, n_permutations=N_PERMUTATIONS,
+                    confidence=CONFIDENCE, seed=None):
+    """
+    Difference of column means of `a` and `b` (2-D float arrays, NaN for
+    missing) with a percentile bootstrap CI and a two-sided permutation p-value.
+    """
+    seed = seed or np.random.SeedSequence()
+    boot_seed, perm_seed = seed.spawn(2)
+    columns = a.shape[1]
+    with np.errstate(invalid="ignore"):
+        observed = np.nanmean(a, axis=0) - np.nanmean(b, axis=0)
+
+    diffs = np.concatenate(_run(_bootstrap_batch, n_bootstrap, len(a) + len(b), columns, boot_seed, a, b))
+    tail = (1 - confidence) / 2
+    low, high = np.nanquantile(diffs, [tail, 1 - tail], axis=0)
+
+    pooled = np.concatenate([a, b])
+    exceed = sum(_run(_permutation_batch, n_permutations, len(pooled), columns, perm_seed,
+                      pooled, len(a), observed))
+    p_value = (exceed + 1) / (n_permutations + 1)
+    return observed, low, high, p_value
+
+
+def _compare(frame, by, columns, pairs, n_bootstrap, n_permutations, confidence, seed_key):
+    rows = []
+    for group_a, group_b in pairs:
+        a = frame.loc[frame[by] == group_a, columns].to_numpy(dtype="float64", na_value=np.nan)
+        b = frame.loc[frame[by] == group_b, columns].to_numpy(dtype="float64", na_value=np.nan)
+        if len(a) < 2 or len(b) < 2:
+            continue
+        diff, low, high, p_value = mean_difference(
+            a, b, n_bootstrap, n_permutations, confidence,
+            seed=_seed(seed_key, by, group_a, group_b, tuple(columns)),
+        )
+        for i, column in enumerate(columns):
+            rows.append({
+                "variable": column, "group_a": group_a, "group_b": group_b,
+                "mean_a": np.nanmean(a[:, i]), "mean_b": np.nanmean(b[:, i]),
+                "difference": diff[i], "ci_low": low[i], "ci_high": high[i], "p_value": p_value[i],
+            })
+    return pd.DataFrame(rows, columns=["variable", "group_a", "group_b", "mean_a", "mean_b",
+                                       "difference", "ci_low", "ci_high", "p_value"])
+
+
+def compare(view, by, columns, groups=None, n_bootstrap=N_BOOTSTRAP, n_permutations=N_PERMUTATIONS,
+            confidence=CONFIDENCE):
+    """
+    Mean differences of `columns` between every pair of `groups` (default:
+    every value of `by`, sorted) in `view`, a `crossfilter.DatasetView`, with
+    bootstrap CIs and permutation p-values. One row per (pair, column).
+    Seeds derive from the data version, so reruns reproduce the same numbers.
+    """
+    columns = list(columns)
+
+    def build(frame):
+        levels = groups if groups is not None else sorted(g for g in pd.unique(frame[by]) if pd.notna(g))
+        return _compare(frame, by, columns, list(combinations(levels, 2)),
+                        n_bootstrap, n_permutations, confidence, (view.version, view.filters))
+
+    key = ("compare", by, tuple(columns), None if groups is None else tuple(groups),
+           n_bootstrap, n_permutations, confidence)
+    return view.artifact(key, build)
@@ -0,0 +1,127 @@
+"""
+Compact dtypes for survey frames.
+
+`apply_schema` is run on every dataset at load time. Likert items (scored 1-5)
+become nullable ``Int8`` and demographic columns become pandas Categoricals with
+fixed category sets, so a category has the same code in every dataset whatever
+spelling (``SELANGOR`` / ``Selangor``) the file uses. Each call also returns a
+`SchemaReport` with the memory saved.
+"""
+import logging
+import re
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+LIKERT_COLUMNS = [
+    'life_satisfaction', 'cheerful', 'well_rested', 'overall_health',
+    'social_time', 'helping_others', 'social_support', 'social_skills_growth',
+    'neighborhood_safety', 'community_care', 'community_impact',
+    'enjoy_learning', 'self_motivation',
+    'calm_under_pressure', 'emotional_control', 'teamwork', 'task_persistence', 'adaptability',
+    'fixed_social_belief', 'equal_opportunity_belief', 'wellbeing_belief',
+    'community_participation', 'physical_activity',
+]
+
+# Known values per demographic column, in code order. Values are matched on
+# `canonical_key`, so the spelling used by each file is kept.
+CATEGORY_SETS = {
+    'gender': ['Female', 'Male'],
+    'age': ['< 18', '18 - 24', '25 - 34', '35 - 44', '45 and above'],
+    'marital_status': ['Single', 'Married', 'Divorced', 'Widowed'],
+    'education_level': ['Primary', 'Secondary', 'Diploma', "Bachelor's", "Master's", 'PhD'],
+    'employment_status': ['Employee', 'Student', 'Unemployed', 'Retired'],
+    'employment_status_label': ['Employed', 'Student', 'Unemployed', 'Retired'],
+    'state': [
+        'Johor', 'Kedah', 'Kelantan', 'Kuala Lumpur', 'Labuan', 'Melaka', 'Negeri Sembilan',
+        'Pahang', 'Perak', 'Perlis', 'Pulau Pinang', 'Putrajaya', 'Sabah', 'Sarawak',
+        'Selangor', 'Terengganu', 'Other',
+    ],
+    'home_language': ['Malay', 'English', 'Mandarin', 'Tamil', 'Iban', 'Sarawak', 'Other'],
+    'future_goals_final': [
+        'CAREER', 'EDUCATION', 'FAMILY', 'FINANCE', 'HAPPINESS', 'HEALTH',
+        'PERSONAL_GROWTH', 'SPIRITUALITY', 'SUCCESS', 'TRAVEL_EXPERIENCE', 'OTHER',
+    ],
+}
+
+# Different words for the same category across the analysts' files
+_ALIASES = {'employed': 'employee'}
+
+
+def canonical_key(value):
+    """
+    Case-, spacing-, dash- and code-suffix-insensitive key, e.g.
+    'MALE (1)' -> 'male' and '18–24' -> '18 - 24'.
+    """
+    key = re.sub(r"\s*\(\d+\)$", "", str(value)).strip().casefold()
+    # The raw sheet writes ranges with en or em dashes, the cleaned files with '-'
+    key = re.sub(r"\s*[-\u2010-\u2015]\s*", " - ", key)
+    key = re.sub(r"\s+", " ", key)
+    return _ALIASES.get(key, key)
+
+
+@dataclass
+class SchemaReport:
+    """Memory used by a frame before and after `apply_schema`, in bytes."""
+    bytes_before: int
+    bytes_after: int
+    columns: dict = field(default_factory=dict)
+
+    @property
+    def bytes_saved(self):
+        return self.bytes_before - self.bytes_after
+
+    @property
+    def ratio(self):
+        return self.bytes_before / self.bytes_after if self.bytes_after else float("nan")
+
+
+def likert_dtype(series):
+    """``Int8`` when every score is a whole number, else ``float32`` (IQR-capped files)."""
+    values = pd.to_numeric(series, errors='coerce')
+    whole = values.dropna()
+    if ((whole % 1) == 0).all() and whole.between(-128, 127).all():
+        return "Int8"
+    return "float32"
+
+
+def category_dtype(series, column):
+    """Categorical dtype with `column`'s fixed categories, spelled as in `series`."""
+    observed = pd.Series(series.dropna().unique())
+    spelling = {}
+    for value in observed:
+        spelling.setdefault(canonical_key(value), value)
+
+    categories = []
+    for known in CATEGORY_SETS[column]:
+        categories.append(spelling.pop(canonical_key(known), known))
+    # Anything outside the known set is kept rather than turned into NaN
+    categories += sorted(v for v in observed if v not in categories)
+    return pd.CategoricalDtype(categories)
+
+
+def apply_schema(df):
+    """Return (`df` with compact dtypes, `SchemaReport`)."""
+    before = df.memory_usage(deep=True, index=False)
+    typed = {}
+
+    for column in df.columns:
+        series = df[column]
+        if column in LIKERT_COLUMNS and pd.api.types.is_numeric_dtype(series):
+            typed[column] = series.astype(likert_dtype(series))
+        elif (column in CATEGORY_SETS and not pd.api.types.is_numeric_dtype(series)
+              and not isinstance(series.dtype, pd.CategoricalDtype)):
+            typed[column] = series.astype(category_dtype(series, column))
+
+    if typed:
+        df = df.assign(**typed)
+    after = df.memory_usage(deep=True, index=False)
+
+    report = SchemaReport(
+        bytes_before=int(before.sum()),
+        bytes_after=int(after.sum()),
+        columns={c: (int(before[c]), int(after[c])) for c in typed},
+    )
+    return df, report
@@ -0,0 +1,65 @@
+"""
+Search index over every cell of a dataset.
+
+Each column is factorized once, so a query only has to match its distinct
+values (a few dozen per survey column) and then select rows by integer code
+with `np.isin`. Queries are whitespace-separated terms that must all match:
+
+- ``selangor``      rows where any column contains "selangor" (case-insensitive)
+- ``sel*``          rows where any column starts with "sel"
+- ``state:pahang``  rows whose ``state`` column contains "pahang"
+- ``"kuala lumpur"`` quote terms that contain spaces
+"""
+import shlex
+
+import numpy as np
+import pandas as pd
+
+
+class SearchIndex:
+    """Per-column distinct-value string cache with integer row codes."""
+
+    def __init__(self, df):
+        self.columns = list(df.columns)
+        self._by_name = {str(c).casefold(): c for c in self.columns}
+        self._codes = {}
+        self._values = {}
+        for column in self.columns:
+            codes, uniques = pd.factorize(df[column])
+            self._codes[column] = codes
+            self._values[column] = pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.casefold()
+        self.n_rows = len(df)
+
+    def search(self, query):
+        """Sorted positions of the rows matching every term of `query`."""
+        try:
+            terms = shlex.split(query)
+        except ValueError:  # unbalanced quotes
+            terms = query.split()
+
+        mask = np.ones(self.n_rows, dtype=bool)
+        for term in terms:
+            mask &= self._match_term(term)
+        return np.flatnonzero(mask)
+
+    def _match_term(self, term):
+        columns = self.columns
+        column, sep, value = term.partition(":")
+        if sep and column.casefold() in self._by_name:
+            columns = [self._by_name[column.casefold()]]
+            term = value
+
+        prefix = term.endswith("*")
+        needle = term.rstrip("*").casefold()
+
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for column in columns:
+            values = self._values[column]
+            if prefix:
+                hits = values.str.startswith(needle)
+            else:
+                hits = values.str.contains(needle, regex=False)
+            matching_codes = np.flatnonzero(hits.to_numpy(dtype=bool))
+            if len(matching_codes):
+                mask |= np.isin(self._codes[column], matching_codes)
+        return mask
@@ -0,0 +1,180 @@
+"""
+Synthetic survey data for load tests.
+
+`SurveyModel.fit` learns from a real survey export (by default
+``dataset/cleaned_group_survey_data.csv``):
+
+- the marginal distribution of every column, as the proportions of its
+  observed values (Likert levels, demographic categories,
+  ``future_goals_final``, ``age``), plus its missing-value rate;
+- the dependence between columns, as a Gaussian copula: polychoric
+  correlations between columns with few levels (`sses.correlation`), and
+  the correlation of normal scores for the rest.
+
+Sampling draws correlated standard normals in one matrix product and cuts
+each column at the normal quantiles of its cumulative proportions, so a
+Likert item comes out as 1-5 in its observed proportions and items that move
+together in the survey move together in the synthetic rows. Text columns are
+placed in the copula by their sorted categories, which keeps their
+association with the other columns only in so far as it is monotone in that
+order.
+
+`write` streams any number of rows to CSV or Parquet in fixed-size chunks,
+so memory does not grow with the output::
+
+    python -m sses.synthetic synthetic.csv --rows 1000000
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sses.correlation import pearson, polychoric
+
+DEFAULT_SOURCE = Path(__file__).resolve().parents[1] / "dataset" / "cleaned_group_survey_data.csv"
+CHUNK_ROWS = 100_000
+
+_MIN_EIGENVALUE = 1e-6
+
+
+class SurveyModel:
+    """Per-column marginals and a Gaussian copula fitted to one survey frame."""
+
+    def __init__(self, columns, values, thresholds, missing, correlation, dtypes):
+        self.columns = list(columns)
+        self.values = values            # column -> observed values, in copula order
+        self.thresholds = thresholds    # column -> normal cut points between those values
+        self.missing = missing          # column -> share of missing values
+        self.correlation = correlation
+        self.dtypes = dtypes
+        self._factor = np.linalg.cholesky(correlation)
+
+    @classmethod
+    def fit(cls, frame):
+        """Learn the marginals and copula of `frame`."""
+        from scipy.special import ndtri
+
+        values, thresholds, missing, dtypes = {}, {}, {}, {}
+        codes = np.full((len(frame), frame.shape[1]), np.nan)
+        scores = np.full_like(codes, np.nan)
+        for i, column in enumerate(frame.columns):
+            series = frame[column]
+            present = series.notna().to_numpy()
+            levels, inverse, counts = np.unique(series[present].to_numpy(), return_inverse=True, return_counts=True)
+            cumulative = np.cumsum(counts) / max(counts.sum(), 1)
+            values[column] = levels
+            thresholds[column] = ndtri(cumulative[:-1])
+            missing[column] = 1 - present.mean() if len(series) else 0.0
+            dtypes[column] = series.dtype
+
+            # Level codes for the polychoric fit, normal scores of the mid-ranks otherwise
+            codes[present, i] = inverse
+            mid_ranks = np.cumsum(counts) - (counts - 1) / 2
+            scores[present, i] = ndtri(mid_ranks[inverse] / (present.sum() + 1))
+
+        corr = polychoric(codes)
+        corr = np.where(np.isnan(corr), pearson(scores), corr)
+        return cls(frame.columns, values, thresholds, missing, _nearest_correlation(corr), dtypes)
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_SOURCE):
+        return cls.fit(pd.read_csv(path))
+
+    def sample(self, rows, rng=None):
+        """A frame of `rows` synthetic rows."""
+        rng = np.random.default_rng(rng)
+        latent = rng.standard_normal((rows, len(self.columns))) @ self._factor.T
+        data = {}
+        for i, column in enumerate(self.columns):
+            codes = np.searchsorted(self.thresholds[column], latent[:, i])
+            blank = rng.random(rows) < self.missing[column] if self.missing[column] else None
+            data[column] = self._column(column, codes, blank)
+        return pd.DataFrame(data, columns=self.columns)
+
+    def _column(self, column, codes, blank):
+        levels = self.values[column]
+        dtype = self.dtypes[column]
+        if len(levels) == 0:
+            return pd.Series(np.nan, index=range(len(codes)), dtype="float64")
+        if not pd.api.types.is_numeric_dtype(dtype):
+            # Categorical keeps the text columns small and the Parquet schema fixed
+            if blank is not None:
+                codes = np.where(blank, -1, codes)
+            return pd.Categorical.from_codes(codes, categories=levels)
+        column_values = levels[codes]
+        if blank is None:
+            return column_values.astype(dtype, copy=False)
+        if pd.api.types.is_integer_dtype(dtype):
+            column_values = pd.array(column_values, dtype="Int64")
+            column_values[blank] = pd.NA
+            return column_values
+        return np.where(blank, np.nan, column_values)
+
+    def chunks(self, rows, chunk_rows=CHUNK_ROWS, seed=0):
+        """Yield `rows` synthetic rows as frames of at most `chunk_rows` rows."""
+        rng = np.random.default_rng(seed)
+        for start in range(0, rows, chunk_rows):
+            yield self.sample(min(chunk_rows, rows - start), rng)
+
+
+def _nearest_correlation(corr):
+    """`corr` with undefined entries zeroed and negative eigenvalues clipped, rescaled to a unit diagonal."""
+    corr = np.nan_to_num(corr, nan=0.0)
+    np.fill_diagonal(corr, 1.0)
+    eigenvalues, eigenvectors = np.linalg.eigh((corr + corr.T) / 2)
+    corr = eigenvectors * np.maximum(eigenvalues, _MIN_EIGENVALUE) @ eigenvectors.T
+    scale = np.sqrt(np.diag(corr))
+    return corr / np.outer(scale, scale)
+
+
+# ------------------------------
+# Output
+# ------------------------------
+def write(path, rows, model=None, chunk_rows=CHUNK_ROWS, seed=0):
+    """
+    Stream `rows` synthetic rows from `model` (default: fitted to the group
+    survey) to `path`; ``.parquet`` files are written as Parquet, anything
+    else as CSV.
+    """
+    path = Path(path)
+    model = model or SurveyModel.from_csv()
+    chunks = model.chunks(rows, chunk_rows, seed)
+
+    if path.suffix == ".parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:  # pragma: no cover - pyarrow ships with streamlit
+            raise ImportError("Writing Parquet needs pyarrow") from exc
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return path
+
+    with open(path, "w", newline="") as handle:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(handle, header=i == 0, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic SSES survey.")
+    parser.add_argument("output", type=Path, help="CSV or .parquet file to write")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--source", type=Path, default=DEFAULT_SOURCE, help="survey CSV to learn from")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    write(args.output, args.rows, SurveyModel.from_csv(args.source), args.chunk_rows, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import io
+import sys
+import threading
+
+import pandas as pd
+import pytest
+
+from sses.ingest import ColumnSummary, IncrementalTable
+
+HEADER = b"id,state,score\n"
+ROWS = [b"1,Selangor,4\n", b"2,Pahang,5\n", b"3,Johor,2\n", b"4,Perak,3\n", b"5,Kedah,1\n"]
+
+
+def export(rows, header=HEADER):
+    return header + b"".join(rows)
+
+
+def parsed(data, **options):
+    return pd.read_csv(io.BytesIO(data), **options)
+
+
+@pytest.fixture(params=[None, 2], ids=["whole", "chunked"])
+def table(request):
+    table = IncrementalTable(chunk_rows=request.param)
+    table.register(ColumnSummary())
+    return table
+
+
+def test_first_sync_builds_the_table(table):
+    result = table.sync(export(ROWS[:3]))
+    assert result.rebuilt and result.appended_rows == result.total_rows == 3
+    pd.testing.assert_frame_equal(table.frame, parsed(export(ROWS[:3])))
+
+
+def test_byte_prefix_append_parses_only_the_tail(table):
+    table.sync(export(ROWS[:3]))
+    generation = table.generation
+    result = table.sync(export(ROWS))
+    assert not result.rebuilt
+    assert (result.appended_rows, result.total_rows) == (2, 5)
+    assert table.generation == generation
+    pd.testing.assert_frame_equal(table.frame, parsed(export(ROWS)))
+    assert table.aggregates[0].rows == 5
+
+
+def test_hash_verified_append_when_bytes_change_but_rows_do_not(table):
+    table.sync(export(ROWS[:3]))
+    generation = table.generation
+    # Same rows rewritten with CRLF line endings, plus two new ones
+    result = table.sync(export(ROWS).replace(b"\n", b"\r\n"))
+    assert not result.rebuilt
+    assert (result.appended_rows, result.total_rows) == (2, 5)
+    assert table.generation == generation
+    pd.testing.assert_frame_equal(table.frame, parsed(export(ROWS)))
+    assert table.aggregates[0].rows == 5
+
+
+def test_unchanged_export_appends_nothing(table):
+    table.sync(export(ROWS))
+    result = table.sync(export(ROWS))
+    assert not result.rebuilt and result.appended_rows == 0 and result.total_rows == 5
+
+
+@pytest.mark.parametrize("rows", [
+    [ROWS[0], b"2,Pahang,1\n", *ROWS[2:]],
+    [ROWS[0], *ROWS[2:]],
+], ids=["edited", "removed"])
+def test_edited_or_removed_rows_rebuild(table, rows):
+    table.sync(export(ROWS))
+    generation = table.generation
+    result = table.sync(export(rows))
+    assert result.rebuilt
+    assert table.generation == generation + 1
+    pd.testing.assert_frame_equal(table.frame, parsed(export(rows)))
+    # Aggregates are reset and refed, not double counted
+    assert table.aggregates[0].rows == len(rows)
+
+
+def test_changed_header_rebuilds(table):
+    table.sync(export(ROWS[:3]))
+    data = export(ROWS, header=b"id,state,rating\n")
+    assert table.sync(data).rebuilt
+    assert list(table.frame.columns) == ["id", "state", "rating"]
+
+
+@pytest.mark.parametrize("chunk_rows", [None, 2])
+def test_dtype_mismatch_falls_back_to_inferred_dtypes(chunk_rows):
+    table = IncrementalTable(read_options={"dtype": {"score": "float32"}}, chunk_rows=chunk_rows)
+    table.sync(export(ROWS[:3]))
+    assert table.frame["score"].dtype == "float32"
+
+    rows = [*ROWS[:3], b"4,Perak,not sure\n"]
+    result = table.sync(export(rows))
+    assert result.rebuilt
+    assert "dtype" not in table.read_options
+    # Chunks infer their own dtypes, so only the values are compared
+    pd.testing.assert_frame_equal(table.frame.astype(str), parsed(export(rows)).astype(str))
+
+
+def test_header_only_export(table):
+    result = table.sync(HEADER)
+    assert result.rebuilt and result.total_rows == 0
+    assert len(table.frame) == 0
+    assert list(table.frame.columns) == ["id", "state", "score"]
+
+    result = table.sync(export(ROWS[:2]))
+    assert not result.rebuilt and result.appended_rows == 2
+    pd.testing.assert_frame_equal(table.frame, parsed(export(ROWS[:2])))
+
+
+def test_sync_reads_binary_files(table, tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_bytes(export(ROWS[:3]))
+    with path.open("rb") as file:
+        table.sync(file)
+    path.write_bytes(export(ROWS))
+    with path.open("rb") as file:
+        result = table.sync(file)
+    assert not result.rebuilt and result.appended_rows == 2
+    pd.testing.assert_frame_equal(table.frame, parsed(export(ROWS)))
+
+
+def test_transform_is_applied_per_chunk_and_reset_on_rebuild():
+    class Doubler:
+        def __init__(self):
+            self.reset()
+
+        def reset(self):
+            self.calls = 0
+
+        def __call__(self, chunk):
+            self.calls += 1
+            return chunk.assign(score=chunk["score"] * 2)
+
+    table = IncrementalTable(chunk_rows=2, transform=Doubler())
+    table.sync(export(ROWS[:3]))
+    table.sync(export(ROWS))
+    assert table.frame["score"].tolist() == [8, 10, 4, 6, 2]
+
+    table.sync(export(ROWS[1:]))
+    assert table.transform.calls == 2
+    assert table.frame["score"].tolist() == [10, 4, 6, 2]
+
+
+def test_concurrent_syncs_append_each_row_once():
+    # Switch threads often so unsynchronised syncs would interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        rows = ROWS * 40
+        for _ in range(5):
+            table = IncrementalTable(chunk_rows=3)
+            table.register(ColumnSummary())
+            table.sync(export(ROWS[:1]))
+            barrier = threading.Barrier(4)
+
+            def sync():
+                barrier.wait()
+                table.sync(export(rows))
+
+            threads = [threading.Thread(target=sync) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert table.aggregates[0].rows == len(table) == len(rows)
+            pd.testing.assert_frame_equal(table.frame, parsed(export(rows)))
+    finally:
+        sys.setswitchinterval(interval)
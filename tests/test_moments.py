@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sses.moments import GroupedMoments, Moments
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(7)
+    n = 500
+    likert = lambda: pd.array(np.where(rng.random(n) < 0.1, None, rng.integers(1, 6, n)), dtype="Int8")
+    return pd.DataFrame({
+        "calm": likert(),
+        "cheerful": likert(),
+        "teamwork": pd.array(rng.integers(1, 6, n), dtype="Int8"),
+        "income": np.where(rng.random(n) < 0.05, np.nan, rng.normal(3000, 800, n)),
+        "state": rng.choice(["Selangor", "Pahang", "Johor"], n),
+    })
+
+
+LIKERT = ["calm", "cheerful", "teamwork"]
+
+
+def assert_moments(moments, frame, columns):
+    values = frame[columns].astype("float64")
+    pd.testing.assert_series_equal(moments.count(columns), values.count().astype("float64"), check_names=False)
+    pd.testing.assert_series_equal(moments.mean(columns), values.mean(), check_names=False)
+    pd.testing.assert_series_equal(moments.std(columns), values.std(), check_names=False)
+
+
+@pytest.mark.parametrize("q", [0, 0.1, 0.25, 0.5, 0.6, 0.75, 0.9, 1])
+def test_quantile_matches_pandas(frame, q):
+    moments = Moments.from_frame(frame)
+    for column in LIKERT:
+        assert moments.quantile(column, q) == pytest.approx(frame[column].astype("float64").quantile(q))
+
+
+def test_quantile_needs_level_counts(frame):
+    with pytest.raises(ValueError):
+        Moments.from_frame(frame).quantile("income", 0.5)
+
+
+def test_median_imputed_matches_fillna_median(frame):
+    filled = Moments.from_frame(frame).median_imputed(LIKERT)
+    values = frame[LIKERT].astype("float64")
+    expected = values.fillna(values.median())
+    assert_moments(filled, expected, LIKERT)
+    for column in LIKERT:
+        assert filled.quantile(column, 0.5) == expected[column].median()
+
+
+def test_pooled_matches_stacked_columns(frame):
+    pooled = Moments.from_frame(frame).pooled(LIKERT)
+    stacked = frame[LIKERT].astype("float64").stack()
+    assert pooled.count()["pooled"] == stacked.count()
+    assert pooled.mean()["pooled"] == pytest.approx(stacked.mean())
+    assert pooled.std()["pooled"] == pytest.approx(stacked.std())
+    assert pooled.quantile("pooled", 0.5) == stacked.median()
+
+
+def test_merge_of_split_frames_matches_whole(frame):
+    whole = Moments.from_frame(frame)
+    merged = Moments.from_frame(frame.iloc[:123]).merge(Moments.from_frame(frame.iloc[123:]))
+    assert merged.rows == whole.rows == len(frame)
+    assert_moments(merged, frame, [*LIKERT, "income"])
+    for column in LIKERT:
+        np.testing.assert_array_equal(merged.levels(column), whole.levels(column))
+
+
+def test_merge_keeps_columns_seen_on_either_side(frame):
+    merged = Moments.from_frame(frame[["calm"]]).merge(Moments.from_frame(frame[["income"]]))
+    assert list(merged.columns) == ["calm", "income"]
+    assert merged.levels("calm") is not None and merged.levels("income") is None
+
+
+def test_update_in_chunks_matches_from_frame(frame):
+    moments = Moments()
+    for start in range(0, len(frame), 64):
+        moments.update(frame.iloc[start:start + 64])
+    assert_moments(moments, frame, [*LIKERT, "income"])
+
+
+def test_grouped_moments_combine_their_partitions(frame):
+    grouped = GroupedMoments.from_frame(frame, "state")
+    part = frame[frame["state"].isin(["Johor", "Pahang"])]
+    assert_moments(grouped.combined(["Johor", "Pahang"]), part, [*LIKERT, "income"])
+    assert_moments(grouped.combined(), frame, [*LIKERT, "income"])
+
+
+def test_median_imputed_without_level_counts(frame):
+    # IQR-capped answers are fractional, so no level counts are kept
+    frame = frame.assign(calm=frame["calm"].astype("float64") + 0.25)
+    moments = Moments.from_frame(frame)
+    assert moments.levels("calm") is None
+
+    filled = moments.median_imputed(LIKERT, frame=frame)
+    values = frame[LIKERT].astype("float64")
+    assert_moments(filled, values.fillna(values.median()), LIKERT)
+
+    # Without the rows the column is left unimputed rather than failing
+    assert_moments(moments.median_imputed(["calm"]), frame, ["calm"])
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from sses import resampling
+
+
+@pytest.fixture
+def groups():
+    rng = np.random.default_rng(3)
+    a = rng.integers(1, 6, (120, 3)).astype("float64")
+    b = rng.integers(1, 6, (90, 3)).astype("float64")
+    a[rng.random(a.shape) < 0.1] = np.nan
+    return a, b
+
+
+@pytest.fixture
+def batched(monkeypatch):
+    # Many small batches, all sent to the pool when there is more than one worker
+    monkeypatch.setattr(resampling, "_BATCH_ELEMENTS", 5_000)
+    monkeypatch.setattr(resampling, "PARALLEL_MIN_WORK", 0)
+
+
+def run(monkeypatch, workers, a, b):
+    monkeypatch.setattr(resampling, "WORKERS", workers)
+    monkeypatch.setattr(resampling, "_pool", None)
+    try:
+        result = resampling.mean_difference(a, b, n_bootstrap=300, n_permutations=300,
+                                            seed=np.random.SeedSequence(11))
+        assert (resampling._pool is not None) == (workers > 1)
+        return result
+    finally:
+        if resampling._pool is not None:
+            resampling._pool.shutdown()
+
+
+def test_same_results_with_one_or_many_workers(monkeypatch, batched, groups):
+    serial = run(monkeypatch, 1, *groups)
+    parallel = run(monkeypatch, 2, *groups)
+    for expected, actual in zip(serial, parallel):
+        np.testing.assert_array_equal(actual, expected)
+
+
+def test_mean_difference(groups):
+    a, b = groups
+    observed, low, high, p_value = resampling.mean_difference(a, b, n_bootstrap=500, n_permutations=500,
+                                                              seed=np.random.SeedSequence(5))
+    np.testing.assert_allclose(observed, np.nanmean(a, axis=0) - np.nanmean(b, axis=0))
+    assert np.all(low <= observed) and np.all(observed <= high)
+    assert np.all((p_value > 0) & (p_value <= 1))